@@ -0,0 +1,336 @@
+"""Benchmark AgentTracePlugin overhead per callback with a mock ADK runtime.
+
+Every plugin hook is driven with SimpleNamespace stand-ins for ADK's
+InvocationContext, CallbackContext, LlmRequest, LlmResponse, BaseTool and
+ToolContext. Many invocations run concurrently on one event loop, tool
+calls carry large arguments and return large results, and every Nth tool
+call fails.
+
+For each writer configuration the report shows per-hook latency
+percentiles, callbacks and events written per second, bytes written and
+peak traced memory.
+
+Usage:
+    python -m benchmarks.bench_plugin [--invocations N] [--concurrency N]
+        [--config NAME ...] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Dict, List, Tuple
+
+from watchtower.plugin import AgentTracePlugin
+from watchtower.utils.compression import iter_lines
+
+# Writer configurations: name -> AgentTracePlugin keyword arguments
+CONFIGS: Dict[str, Dict[str, Any]] = {
+    "file": {},
+    "file keep_open": {"keep_files_open": True},
+    "file adaptive": {"adaptive_buffering": True},
+    "file async": {"async_writes": True},
+    "file shared": {"shared_writers": True},
+    "file offload": {"offload_writes": True},
+    "file gzip": {"compression": "gzip"},
+    "sqlite": {"enable_file": False, "sqlite_path": "traces.db"},
+    "stdout": {"enable_file": False, "enable_stdout": True},
+    "stdout batched": {"enable_file": False, "enable_stdout": True, "stdout_batch_size": 64},
+    "file+stdout": {"enable_stdout": True},
+    "file head 10%": {"sample_rate": 0.1},
+    "file tail": {"tail_sampling": True},
+    "disabled": {"enable_file": False},
+}
+
+HOOKS = [
+    "before_run",
+    "before_model",
+    "after_model",
+    "before_tool",
+    "after_tool",
+    "on_tool_error",
+    "on_event",
+    "after_run",
+]
+
+
+class _CountingStream:
+    """Text stream that discards output and counts characters and lines."""
+
+    def __init__(self) -> None:
+        self.chars = 0
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        self.chars += len(text)
+        self.lines += text.count("\n")
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+# === Mock ADK runtime ===
+
+
+def _tool_args(size: int) -> Dict[str, Any]:
+    return {
+        "query": "quarterly revenue by region",
+        "api_key": "sk-" + "a" * 40,
+        "filters": {"region": ["us", "eu", "apac"], "year": 2024},
+        "document": "lorem ipsum dolor sit amet " * (size // 27 + 1),
+    }
+
+
+def _tool_result(size: int) -> Dict[str, Any]:
+    row = {"title": "Result title", "url": "https://example.com/a", "snippet": "x" * 200}
+    return {"status": "ok", "results": [dict(row, rank=i) for i in range(size // 260 + 1)]}
+
+
+def _llm_request() -> SimpleNamespace:
+    return SimpleNamespace(
+        model="gemini-2.0-flash",
+        contents=[SimpleNamespace(role="user")] * 6,
+        tools=[SimpleNamespace(name="search"), SimpleNamespace(name="fetch")],
+    )
+
+
+def _llm_response() -> SimpleNamespace:
+    return SimpleNamespace(
+        usage=SimpleNamespace(input_tokens=1200, output_tokens=300, total_tokens=1500),
+        tool_calls=[SimpleNamespace(name="search")],
+        finish_reason="STOP",
+    )
+
+
+class _Driver:
+    """Runs synthetic invocations against a plugin and times each hook."""
+
+    def __init__(self, plugin: AgentTracePlugin, options: argparse.Namespace):
+        self.plugin = plugin
+        self.options = options
+        self.samples: Dict[str, List[int]] = defaultdict(list)
+        self.tool = SimpleNamespace(name="search")
+        self.agent = SimpleNamespace(name="bench_agent")
+        self.args = _tool_args(options.arg_size)
+        self.result = _tool_result(options.result_size)
+        self.request = _llm_request()
+        self.response = _llm_response()
+        self.error = RuntimeError("upstream timed out")
+        self.adk_event = SimpleNamespace(
+            author="bench_agent",
+            actions=SimpleNamespace(state_delta={"step": 1, "notes": "partial answer"}),
+        )
+        self._tool_calls = 0
+
+    async def _timed(self, hook: str, call: Awaitable[Any]) -> None:
+        start = time.perf_counter_ns()
+        await call
+        self.samples[hook].append(time.perf_counter_ns() - start)
+        # Yield so concurrent invocations interleave between callbacks
+        await asyncio.sleep(0)
+
+    async def invocation(self, index: int) -> None:
+        plugin = self.plugin
+        invocation_id = f"inv-{index}"
+        inv = SimpleNamespace(invocation_id=invocation_id, agent=self.agent)
+
+        await self._timed("before_run", plugin.before_run_callback(invocation_context=inv))
+        for step in range(self.options.steps):
+            ctx = SimpleNamespace(invocation_id=invocation_id, state={})
+            await self._timed(
+                "before_model",
+                plugin.before_model_callback(callback_context=ctx, llm_request=self.request),
+            )
+            await self._timed(
+                "after_model",
+                plugin.after_model_callback(callback_context=ctx, llm_response=self.response),
+            )
+
+            tool_ctx = SimpleNamespace(
+                invocation_id=invocation_id,
+                state={},
+                function_call_id=f"{invocation_id}-{step}",
+                agent_name="bench_agent",
+            )
+            await self._timed(
+                "before_tool",
+                plugin.before_tool_callback(
+                    tool=self.tool, tool_args=self.args, tool_context=tool_ctx
+                ),
+            )
+            self._tool_calls += 1
+            if self._tool_calls % self.options.error_every == 0:
+                await self._timed(
+                    "on_tool_error",
+                    plugin.on_tool_error_callback(
+                        tool=self.tool, tool_args=self.args, tool_context=tool_ctx, error=self.error
+                    ),
+                )
+            else:
+                await self._timed(
+                    "after_tool",
+                    plugin.after_tool_callback(
+                        tool=self.tool,
+                        tool_args=self.args,
+                        tool_context=tool_ctx,
+                        result=self.result,
+                    ),
+                )
+            await self._timed(
+                "on_event",
+                plugin.on_event_callback(invocation_context=inv, event=self.adk_event),
+            )
+        await self._timed("after_run", plugin.after_run_callback(invocation_context=inv))
+
+    async def run(self) -> None:
+        semaphore = asyncio.Semaphore(self.options.concurrency)
+
+        async def bounded(index: int) -> None:
+            async with semaphore:
+                await self.invocation(index)
+
+        await asyncio.gather(*(bounded(i) for i in range(self.options.invocations)))
+
+
+# === Measurement ===
+
+
+def _run_config(
+    kwargs: Dict[str, Any], options: argparse.Namespace, trace_memory: bool
+) -> Tuple[_Driver, float, int, int]:
+    """Run the workload once.
+
+    Returns:
+        Tuple of (driver, wall seconds including shutdown, events written, bytes written)
+    """
+    stream = _CountingStream()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with contextlib.redirect_stdout(stream):  # type: ignore[type-var]
+            if "sqlite_path" in kwargs:
+                kwargs = dict(kwargs, sqlite_path=str(Path(tmpdir) / kwargs["sqlite_path"]))
+            plugin = AgentTracePlugin(trace_dir=tmpdir, **kwargs)
+        driver = _Driver(plugin, options)
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        asyncio.run(driver.run())
+        plugin.shutdown()
+        elapsed = time.perf_counter() - start
+
+        events = stream.lines
+        written = stream.chars
+        for path in Path(tmpdir).rglob("*"):
+            if not path.is_file():
+                continue
+            if path.suffix == ".db":
+                with sqlite3.connect(path) as conn:
+                    events += conn.execute("SELECT count(*) FROM events").fetchone()[0]
+            elif ".jsonl" in path.name:
+                events += sum(1 for _ in iter_lines(path))
+            written += path.stat().st_size
+
+    return driver, elapsed, events, written
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index] / 1000
+
+
+def _hook_stats(samples: Dict[str, List[int]]) -> Dict[str, Dict[str, float]]:
+    stats = {}
+    for hook in HOOKS:
+        values = sorted(samples.get(hook, []))
+        if not values:
+            continue
+        stats[hook] = {
+            "calls": len(values),
+            "p50_us": _percentile(values, 0.50),
+            "p95_us": _percentile(values, 0.95),
+            "p99_us": _percentile(values, 0.99),
+            "max_us": values[-1] / 1000,
+        }
+    return stats
+
+
+def bench_config(name: str, options: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark one writer configuration.
+
+    Timings come from an untraced run; peak memory from a second run under
+    tracemalloc, which would otherwise inflate the latencies.
+    """
+    kwargs = CONFIGS[name]
+    driver, elapsed, events, written = _run_config(kwargs, options, trace_memory=False)
+    callbacks = sum(len(values) for values in driver.samples.values())
+
+    _run_config(kwargs, options, trace_memory=True)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "config": name,
+        "hooks": _hook_stats(driver.samples),
+        "callbacks": callbacks,
+        "callbacks_per_sec": callbacks / elapsed,
+        "events_written": events,
+        "events_per_sec": events / elapsed,
+        "bytes_written": written,
+        "peak_memory_kib": peak / 1024,
+        "wall_sec": elapsed,
+    }
+
+
+def _print_report(result: Dict[str, Any]) -> None:
+    print(
+        f"\n== {result['config']}: {result['callbacks_per_sec']:,.0f} callbacks/s, "
+        f"{result['events_per_sec']:,.0f} events/s, "
+        f"{result['bytes_written'] / 1024:,.0f} KiB written, "
+        f"peak {result['peak_memory_kib']:,.0f} KiB"
+    )
+    print(f"{'hook':<14} {'calls':>7} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'max us':>10}")
+    for hook, stats in result["hooks"].items():
+        print(
+            f"{hook:<14} {stats['calls']:>7} {stats['p50_us']:>9.1f} {stats['p95_us']:>9.1f} "
+            f"{stats['p99_us']:>9.1f} {stats['max_us']:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invocations", type=int, default=200, help="invocations per config")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent invocations")
+    parser.add_argument("--steps", type=int, default=5, help="LLM/tool rounds per invocation")
+    parser.add_argument("--arg-size", type=int, default=4096, help="approx. tool args bytes")
+    parser.add_argument("--result-size", type=int, default=65536, help="approx. result bytes")
+    parser.add_argument("--error-every", type=int, default=10, help="fail every Nth tool call")
+    parser.add_argument(
+        "--config",
+        action="append",
+        choices=sorted(CONFIGS),
+        help="configuration to run (repeatable; default: all)",
+    )
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    options = parser.parse_args()
+
+    results = []
+    for name in options.config or list(CONFIGS):
+        result = bench_config(name, options)
+        _print_report(result)
+        results.append(result)
+
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump({"options": vars(options), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
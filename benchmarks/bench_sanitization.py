@@ -0,0 +1,120 @@
+"""Benchmark sanitize_args against the previous per-pattern implementation.
+
+The legacy implementation below is the sanitizer as it shipped in 0.1.0:
+one regex search per key pattern for every key, and one regex match per
+value pattern for every string.
+
+Usage:
+    python -m benchmarks.bench_sanitization [--number N]
+"""
+
+import argparse
+import re
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from watchtower.utils.sanitization import (
+    SENSITIVE_KEY_PATTERNS,
+    SENSITIVE_VALUE_PATTERNS,
+    sanitize_args,
+)
+
+# === Legacy implementation (0.1.0) ===
+
+_LEGACY_KEY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in SENSITIVE_KEY_PATTERNS]
+_LEGACY_VALUE_PATTERNS = [re.compile(p) for p in SENSITIVE_VALUE_PATTERNS]
+
+
+def legacy_sanitize_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(args, dict):
+        return args
+
+    sanitized: Dict[str, Any] = {}
+    for key, value in args.items():
+        if any(pattern.search(key) for pattern in _LEGACY_KEY_PATTERNS):
+            sanitized[key] = "[REDACTED]"
+        elif isinstance(value, str) and _legacy_is_sensitive_value(value):
+            sanitized[key] = "[REDACTED]"
+        elif isinstance(value, dict):
+            sanitized[key] = legacy_sanitize_args(value)
+        elif isinstance(value, list):
+            sanitized[key] = _legacy_sanitize_list(value)
+        else:
+            sanitized[key] = value
+    return sanitized
+
+
+def _legacy_sanitize_list(items: List[Any]) -> List[Any]:
+    result: List[Any] = []
+    for item in items:
+        if isinstance(item, dict):
+            result.append(legacy_sanitize_args(item))
+        elif isinstance(item, str) and _legacy_is_sensitive_value(item):
+            result.append("[REDACTED]")
+        elif isinstance(item, list):
+            result.append(_legacy_sanitize_list(item))
+        else:
+            result.append(item)
+    return result
+
+
+def _legacy_is_sensitive_value(value: str) -> bool:
+    if len(value) < 10:
+        return False
+    return any(pattern.match(value) for pattern in _LEGACY_VALUE_PATTERNS)
+
+
+# === Workloads ===
+
+
+def _workloads() -> List[Tuple[str, Dict[str, Any]]]:
+    flat = {
+        "query": "latest quarterly revenue for ACME corp",
+        "max_results": 10,
+        "language": "en",
+        "api_key": "sk-" + "a" * 40,
+        "safe_search": True,
+        "region": "us-east-1",
+        "user_agent": "Mozilla/5.0 (X11; Linux x86_64)",
+        "callback_url": "https://example.com/hook",
+    }
+    nested = {
+        "documents": [
+            {
+                "id": f"doc-{i}",
+                "title": f"Document number {i}",
+                "tags": ["finance", "report", "2024"],
+                "metadata": {"author": "someone", "pages": i, "auth_token": "Bearer abc.def"},
+            }
+            for i in range(200)
+        ],
+        "options": {"dedupe": True, "limit": 200},
+    }
+    long_strings = {
+        "content": "lorem ipsum dolor sit amet " * 400,
+        "summary": "a fairly long summary string that is not a credential " * 20,
+        "notes": ["note text that goes on for a while " * 10 for _ in range(50)],
+    }
+    return [("flat (8 keys)", flat), ("nested (200 docs)", nested), ("long strings", long_strings)]
+
+
+def _time(func: Callable[[Dict[str, Any]], Any], args: Dict[str, Any], number: int) -> float:
+    """Best-of-5 seconds per call."""
+    return min(timeit.repeat(lambda: func(args), number=number, repeat=5)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="calls per timing repeat")
+    options = parser.parse_args()
+
+    print(f"{'workload':<20} {'legacy (us)':>12} {'current (us)':>13} {'speedup':>8}")
+    for name, args in _workloads():
+        assert sanitize_args(args) == legacy_sanitize_args(args), f"mismatch on {name}"
+        legacy = _time(legacy_sanitize_args, args, options.number)
+        current = _time(sanitize_args, args, options.number)
+        print(f"{name:<20} {legacy * 1e6:>12.1f} {current * 1e6:>13.1f} {legacy / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
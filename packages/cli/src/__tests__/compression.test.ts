@@ -0,0 +1,119 @@
+import test from 'ava';
+import * as zlib from 'node:zlib';
+
+// Re-implement gzip frame reading for unit testing
+
+// readGzipMember implementation (FEXTRA/FNAME/FCOMMENT/FHCRC headers)
+function readGzipMember(
+	data: Buffer,
+	offset: number,
+): {content: Buffer; end: number} | null {
+	if (
+		data.length - offset < 18 ||
+		data[offset] !== 0x1f ||
+		data[offset + 1] !== 0x8b ||
+		data[offset + 2] !== 8
+	) {
+		return null;
+	}
+
+	const flags = data[offset + 3]!;
+	let pos = offset + 10;
+	if (flags & 0x04) {
+		pos += 2 + data.readUInt16LE(pos);
+	}
+
+	for (const flag of [0x08, 0x10]) {
+		if (flags & flag) {
+			const nul = data.indexOf(0, pos);
+			if (nul < 0) {
+				return null;
+			}
+
+			pos = nul + 1;
+		}
+	}
+
+	if (flags & 0x02) {
+		pos += 2;
+	}
+
+	const {buffer: content, engine} = zlib.inflateRawSync(data.subarray(pos), {
+		info: true,
+	}) as unknown as {
+		buffer: Buffer;
+		engine: {bytesWritten: number};
+	};
+	const end = pos + engine.bytesWritten + 8;
+	if (
+		end > data.length ||
+		data.readUInt32LE(end - 4) !== content.length % 2 ** 32
+	) {
+		return null;
+	}
+
+	return {content, end};
+}
+
+// decompressGzip implementation
+function decompressGzip(data: Buffer): {text: string; damaged: boolean} {
+	const frames: Buffer[] = [];
+	let offset = 0;
+	let damaged = false;
+
+	while (offset < data.length) {
+		let member: {content: Buffer; end: number} | null;
+		try {
+			member = readGzipMember(data, offset);
+		} catch {
+			member = null;
+		}
+
+		if (!member) {
+			damaged = true;
+			break;
+		}
+
+		frames.push(member.content);
+		offset = member.end;
+	}
+
+	return {text: Buffer.concat(frames).toString('utf8'), damaged};
+}
+
+// One gzip member per flushed batch, as the Python writer appends them
+const batch1 = zlib.gzipSync('{"type":"run.start"}\n{"type":"llm.request"}\n');
+const batch2 = zlib.gzipSync('{"type":"llm.response"}\n'.repeat(20));
+
+test('decompressGzip reads every member', t => {
+	const result = decompressGzip(Buffer.concat([batch1, batch2]));
+
+	t.false(result.damaged);
+	t.is(result.text.split('\n').filter(Boolean).length, 22);
+});
+
+test('decompressGzip skips a truncated final member', t => {
+	for (const cut of [3, batch2.length / 2, batch2.length - 1]) {
+		const result = decompressGzip(
+			Buffer.concat([batch1, batch2.subarray(0, Math.floor(cut))]),
+		);
+
+		t.true(result.damaged);
+		t.is(result.text, '{"type":"run.start"}\n{"type":"llm.request"}\n');
+	}
+});
+
+test('decompressGzip stops at a corrupt member', t => {
+	const corrupt = Buffer.from(batch2);
+	const sizeByte = corrupt.length - 2; // In the trailer's uncompressed size
+	corrupt.writeUInt8(corrupt.readUInt8(sizeByte) ^ 0xff, sizeByte);
+
+	const result = decompressGzip(Buffer.concat([batch1, corrupt, batch1]));
+
+	t.true(result.damaged);
+	t.is(result.text, '{"type":"run.start"}\n{"type":"llm.request"}\n');
+});
+
+test('decompressGzip handles an empty file', t => {
+	t.deepEqual(decompressGzip(Buffer.alloc(0)), {text: '', damaged: false});
+});
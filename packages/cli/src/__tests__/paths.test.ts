@@ -1,4 +1,6 @@
 import test from 'ava';
+import * as fs from 'node:fs';
+import * as os from 'node:os';
 import * as path from 'node:path';
 
 // Re-implement path functions for unit testing
@@ -8,7 +10,10 @@ function parseTraceFilename(filename: string): {
 	date: string;
 	runId: string;
 } | null {
-	const match = /^(\d{4}-\d{2}-\d{2})_([a-zA-Z0-9]+)\.jsonl$/.exec(filename);
+	const match =
+		/^(\d{4}-\d{2}-\d{2})_([a-zA-Z0-9]+)(?:\.\d+)?\.jsonl(?:\.gz|\.zst)?$/.exec(
+			filename,
+		);
 	if (!match) {
 		return null;
 	}
@@ -19,6 +24,41 @@ function parseTraceFilename(filename: string): {
 	};
 }
 
+// findTraceFiles implementation (flat layout and YYYY/MM/DD[/agent] partitions)
+const PARTITION_PATTERNS = [
+	/^\d{4}$/,
+	/^\d{2}$/,
+	/^\d{2}$/,
+	/^[A-Za-z0-9_-]+$/,
+];
+
+function findTraceFiles(traceDir: string): string[] {
+	const found: string[] = [];
+	const pending: Array<{dir: string; depth: number}> = [
+		{dir: traceDir, depth: 0},
+	];
+
+	while (pending.length > 0) {
+		const {dir, depth} = pending.pop()!;
+		for (const entry of fs.readdirSync(dir, {withFileTypes: true})) {
+			const entryPath = path.join(dir, entry.name);
+			if (entry.isDirectory()) {
+				if (PARTITION_PATTERNS[depth]?.test(entry.name)) {
+					pending.push({dir: entryPath, depth: depth + 1});
+				}
+
+				continue;
+			}
+
+			if (parseTraceFilename(entry.name)) {
+				found.push(path.relative(traceDir, entryPath));
+			}
+		}
+	}
+
+	return found.sort();
+}
+
 // isWithinTraceDir implementation
 function isWithinTraceDir(filePath: string, traceDir: string): boolean {
 	const resolvedPath = path.resolve(filePath);
@@ -91,6 +131,38 @@ test('parseTraceFilename handles mixed case run ID', t => {
 	});
 });
 
+test('parseTraceFilename handles per-process file of a forked worker', t => {
+	const result = parseTraceFilename('2024-01-15_abc123.4242.jsonl');
+
+	t.deepEqual(result, {
+		date: '2024-01-15',
+		runId: 'abc123',
+	});
+});
+
+test('parseTraceFilename handles compressed traces', t => {
+	for (const filename of [
+		'2024-01-15_abc123.jsonl.gz',
+		'2024-01-15_abc123.jsonl.zst',
+		'2024-01-15_abc123.4242.jsonl.gz',
+	]) {
+		t.deepEqual(parseTraceFilename(filename), {
+			date: '2024-01-15',
+			runId: 'abc123',
+		});
+	}
+});
+
+test('parseTraceFilename invalid format - index sidecar', t => {
+	t.is(parseTraceFilename('2024-01-15_abc123.jsonl.idx'), null);
+	t.is(parseTraceFilename('2024-01-15_abc123.jsonl.gz.idx'), null);
+});
+
+test('parseTraceFilename invalid format - non-numeric pid', t => {
+	const result = parseTraceFilename('2024-01-15_abc123.x42.jsonl');
+	t.is(result, null);
+});
+
 // isWithinTraceDir tests
 test('isWithinTraceDir valid path within trace dir', t => {
 	const traceDir = '/home/user/.watchtower/traces';
@@ -127,6 +199,29 @@ test('isWithinTraceDir parent directory blocked', t => {
 	t.false(isWithinTraceDir(parentPath, traceDir));
 });
 
+// findTraceFiles tests
+test('findTraceFiles walks date and agent partitions', t => {
+	const traceDir = fs.mkdtempSync(path.join(os.tmpdir(), 'watchtower-'));
+	const files = [
+		'2024-01-14_flat1.jsonl',
+		'2024/01/15/2024-01-15_day1.jsonl',
+		'2024/01/15/my_agent/2024-01-15_agent1.jsonl',
+		'dead_letter/2024-01-15_dead1.jsonl',
+		'2024/01/15/my_agent/nested/2024-01-15_deep1.jsonl',
+	];
+	for (const file of files) {
+		fs.mkdirSync(path.dirname(path.join(traceDir, file)), {recursive: true});
+		fs.writeFileSync(path.join(traceDir, file), '');
+	}
+
+	t.deepEqual(findTraceFiles(traceDir), [
+		'2024-01-14_flat1.jsonl',
+		'2024/01/15/2024-01-15_day1.jsonl',
+		'2024/01/15/my_agent/2024-01-15_agent1.jsonl',
+	]);
+	fs.rmSync(traceDir, {recursive: true, force: true});
+});
+
 // Date filtering tests
 test('date string comparison works for filtering', t => {
 	const dates = ['2024-01-15', '2024-01-16', '2024-01-14'];
@@ -6,12 +6,13 @@ import React, {useState, useEffect} from 'react';
 import {Box, Text, useInput, useApp} from 'ink';
 import * as fs from 'node:fs';
 import * as path from 'node:path';
-import {getTraceDir} from '../lib/paths.js';
+import {
+	getTraceDir,
+	findTraceFiles,
+	removeEmptyPartitions,
+} from '../lib/paths.js';
 import {formatFileSize} from '../lib/theme.js';
 
-// Trace file pattern: {date}_{run_id}.jsonl
-const TRACE_FILE_PATTERN = /^(\d{4}-\d{2}-\d{2})_([a-zA-Z0-9]+)\.jsonl$/;
-
 interface CleanCommandProps {
 	dryRun?: boolean;
 	all?: boolean;
@@ -26,43 +27,11 @@ interface TraceFile {
 }
 
 function listExpiredTraces(retentionDays: number): TraceFile[] {
-	const traceDir = getTraceDir();
-
-	if (!fs.existsSync(traceDir)) {
-		return [];
-	}
-
 	const cutoffDate = new Date();
 	cutoffDate.setDate(cutoffDate.getDate() - retentionDays);
 	const cutoffStr = cutoffDate.toISOString().split('T')[0]!;
 
-	const expired: TraceFile[] = [];
-
-	const entries = fs.readdirSync(traceDir);
-	for (const entry of entries) {
-		const match = TRACE_FILE_PATTERN.exec(entry);
-		if (!match) {
-			continue;
-		}
-
-		const dateStr = match[1]!;
-		if (dateStr < cutoffStr) {
-			const filePath = path.join(traceDir, entry);
-			try {
-				const stats = fs.statSync(filePath);
-				expired.push({
-					path: filePath,
-					date: dateStr,
-					size: stats.size,
-				});
-			} catch {
-				// File may have been deleted
-				continue;
-			}
-		}
-	}
-
-	return expired;
+	return listAllTraces().filter(trace => trace.date < cutoffStr);
 }
 
 function listAllTraces(): TraceFile[] {
@@ -74,22 +43,17 @@ function listAllTraces(): TraceFile[] {
 
 	const traces: TraceFile[] = [];
 
-	const entries = fs.readdirSync(traceDir);
-	for (const entry of entries) {
-		const match = TRACE_FILE_PATTERN.exec(entry);
-		if (!match) {
-			continue;
-		}
-
-		const filePath = path.join(traceDir, entry);
+	// Flat layout and date partitions (YYYY/MM/DD[/agent])
+	for (const file of findTraceFiles(traceDir)) {
 		try {
-			const stats = fs.statSync(filePath);
+			const stats = fs.statSync(file.path);
 			traces.push({
-				path: filePath,
-				date: match[1]!,
+				path: file.path,
+				date: file.date,
 				size: stats.size,
 			});
 		} catch {
+			// File may have been deleted
 			continue;
 		}
 	}
@@ -181,6 +145,7 @@ export function CleanCommand({
 			for (const file of filesToDelete) {
 				try {
 					fs.unlinkSync(file.path);
+					removeEmptyPartitions(file.path);
 					count++;
 					bytes += file.size;
 				} catch (err) {
@@ -0,0 +1,167 @@
+/**
+ * Compressed trace file reading (.jsonl.gz / .jsonl.zst)
+ *
+ * Compressed traces are a concatenation of independent frames (gzip members
+ * or zstd frames), one per flushed batch, so a crash while appending can only
+ * damage the last frame. As in the Python reader, a truncated or corrupt
+ * frame ends the file: every complete frame before it is returned.
+ */
+
+import * as fs from 'node:fs';
+import * as path from 'node:path';
+import * as zlib from 'node:zlib';
+import type {Transform} from 'node:stream';
+
+// Gzip header flags (RFC 1952)
+const GZIP_FHCRC = 0x02;
+const GZIP_FEXTRA = 0x04;
+const GZIP_FNAME = 0x08;
+const GZIP_FCOMMENT = 0x10;
+
+// Fixed gzip header and trailer sizes
+const GZIP_HEADER_SIZE = 10;
+const GZIP_TRAILER_SIZE = 8;
+
+// zlib APIs missing from older Node.js releases (crc32: 20.15, zstd: 22.15)
+const optionalZlib = zlib as unknown as {
+	crc32?: (data: Uint8Array) => number;
+	createZstdDecompress?: () => Transform;
+};
+
+export type DecompressedTrace = {
+	data: Buffer;
+	damaged: boolean; // A truncated or corrupt frame was skipped
+};
+
+// Check if a trace file is compressed
+export function isCompressedTrace(filePath: string): boolean {
+	return filePath.endsWith('.jsonl.gz') || filePath.endsWith('.jsonl.zst');
+}
+
+// Decompress the gzip member at offset, or return null if it is truncated or corrupt
+function readGzipMember(
+	data: Buffer,
+	offset: number,
+): {content: Buffer; end: number} | null {
+	if (
+		data.length - offset < GZIP_HEADER_SIZE + GZIP_TRAILER_SIZE ||
+		data[offset] !== 0x1f ||
+		data[offset + 1] !== 0x8b ||
+		data[offset + 2] !== 8
+	) {
+		return null;
+	}
+
+	const flags = data[offset + 3]!;
+	let pos = offset + GZIP_HEADER_SIZE;
+	if (flags & GZIP_FEXTRA) {
+		pos += 2 + data.readUInt16LE(pos);
+	}
+
+	for (const flag of [GZIP_FNAME, GZIP_FCOMMENT]) {
+		if (flags & flag) {
+			const nul = data.indexOf(0, pos);
+			if (nul < 0) {
+				return null;
+			}
+
+			pos = nul + 1;
+		}
+	}
+
+	if (flags & GZIP_FHCRC) {
+		pos += 2;
+	}
+
+	// With info, engine.bytesWritten is the compressed size of this member alone
+	const {buffer: content, engine} = zlib.inflateRawSync(data.subarray(pos), {
+		info: true,
+	}) as unknown as {
+		buffer: Buffer;
+		engine: {bytesWritten: number};
+	};
+	const end = pos + engine.bytesWritten + GZIP_TRAILER_SIZE;
+	if (
+		end > data.length ||
+		data.readUInt32LE(end - 4) !== content.length % 2 ** 32 ||
+		(optionalZlib.crc32 &&
+			data.readUInt32LE(end - 8) !== optionalZlib.crc32(content))
+	) {
+		return null;
+	}
+
+	return {content, end};
+}
+
+// Decompress a .jsonl.gz trace member by member
+function decompressGzip(data: Buffer): DecompressedTrace {
+	const frames: Buffer[] = [];
+	let offset = 0;
+	let damaged = false;
+
+	while (offset < data.length) {
+		let member: {content: Buffer; end: number} | null;
+		try {
+			member = readGzipMember(data, offset);
+		} catch {
+			// Truncated deflate stream or header
+			member = null;
+		}
+
+		if (!member) {
+			damaged = true;
+			break;
+		}
+
+		frames.push(member.content);
+		offset = member.end;
+	}
+
+	return {data: Buffer.concat(frames), damaged};
+}
+
+// Decompress a .jsonl.zst trace, keeping the whole lines decoded before any damage
+async function decompressZstd(
+	filePath: string,
+	data: Buffer,
+): Promise<DecompressedTrace> {
+	if (!optionalZlib.createZstdDecompress) {
+		throw new Error(
+			`Cannot read ${path.basename(filePath)}: zstd traces need Node.js 22.15 or later ` +
+				`(or decompress the file with 'zstd -d' first)`,
+		);
+	}
+
+	const decompressor = optionalZlib.createZstdDecompress();
+	const chunks: Buffer[] = [];
+	let damaged = false;
+
+	decompressor.end(data);
+	try {
+		for await (const chunk of decompressor) {
+			chunks.push(chunk as Buffer);
+		}
+	} catch {
+		damaged = true;
+	}
+
+	let content = Buffer.concat(chunks);
+	if (damaged) {
+		// Output of the damaged frame ends mid-line: keep whole lines only
+		content = content.subarray(0, content.lastIndexOf(0x0a) + 1);
+	}
+
+	return {data: content, damaged};
+}
+
+// Read and decompress a compressed trace file
+export async function decompressTrace(
+	filePath: string,
+): Promise<DecompressedTrace> {
+	const data = await fs.promises.readFile(filePath);
+	if (filePath.endsWith('.zst')) {
+		return decompressZstd(filePath, data);
+	}
+
+	return decompressGzip(data);
+}
@@ -4,6 +4,7 @@
 
 import * as fs from 'node:fs';
 import * as readline from 'node:readline';
+import {decompressTrace, isCompressedTrace} from './compression.js';
 import type {TraceEvent, TraceSummary, EventType} from './types.js';
 
 // Valid event types for validation
@@ -114,13 +115,23 @@ export async function parseTraceFile(filePath: string): Promise<{
 	const events: TraceEvent[] = [];
 	let parseErrors = 0;
 
-	const fileStream = fs.createReadStream(filePath);
-	const rl = readline.createInterface({
-		input: fileStream,
-		crlfDelay: Infinity,
-	});
+	let lines: AsyncIterable<string> | Iterable<string>;
+	if (isCompressedTrace(filePath)) {
+		// .jsonl.gz / .jsonl.zst: a damaged final frame counts as one error
+		const {data, damaged} = await decompressTrace(filePath);
+		lines = data.toString('utf8').split('\n');
+		if (damaged) {
+			parseErrors++;
+		}
+	} else {
+		const fileStream = fs.createReadStream(filePath);
+		lines = readline.createInterface({
+			input: fileStream,
+			crlfDelay: Infinity,
+		});
+	}
 
-	for await (const line of rl) {
+	for await (const line of lines) {
 		const event = parseLine(line);
 		if (event) {
 			events.push(event);
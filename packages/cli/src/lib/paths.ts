@@ -64,22 +64,40 @@ export function ensureTraceDir(): string {
 	return traceDir;
 }
 
+// Trace file extensions: plain JSONL, or gzip/zstd compressed
+const TRACE_EXTENSION_PATTERN = /\.jsonl(?:\.gz|\.zst)?$/;
+
 // Check if a path is a valid trace file
 export function isTraceFile(filePath: string): boolean {
 	return (
-		filePath.endsWith('.jsonl') &&
+		TRACE_EXTENSION_PATTERN.test(filePath) &&
 		fs.existsSync(filePath) &&
 		fs.statSync(filePath).isFile()
 	);
 }
 
+// Trace filename: {date}_{run_id}.jsonl, or {date}_{run_id}.{pid}.jsonl
+// for the per-process files of forked workers sharing a run ID, optionally
+// compressed (.jsonl.gz / .jsonl.zst)
+export const TRACE_FILE_PATTERN =
+	/^(\d{4}-\d{2}-\d{2})_([a-zA-Z0-9]+)(?:\.\d+)?\.jsonl(?:\.gz|\.zst)?$/;
+
+// Partition directory names by depth below the trace directory: YYYY/MM/DD,
+// plus an optional agent directory inside each day
+const PARTITION_PATTERNS = [
+	/^\d{4}$/,
+	/^\d{2}$/,
+	/^\d{2}$/,
+	/^[A-Za-z0-9_-]+$/,
+];
+
 // Parse trace filename to extract run ID and date
 // Format: {date}_{run_id}.jsonl (e.g., 2024-01-15_abc123.jsonl)
 export function parseTraceFilename(filename: string): {
 	date: string;
 	runId: string;
 } | null {
-	const match = /^(\d{4}-\d{2}-\d{2})_([a-zA-Z0-9]+)\.jsonl$/.exec(filename);
+	const match = TRACE_FILE_PATTERN.exec(filename);
 	if (!match) {
 		return null;
 	}
@@ -90,6 +108,67 @@ export function parseTraceFilename(filename: string): {
 	};
 }
 
+// A trace file found by findTraceFiles()
+export interface TraceFileEntry {
+	path: string;
+	date: string;
+	runId: string;
+}
+
+// Find trace files in the flat layout and in date partitions (YYYY/MM/DD[/agent])
+export function findTraceFiles(traceDir: string): TraceFileEntry[] {
+	const found: TraceFileEntry[] = [];
+	const pending: Array<{dir: string; depth: number}> = [
+		{dir: traceDir, depth: 0},
+	];
+
+	while (pending.length > 0) {
+		const {dir, depth} = pending.pop()!;
+		let entries: fs.Dirent[];
+		try {
+			entries = fs.readdirSync(dir, {withFileTypes: true});
+		} catch {
+			// Directory may have been deleted since its parent was listed
+			continue;
+		}
+
+		for (const entry of entries) {
+			const entryPath = path.join(dir, entry.name);
+			if (entry.isDirectory()) {
+				// Symlinked directories are never followed (isDirectory() is false)
+				if (PARTITION_PATTERNS[depth]?.test(entry.name)) {
+					pending.push({dir: entryPath, depth: depth + 1});
+				}
+
+				continue;
+			}
+
+			const parsed = parseTraceFilename(entry.name);
+			if (parsed) {
+				found.push({path: entryPath, ...parsed});
+			}
+		}
+	}
+
+	return found;
+}
+
+// Remove partition directories left empty after deleting a trace file
+export function removeEmptyPartitions(filePath: string): void {
+	const traceDir = path.resolve(getTraceDir());
+	let dir = path.dirname(path.resolve(filePath));
+	while (dir !== traceDir && isWithinTraceDir(dir, traceDir)) {
+		try {
+			fs.rmdirSync(dir);
+		} catch {
+			// Not empty (or already gone): stop at the first one that stays
+			return;
+		}
+
+		dir = path.dirname(dir);
+	}
+}
+
 // Resolve a trace reference to an absolute file path
 // Accepts: "last", run ID (e.g., "abc123"), or file path
 export async function resolveTracePath(traceRef: string): Promise<string> {
@@ -115,8 +194,8 @@ export async function resolveTracePath(traceRef: string): Promise<string> {
 		return resolved;
 	}
 
-	// If it ends with .jsonl, treat as filename
-	if (traceRef.endsWith('.jsonl')) {
+	// If it ends with .jsonl (or .jsonl.gz / .jsonl.zst), treat as filename
+	if (TRACE_EXTENSION_PATTERN.test(traceRef)) {
 		const resolved = path.join(traceDir, traceRef);
 
 		// Security: Verify the resolved path is still within trace directory
@@ -128,11 +207,19 @@ export async function resolveTracePath(traceRef: string): Promise<string> {
 			);
 		}
 
-		if (!fs.existsSync(resolved)) {
+		if (fs.existsSync(resolved)) {
+			return resolved;
+		}
+
+		// Partitioned layouts keep the file in a YYYY/MM/DD[/agent] directory
+		const partitioned = findTraceFiles(traceDir).find(
+			file => path.basename(file.path) === traceRef,
+		);
+		if (!partitioned) {
 			throw new Error(`Trace file not found: ${resolved}`);
 		}
 
-		return resolved;
+		return partitioned.path;
 	}
 
 	// Handle "last" - get most recent trace
@@ -150,11 +237,25 @@ export async function resolveTracePath(traceRef: string): Promise<string> {
 		throw new Error(`Trace directory not found: ${traceDir}`);
 	}
 
-	const entries = fs.readdirSync(traceDir);
-	const matchingFile = entries.find(entry => {
-		const parsed = parseTraceFilename(entry);
-		return parsed && parsed.runId === traceRef;
-	});
+	// Forked workers sharing a run ID each write their own file; take the newest
+	let matchingFile: string | undefined;
+	let matchingMtime = -1;
+	for (const file of findTraceFiles(traceDir)) {
+		if (file.runId !== traceRef) {
+			continue;
+		}
+
+		try {
+			const mtime = fs.statSync(file.path).mtimeMs;
+			if (mtime > matchingMtime) {
+				matchingFile = file.path;
+				matchingMtime = mtime;
+			}
+		} catch {
+			// File was deleted between readdir and stat
+			continue;
+		}
+	}
 
 	if (!matchingFile) {
 		throw new Error(
@@ -162,7 +263,7 @@ export async function resolveTracePath(traceRef: string): Promise<string> {
 		);
 	}
 
-	return path.join(traceDir, matchingFile);
+	return matchingFile;
 }
 
 // List trace files with optional filtering
@@ -181,29 +282,21 @@ export async function listTraceFiles(
 		return [];
 	}
 
-	const entries = fs.readdirSync(traceDir);
 	const traceFiles: TraceFileInfo[] = [];
 
-	for (const entry of entries) {
-		const parsed = parseTraceFilename(entry);
-		if (!parsed) {
-			continue;
-		}
-
+	for (const file of findTraceFiles(traceDir)) {
 		// Filter by date if specified
-		if (since && parsed.date < since) {
+		if (since && file.date < since) {
 			continue;
 		}
 
-		const filePath = path.join(traceDir, entry);
-
 		// Handle TOCTOU race: file may be deleted between readdir and stat
 		try {
-			const stats = fs.statSync(filePath);
+			const stats = fs.statSync(file.path);
 			traceFiles.push({
-				path: filePath,
-				runId: parsed.runId,
-				date: parsed.date,
+				path: file.path,
+				runId: file.runId,
+				date: file.date,
 				size: stats.size,
 				modifiedAt: stats.mtime,
 			});
@@ -72,6 +72,8 @@ export interface ToolEndEvent extends TraceEvent {
 	tool_name: string;
 	duration_ms: number;
 	response_preview: string;
+	response_bytes?: number | null;
+	response_items?: number | null;
 	success: boolean;
 }
 
@@ -104,6 +106,48 @@ export interface RunSummaryData {
 	total_tokens: number;
 	errors: number;
 	tools_used?: string[];
+	dropped_events?: number;
+	sampling?: SamplingData;
+	latency?: LatencyData;
+	overhead?: OverheadData;
+}
+
+// Streaming latency quantiles for one tool or model
+export interface LatencyQuantiles {
+	count: number;
+	p50_ms: number | null;
+	p90_ms: number | null;
+	p99_ms: number | null;
+}
+
+// Per-tool and per-model latency quantiles for a run
+export interface LatencyData {
+	tools?: Record<string, LatencyQuantiles>;
+	models?: Record<string, LatencyQuantiles>;
+}
+
+// Sampling decision recorded in run.end summaries
+export interface SamplingData {
+	sample_rate: number;
+	tail_sampling: boolean;
+	reason: string | null;
+	dropped_runs: number;
+}
+
+// Self-telemetry histogram for one timed section of the plugin
+export interface OverheadHistogram {
+	count: number;
+	total_us: number;
+	max_us: number;
+	p50_us: number;
+	p99_us: number;
+	buckets: number[];
+}
+
+// Time spent by the plugin itself during a run
+export interface OverheadData {
+	total_us: number;
+	sections: Record<string, OverheadHistogram>;
 }
 
 // Aggregated trace summary (computed by CLI)
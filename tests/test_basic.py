@@ -1,17 +1,27 @@
 """Basic tests for watchtower SDK."""
 
+import asyncio
 import json
+import os
 import tempfile
 from pathlib import Path
+from types import SimpleNamespace
 import pytest
 
 from watchtower.models.events import EventType, RunStartEvent
+from watchtower.plugin import AgentTracePlugin
 from watchtower.writers.file_writer import FileWriter
 from watchtower.writers.stdout_writer import StdoutWriter
+from watchtower.writers.background_writer import BackgroundWriter
 from watchtower.collector import EventCollector
 from watchtower.utils.sanitization import sanitize_args
 
 
+def _read_trace(path):
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f]
+
+
 def test_event_creation():
     """Test creating event instances."""
     event = RunStartEvent(
@@ -67,6 +77,619 @@ def test_file_writer():
             assert parsed_event1["run_id"] == "test123"
 
 
+def test_file_writer_keep_open():
+    """Test persistent-descriptor mode appends whole batches and reuses the handle."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(trace_dir=tmpdir, buffer_size=3, keep_open=True)
+
+        for i in range(7):
+            writer.write({"type": "llm.request", "run_id": "keep123", "timestamp": float(i)})
+            if i == 2:
+                first_fd = writer._fds[writer.get_trace_path()]
+        assert writer._fds[writer.get_trace_path()] == first_fd
+
+        # Larger than ATOMIC_APPEND_LIMIT, so the locked path is used
+        writer.write({"type": "tool.end", "run_id": "keep123", "response_preview": "x" * 5000})
+        writer.close()
+        assert not writer._fds
+
+        events = _read_trace(writer.get_trace_path())
+        assert [e["timestamp"] for e in events[:7]] == [float(i) for i in range(7)]
+        assert len(events[7]["response_preview"]) == 5000
+
+
+def test_ring_buffer_policies():
+    """Test ring buffer overflow policies drop in O(1) and count drops."""
+    from watchtower.utils.ring_buffer import RingBuffer
+
+    oldest = RingBuffer(3, policy="drop_oldest")
+    newest = RingBuffer(3, policy="drop_newest")
+    blocking = RingBuffer(3, policy="block", block_timeout=0.01)
+    for i in range(5):
+        oldest.append(i)
+        newest.append(i)
+        blocking.append(i)
+
+    assert oldest.drain() == [2, 3, 4]
+    assert newest.drain() == [0, 1, 2]
+    assert blocking.drain() == [0, 1, 2]
+    assert oldest.dropped == newest.dropped == blocking.dropped == 2
+
+    with pytest.raises(ValueError):
+        RingBuffer(3, policy="sometimes")
+
+
+def test_file_writer_overflow():
+    """Test FileWriter reports drops and the block policy flushes instead."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dropping = FileWriter(trace_dir=tmpdir, buffer_size=100, max_buffer_size=4)
+        blocking = FileWriter(
+            trace_dir=tmpdir, buffer_size=100, max_buffer_size=4, overflow_policy="block"
+        )
+        for i in range(10):
+            dropping.write({"type": "llm.request", "run_id": "drop1", "timestamp": float(i)})
+            blocking.write({"type": "llm.request", "run_id": "block1", "timestamp": float(i)})
+        dropping.flush()
+        blocking.flush()
+
+        assert dropping.get_stats()["dropped_events"] == 6
+        assert [e["timestamp"] for e in _read_trace(dropping.get_trace_path())] == [
+            6.0,
+            7.0,
+            8.0,
+            9.0,
+        ]
+        assert blocking.get_stats()["dropped_events"] == 0
+        assert len(_read_trace(blocking.get_trace_path())) == 10
+
+
+def test_file_writer_adaptive_buffering():
+    """Test the flush threshold grows under load and old events are flushed by age."""
+    import time
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(trace_dir=tmpdir, adaptive=True, max_buffer_age_ms=50)
+        for i in range(5000):
+            writer.write({"type": "tool.start", "run_id": "burst1", "timestamp": float(i)})
+        stats = writer.get_stats()
+        assert 10 < stats["batch_size"] <= 1000
+        assert stats["event_rate"] > 0
+
+        writer.write({"type": "run.end", "run_id": "burst1", "timestamp": 5000.0})
+        time.sleep(0.3)
+        assert writer.get_stats()["buffered_events"] == 0
+        events = _read_trace(writer.get_trace_path())
+        assert len(events) == 5001
+        assert events[-1]["type"] == "run.end"
+        writer.close()
+
+
+def test_file_writer_compression():
+    """Test gzip traces are one frame per batch and survive a torn final frame."""
+    from watchtower.cleanup import TRACE_FILE_PATTERN, get_trace_stats
+    from watchtower.utils.compression import iter_frames, iter_lines
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(tmpdir, buffer_size=2, compression="gzip")
+        for i in range(5):
+            writer.write({"type": "test", "run_id": "abc123", "index": i})
+        writer.flush()
+
+        trace_file = writer.get_trace_path()
+        assert trace_file.name.endswith(".jsonl.gz")
+        assert TRACE_FILE_PATTERN.match(trace_file.name)
+        assert get_trace_stats(tmpdir)["compressed_count"] == 1
+        assert len(list(iter_frames(trace_file))) == 3
+        assert [json.loads(line)["index"] for line in iter_lines(trace_file)] == list(range(5))
+
+        # Simulate a crash in the middle of appending the last frame
+        data = trace_file.read_bytes()
+        trace_file.write_bytes(data[:-10])
+        assert [json.loads(line)["index"] for line in iter_lines(trace_file)] == list(range(4))
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_trace_index_reader(compression):
+    """Test the sidecar index lets TraceReader seek to matching events."""
+    from watchtower.reader import TraceReader
+    from watchtower.utils.trace_index import index_path
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(tmpdir, buffer_size=4, compression=compression, index=True)
+        for i in range(10):
+            event_type = "tool.error" if i % 3 == 0 else "tool.end"
+            writer.write(
+                {
+                    "type": event_type,
+                    "run_id": "abc123",
+                    "timestamp": 100.0 + i,
+                    "tool_name": f"tool{i % 2}",
+                    "index": i,
+                }
+            )
+        writer.flush()
+        trace_file = writer.get_trace_path()
+        assert len(index_path(trace_file).read_bytes().splitlines()) == 3
+
+        reader = TraceReader(trace_file)
+        assert [e["index"] for e in reader.events(types=["tool.error"])] == [0, 3, 6, 9]
+        window = reader.events(tool_name="tool1", start=103, end=108)
+        assert [e["index"] for e in window] == [3, 5, 7]
+
+        # Legacy file: the index is rebuilt on first use and persisted
+        index_path(trace_file).unlink()
+        legacy = TraceReader(trace_file)
+        assert [e["index"] for e in legacy.events(types=["tool.error"])] == [0, 3, 6, 9]
+        assert index_path(trace_file).exists()
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_iter_events_prefilter(compression):
+    """Test the memory-mapped scan decodes only pre-filtered lines."""
+    from watchtower.reader import iter_events, scan_lines
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(tmpdir, buffer_size=100, compression=compression)
+        writer.write({"type": "tool.end", "run_id": "abc123", "result": "no tool.error here"})
+        writer.write({"type": "tool.error", "run_id": "abc123", "tool_name": "search"})
+        writer.write({"type": "tool.error", "run_id": "abc123", "tool_name": "fetch"})
+        writer.flush()
+        trace_file = writer.get_trace_path()
+
+        errors = iter_events(trace_file, types=["tool.error"])
+        assert [e["tool_name"] for e in errors] == ["search", "fetch"]
+        fetch = iter_events(trace_file, types=["tool.error"], contains=b'"fetch"')
+        assert [e["tool_name"] for e in fetch] == ["fetch"]
+        assert len(list(scan_lines(trace_file))) == 3
+
+
+def test_trace_query_parallel():
+    """Test queries prune by file name and merge partial results across workers."""
+    from datetime import datetime, timedelta
+
+    from watchtower.query import TraceQuery, run_query
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        now = datetime.now()
+        for days_ago, run_id in [(0, "run1"), (1, "run2"), (30, "old")]:
+            day = now - timedelta(days=days_ago)
+            base = {"run_id": run_id, "timestamp": day.timestamp()}
+            lines = [
+                dict(base, type="tool.end", tool_name="search", duration_ms=10.0 * (i + 1))
+                for i in range(3)
+            ]
+            lines.append(dict(base, type="tool.error", tool_name="fetch"))
+            path = Path(tmpdir) / f"{day.strftime('%Y-%m-%d')}_{run_id}.jsonl"
+            path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+            os.utime(path, (day.timestamp(), day.timestamp()))
+
+        query = TraceQuery(since=(now - timedelta(days=7)).timestamp())
+        serial = run_query(query, trace_dir=tmpdir, workers=1)
+        parallel = run_query(query, trace_dir=tmpdir, workers=2)
+        for result in (serial, parallel):
+            assert (result.files_scanned, result.files_pruned) == (2, 1)
+            assert result.by_type == {"tool.end": 6, "tool.error": 2}
+            search = result.groups["search"].to_dict()
+            assert search["count"] == 6 and search["mean_ms"] == 20.0
+            assert result.groups["fetch"].errors == 2
+
+        errors = run_query(TraceQuery(types=["tool.error"], run_id="run2"), trace_dir=tmpdir)
+        assert (errors.events_matched, errors.files_pruned) == (1, 2)
+
+
+def test_sqlite_writer_plugin():
+    """Test the plugin writes indexed rows to SQLite alongside trace files."""
+    import sqlite3
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "traces.db"
+        plugin = AgentTracePlugin(trace_dir=tmpdir, sqlite_path=str(db_path))
+        inv = SimpleNamespace(invocation_id="inv1", agent=SimpleNamespace(name="agent"))
+        ctx = SimpleNamespace(invocation_id="inv1", state={}, function_call_id="c1")
+        tool = SimpleNamespace(name="search")
+
+        async def drive():
+            await plugin.before_run_callback(invocation_context=inv)
+            await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=ctx)
+            await plugin.on_tool_error_callback(
+                tool=tool, tool_args={}, tool_context=ctx, error=ValueError("boom")
+            )
+            await plugin.after_run_callback(invocation_context=inv)
+
+        asyncio.run(drive())
+        plugin.shutdown()
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            rows = conn.execute(
+                "SELECT tool_name, json_extract(payload, '$.error_type') FROM events "
+                "WHERE type = 'tool.error'"
+            ).fetchall()
+            assert rows == [("search", "ValueError")]
+            types = [r[0] for r in conn.execute("SELECT type FROM events ORDER BY id")]
+            assert types == ["run.start", "tool.start", "tool.error", "run.end"]
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM events WHERE run_id = 'x'"
+            ).fetchall()
+            assert "idx_events_run_id" in str(plan)
+        assert len(list(Path(tmpdir).glob("*.jsonl"))) == 1
+
+    # Batches drained by concurrent flushes are inserted in drain order
+    import threading
+    import time
+
+    from watchtower.writers.sqlite_writer import SQLiteWriter
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "traces.db"
+        writer = SQLiteWriter(str(db_path), buffer_size=100)
+        drain = writer._buffer.drain
+
+        def slow_drain():
+            items = drain()
+            if threading.current_thread().name == "first":
+                time.sleep(0.1)  # Preempted between draining and inserting
+            return items
+
+        writer._buffer.drain = slow_drain
+        writer.write({"type": "test", "run_id": "run", "index": 0})
+        first = threading.Thread(target=writer.flush, name="first")
+        first.start()
+        time.sleep(0.05)
+        writer.write({"type": "test", "run_id": "run", "index": 1})
+        writer.flush()
+        first.join()
+        writer.close()
+
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT json_extract(payload, '$.index') FROM events ORDER BY id")
+            assert [r[0] for r in rows] == [0, 1]
+
+
+def test_offloaded_writers():
+    """Test offloaded writers flush concurrently without blocking the loop."""
+    import threading
+    import time
+
+    from watchtower.writers.base import TraceWriter
+
+    class SlowWriter(TraceWriter):
+        def __init__(self):
+            self.events = []
+            self.threads = set()
+
+        def write(self, event):
+            self.threads.add(threading.get_ident())
+            self.events.append(event["type"])
+
+        def flush(self):
+            time.sleep(0.2)  # e.g. a network round trip
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        slow = [SlowWriter(), SlowWriter()]
+        plugin = AgentTracePlugin(trace_dir=tmpdir, offload_writes=True, writers=slow)
+        inv = SimpleNamespace(invocation_id="inv1", agent=SimpleNamespace(name="agent"))
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def drive():
+            task = asyncio.create_task(ticker())
+            await plugin.before_run_callback(invocation_context=inv)
+            start = time.monotonic()
+            await plugin.after_run_callback(invocation_context=inv)
+            elapsed = time.monotonic() - start
+            task.cancel()
+            return elapsed
+
+        elapsed = asyncio.run(drive())
+        # Both writers flushed in parallel while the loop kept running
+        assert 0.2 <= elapsed < 0.4
+        assert len(ticks) > 10
+        for writer in slow:
+            assert writer.events == ["run.start", "run.end"]
+            assert threading.get_ident() not in writer.threads
+        trace = plugin.file_writer.get_trace_path()
+        assert len(trace.read_text().splitlines()) == 2
+        plugin.shutdown()
+
+    # A flush pending when the writer is closed still completes
+    from watchtower.writers.async_writer import ThreadOffloadWriter
+
+    async def close_while_flushing():
+        writer = ThreadOffloadWriter(SlowWriter())
+        writer.write({"type": "run.start"})
+        flush = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0)
+        writer.close()
+        await asyncio.wait_for(flush, 2)
+        return writer.writer.events
+
+    assert asyncio.run(close_while_flushing()) == ["run.start"]
+
+    # close() from another thread while the loop runs closes on the loop
+    async def close_from_thread():
+        writer = ThreadOffloadWriter(SlowWriter())
+        for _ in range(3):
+            writer.write({"type": "tool.start"})
+        closer = threading.Thread(target=writer.close)
+        closer.start()
+        time.sleep(0.1)  # Keep the loop busy while close() starts
+        while closer.is_alive():
+            await asyncio.sleep(0.01)
+        return writer, closer.ident
+
+    writer, closer_ident = asyncio.run(close_from_thread())
+    assert writer.writer.events == ["tool.start"] * 3
+    assert closer_ident not in writer.writer.threads
+    assert writer.queue_depth == 0
+
+
+def test_size_quota_retention():
+    """Test the size quota deletes least recently written files and their sidecars."""
+    import time
+
+    from watchtower.cleanup import RetentionTask, enforce_size_quota, scan_trace_files
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        now = time.time()
+        for age, run_id in enumerate(["newest", "middle", "oldest"]):
+            path = Path(tmpdir) / f"2024-01-15_{run_id}.jsonl"
+            path.write_bytes(b"x" * 1000)
+            mtime = now - 3600 * (age + 1)
+            os.utime(path, (mtime, mtime))
+        (Path(tmpdir) / "2024-01-15_oldest.jsonl.idx").write_bytes(b"y" * 100)
+        (Path(tmpdir) / "notes.txt").write_bytes(b"z" * 5000)
+
+        files = {info.run_id: info for info in scan_trace_files(tmpdir)}
+        assert sorted(files) == ["middle", "newest", "oldest"]
+        assert files["oldest"].sidecar_size == 100
+
+        assert enforce_size_quota(tmpdir, max_bytes=2500, dry_run=True) == (1, 1100)
+        assert enforce_size_quota(tmpdir, max_bytes=1500) == (2, 2100)
+        remaining = sorted(p.name for p in Path(tmpdir).iterdir())
+        assert remaining == ["2024-01-15_newest.jsonl", "notes.txt"]
+
+        # The periodic task evicts too, but never files written in the last minute
+        (Path(tmpdir) / "2024-01-15_active.jsonl").write_bytes(b"x" * 1000)
+        task = RetentionTask(tmpdir, max_bytes=0, interval=3600)
+        assert task.run_once() == (1, 1000)
+        task.stop()
+        assert (Path(tmpdir) / "2024-01-15_active.jsonl").exists()
+
+
+def test_trace_manifest(monkeypatch):
+    """Test stats come from the manifest and only new files are stat'ed."""
+    import time
+
+    import watchtower.cleanup as cleanup
+    from watchtower.utils.manifest import MANIFEST_NAME
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(tmpdir, buffer_size=3)
+        for i in range(7):
+            writer.write({"type": "test", "run_id": "abc123", "index": i})
+        writer.flush()
+        assert (Path(tmpdir) / MANIFEST_NAME).exists()
+
+        # A file from a writer that predates the manifest
+        legacy = Path(tmpdir) / "2024-01-01_legacy.jsonl"
+        legacy.write_bytes(b"{}\n" * 4)
+
+        stats = cleanup.get_trace_stats(tmpdir)
+        assert stats["total_count"] == 2
+        assert stats["total_size"] == writer.get_trace_path().stat().st_size + 12
+        assert stats["total_events"] == 7
+
+        # Once synced to an unchanged directory, no listing or stat is needed
+        old = time.time() - 60
+        os.utime(tmpdir, (old, old))
+        cleanup.get_trace_stats(tmpdir)
+
+        def no_scandir(path):
+            raise AssertionError("directory listed")
+
+        monkeypatch.setattr(cleanup.os, "scandir", no_scandir)
+        assert cleanup.get_trace_stats(tmpdir) == stats
+        monkeypatch.undo()
+
+        assert cleanup.cleanup_old_traces(tmpdir, retention_days=30) == (1, 12)
+        assert cleanup.get_trace_stats(tmpdir)["total_count"] == 1
+
+    # A reconcile that sees a file before the writer's coalesced records
+    # must not count its bytes or events twice
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(tmpdir, buffer_size=1, index=True)
+        writer.write({"type": "test", "run_id": "runA"})
+        writer.write({"type": "test", "run_id": "runB"})
+        cleanup.get_trace_stats(tmpdir)
+        writer.flush()
+        traces = list(Path(tmpdir).glob("*.jsonl"))
+        stats = cleanup.get_trace_stats(tmpdir)
+        assert stats["total_size"] == sum(p.stat().st_size for p in traces)
+        assert stats["total_events"] == 2
+
+
+def test_partitioned_layout():
+    """Test date/agent partitions, whole-partition expiry and run lookup."""
+    import time
+
+    import watchtower.cleanup as cleanup
+    from watchtower import TraceQuery, TraceReader, run_query
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = FileWriter(tmpdir, buffer_size=2, layout="date_agent")
+        writer.write({"type": "run.start", "run_id": "abc123", "agent_name": "my agent/1"})
+        writer.write({"type": "tool.start", "run_id": "abc123", "tool_name": "search"})
+        writer.flush()
+        trace_file = writer.get_trace_path()
+        relative = trace_file.relative_to(tmpdir).as_posix()
+        assert relative == time.strftime("%Y/%m/%d/my_agent_1/%Y-%m-%d_abc123.jsonl")
+
+        old_day = Path(tmpdir) / "2024" / "01" / "01"
+        old_day.mkdir(parents=True)
+        (old_day / "2024-01-01_old.jsonl").write_bytes(b"{}\n" * 4)
+
+        for use_manifest in (True, False):
+            files = cleanup.scan_trace_files(tmpdir, use_manifest=use_manifest)
+            assert sorted(info.run_id for info in files) == ["abc123", "old"]
+
+        assert cleanup.find_trace_file("abc123", tmpdir) == trace_file
+        assert cleanup.find_trace_file("old", tmpdir, date="2024-01-01") is not None
+        assert len(TraceReader.for_run("abc123", tmpdir)) == 2
+
+        # Files of forked workers carry their pid
+        forked = trace_file.with_name(time.strftime("%Y-%m-%d_fork123.4242.jsonl"))
+        forked.write_bytes(b'{"type":"run.start","run_id":"fork123"}\n')
+        assert cleanup.find_trace_file("fork123", tmpdir) == forked
+        assert len(TraceReader.for_run("fork123", tmpdir)) == 1
+        forked.unlink()
+        result = run_query(TraceQuery(tool_name="search"), trace_dir=tmpdir, workers=1)
+        assert result.events_matched == 1
+
+        # The expired day goes with one directory removal, empty parents too
+        assert cleanup.cleanup_old_traces(tmpdir, retention_days=30) == (1, 12)
+        assert not (Path(tmpdir) / "2024").exists()
+        assert cleanup.get_trace_stats(tmpdir)["total_count"] == 1
+
+        with pytest.raises(ValueError):
+            FileWriter(tmpdir, layout="hourly")
+
+
+def test_shared_writer_hub():
+    """Test plugins with shared_writers share one FileWriter and thread."""
+    from watchtower.writers.hub import get_writer_hub
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugins = [AgentTracePlugin(trace_dir=tmpdir, shared_writers=True) for _ in range(3)]
+        shared = plugins[0].file_writer.writer
+        assert all(p.file_writer.writer is shared for p in plugins)
+        assert isinstance(shared, FileWriter)
+
+        # Drops in the shared writer are reported once, not charged to every plugin
+        shared._buffer._dropped = 4
+        assert [p._dropped_events_total() for p in plugins] == [0, 0, 0]
+        assert plugins[0].file_writer.get_stats()["shared_dropped_events"] == 4
+        assert get_writer_hub().get_stats()["shared_dropped_events"] == 4
+        shared._buffer._dropped = 0
+
+        for i, plugin in enumerate(plugins):
+            for j in range(5):
+                plugin.file_writer.write({"type": "test", "run_id": f"run{i}", "index": j})
+
+        # The shared writer stays open until its last plugin shuts down
+        plugins[0].shutdown()
+        plugins[1].file_writer.write({"type": "test", "run_id": "run1", "index": 5})
+        plugins[1].shutdown()
+        plugins[2].shutdown()
+        assert plugins[1].file_writer.get_stats()["written_events"] == 6
+        assert get_writer_hub().get_stats()["shared_writers"] == 0
+
+        counts = {}
+        for path in Path(tmpdir).glob("*.jsonl"):
+            counts[path.name.split("_")[1]] = len(path.read_text().splitlines())
+        assert counts == {"run0.jsonl": 5, "run1.jsonl": 6, "run2.jsonl": 5}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_writers_after_fork():
+    """Test forked children drop inherited buffers and write their own files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = BackgroundWriter(FileWriter(tmpdir, buffer_size=100, per_process_files=True))
+        for i in range(3):
+            writer.write({"type": "test", "run_id": "shared", "index": i})
+        writer.flush()  # Still buffered in the FileWriter
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                writer.write({"type": "child", "run_id": "shared"})
+                writer.close()  # Needs the restarted writer thread
+                os._exit(0)
+            finally:
+                os._exit(1)
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+        writer.close()
+        files = {p.name: p.read_text().splitlines() for p in Path(tmpdir).glob("*.jsonl")}
+        child_file = writer.get_trace_path().name.replace(".jsonl", f".{pid}.jsonl")
+        assert len(files[writer.get_trace_path().name]) == 3
+        assert [json.loads(line)["type"] for line in files[child_file]] == ["child"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_plugin_after_fork():
+    """Test workers forked from one plugin trace runs under their own run IDs."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(trace_dir=tmpdir)
+        inv = SimpleNamespace(invocation_id="inv1", agent=SimpleNamespace(name="agent"))
+
+        async def run():
+            await plugin.before_run_callback(invocation_context=inv)
+            await plugin.after_run_callback(invocation_context=inv)
+
+        pids = []
+        for _ in range(3):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    asyncio.run(run())
+                    plugin.shutdown()
+                    os._exit(0)
+                finally:
+                    os._exit(1)
+            pids.append(pid)
+        for pid in pids:
+            _, status = os.waitpid(pid, 0)
+            assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+        paths = list(Path(tmpdir).glob("*.jsonl"))
+        run_ids = {
+            event["run_id"]
+            for path in paths
+            for event in _read_trace(path)
+            if event["type"] == "run.start"
+        }
+        assert len(run_ids) == 3
+        assert plugin.run_id not in run_ids
+        # Run IDs are not shared, so file names carry no pid
+        assert sorted(path.name.split("_")[1] for path in paths) == sorted(
+            f"{run_id}.jsonl" for run_id in run_ids
+        )
+        plugin.shutdown()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_pinned_plugin_after_fork():
+    """Test workers sharing a pinned run ID write per-process files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(trace_dir=tmpdir, run_id="pinned")
+        inv = SimpleNamespace(invocation_id="inv1", agent=SimpleNamespace(name="agent"))
+
+        pids = []
+        for _ in range(2):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    asyncio.run(plugin.before_run_callback(invocation_context=inv))
+                    plugin.shutdown()
+                    os._exit(0)
+                finally:
+                    os._exit(1)
+            pids.append(pid)
+        for pid in pids:
+            _, status = os.waitpid(pid, 0)
+            assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+        names = sorted(path.name.split("_")[1] for path in Path(tmpdir).glob("*.jsonl"))
+        assert names == sorted(f"pinned.{pid}.jsonl" for pid in pids)
+        plugin.shutdown()
+
+
 def test_stdout_writer():
     """Test stdout writer functionality."""
     import io
@@ -97,6 +720,79 @@ def test_stdout_writer():
     assert message["method"] == "tool.start"
     assert message["params"]["run_id"] == "test123"
 
+    # Objects without a JSON form are written as str(obj), other types as in files
+    from datetime import datetime
+
+    class Opaque:
+        def __init__(self):
+            self.secret = "internal"
+
+        def __str__(self):
+            return "<opaque>"
+
+    output.seek(0)
+    output.truncate()
+    writer.write({"type": "tool.end", "result": Opaque(), "when": datetime(2024, 1, 15, 10, 30)})
+    params = json.loads(output.getvalue())["params"]
+    assert params["result"] == "<opaque>"
+    assert params["when"] == "2024-01-15T10:30:00"
+
+
+def test_encode_event():
+    """Test fast encoder matches stdlib type handling and is shared by writers."""
+    import io
+    from datetime import datetime
+    from uuid import UUID
+    from watchtower.exceptions import WatchtowerSerializationError
+    from watchtower.utils.serialization import encode_event, json_dumps_compact
+
+    event = {
+        "type": "tool.start",
+        "run_id": "test123",
+        "when": datetime(2024, 1, 15, 10, 30),
+        "path": Path("/tmp/x"),
+        "id": UUID(int=1),
+        "raw": b"bytes",
+        "tags": {"a"},
+    }
+    data = encode_event(event)
+    assert json.loads(data) == json.loads(json_dumps_compact(event))
+
+    output = io.StringIO()
+    StdoutWriter(stream=output).write_encoded(event, data)
+    message = json.loads(output.getvalue())
+    assert message["method"] == "tool.start"
+    assert message["params"]["when"] == "2024-01-15T10:30:00"
+
+    circular: dict = {"type": "run.end"}
+    circular["self"] = circular
+    with pytest.raises(WatchtowerSerializationError):
+        encode_event(circular)
+
+
+def test_stdout_writer_coalescing():
+    """Test coalescing stdout writer flushes on batch size or max delay."""
+    import io
+    import time
+
+    output = io.StringIO()
+    writer = StdoutWriter(stream=output, batch_size=3, max_delay_ms=20)
+
+    for i in range(4):
+        writer.write({"type": "tool.start", "run_id": "test123", "seq": i})
+    assert len(output.getvalue().splitlines()) == 3
+
+    # The fourth event is written by the timer once max_delay_ms passes
+    deadline = time.monotonic() + 2
+    while len(output.getvalue().splitlines()) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    lines = output.getvalue().splitlines()
+    assert [json.loads(line)["params"]["seq"] for line in lines] == [0, 1, 2, 3]
+
+    writer.write({"type": "tool.end", "run_id": "test123", "seq": 4})
+    writer.close()
+    assert len(output.getvalue().splitlines()) == 5
+
 
 def test_event_collector():
     """Test event collector statistics."""
@@ -152,6 +848,52 @@ def test_sanitize_args():
     assert sanitized["nested"]["data"] == "public_data"
 
 
+def test_sanitize_values_and_nested_lists():
+    """Test credential-shaped values are redacted anywhere in nested data."""
+    args = {
+        "config": {"headers": ["Bearer abc.def-123", "text/plain"]},
+        "items": [{"note": "sk-" + "a" * 24}, ["ghp_" + "b" * 36]],
+        "label": "skeleton key",
+        42: "numeric key",
+    }
+
+    sanitized = sanitize_args(args)
+
+    assert sanitized["config"]["headers"] == ["[REDACTED]", "text/plain"]
+    assert sanitized["items"] == [{"note": "[REDACTED]"}, ["[REDACTED]"]]
+    assert sanitized["label"] == "skeleton key"
+    assert sanitized[42] == "numeric key"
+    assert args["config"]["headers"][0].startswith("Bearer")
+
+
+def test_truncate_response_bounded():
+    """Test previews match str() without stringifying the whole response."""
+    from watchtower.utils.preview import measure_response
+    from watchtower.utils.sanitization import truncate_response
+
+    small = {"results": [{"title": "it's", "score": 0.5}], "ok": True, "next": None}
+    assert truncate_response(small) == str(small)
+
+    big = {"doc": "line of text " * 200000, "pages": list(range(1000))}
+    assert truncate_response(big, max_length=50) == str(big)[:50] + "..."
+
+    class Tracked:
+        reprs = 0
+
+        def __repr__(self):
+            Tracked.reprs += 1
+            return "<Tracked>"
+
+    items = [Tracked() for _ in range(10000)]
+    assert truncate_response(items, max_length=40) == str(items)[:40] + "..."
+    Tracked.reprs = 0
+    truncate_response(items, max_length=40)
+    assert Tracked.reprs < 10
+
+    assert measure_response(big) == (len(big["doc"]) + len("docpages") + 2890, 2)
+    assert measure_response("héllo") == (6, None)
+
+
 def test_create_event():
     """Test event creation via collector."""
     collector = EventCollector()
@@ -169,5 +911,331 @@ def test_create_event():
     assert event["message_count"] == 3
 
 
+def test_background_writer():
+    """Test background writer drains events to the wrapped writer on flush."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = BackgroundWriter(FileWriter(trace_dir=tmpdir, buffer_size=100))
+
+        for i in range(5):
+            writer.write({"type": "llm.request", "run_id": "bg123", "timestamp": float(i)})
+        writer.flush()
+
+        trace_path = writer.get_trace_path()
+        assert trace_path is not None
+        with open(trace_path, "r") as f:
+            assert len(f.readlines()) == 5
+
+        stats = writer.get_stats()
+        assert stats["queue_depth"] == 0
+        assert stats["written_events"] == 5
+        assert stats["dropped_events"] == 0
+
+        writer.close()
+        writer.write({"type": "llm.request", "run_id": "bg123"})
+        assert writer.dropped_events == 1
+
+
+def test_background_writer_drops_when_full():
+    """Test background writer counts drops instead of blocking when full."""
+    import io
+    import threading
+
+    release = threading.Event()
+
+    class SlowWriter(StdoutWriter):
+        def write(self, event):
+            release.wait(5)
+
+    writer = BackgroundWriter(SlowWriter(stream=io.StringIO()), max_queue_size=2)
+    for _ in range(10):
+        writer.write({"type": "tool.start", "run_id": "bg123"})
+
+    assert writer.dropped_events >= 7
+    release.set()
+    writer.close()
+
+
+def test_writer_queue_policies():
+    """Test a stalled writer's own queue samples events and reports lag."""
+    import io
+    import threading
+    import time
+
+    from watchtower.exceptions import WatchtowerConfigError
+
+    release = threading.Event()
+
+    class StalledWriter(StdoutWriter):
+        def write_encoded(self, event, data):
+            release.wait(5)
+            super().write_encoded(event, data)
+
+    output = io.StringIO()
+    writer = BackgroundWriter(StalledWriter(stream=output), max_queue_size=20, policy="sample")
+    for _ in range(100):
+        writer.write_encoded({"type": "tool.start"}, b'{"type":"tool.start"}')
+    writer.write_encoded({"type": "run.end"}, b'{"type":"run.end"}')
+    time.sleep(0.02)
+
+    stats = writer.get_stats()
+    assert stats["queue_depth"] <= 20
+    assert stats["dropped_events"] > 70
+    assert stats["lag_ms"] >= 20
+    release.set()
+    writer.close()
+    methods = [json.loads(line)["method"] for line in output.getvalue().splitlines()]
+    assert methods[-1] == "run.end"  # Never sampled out
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(
+            trace_dir=tmpdir,
+            enable_stdout=True,
+            writer_queues={"file": "block", "stdout": "drop_oldest"},
+        )
+        assert plugin.file_writer.policy == "block"
+        assert plugin.stdout_writer.policy == "drop_oldest"
+        assert set(plugin.get_writer_stats()) == {"file", "stdout"}
+        assert "lag_ms" in plugin.get_writer_stats()["stdout"]
+        plugin.shutdown()
+
+        with pytest.raises(WatchtowerConfigError):
+            AgentTracePlugin(trace_dir=tmpdir, writer_queues={"stdout": "shed"})
+
+
+def test_plugin_concurrent_invocations():
+    """Test concurrent invocations keep separate stats, timings and run IDs."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(trace_dir=tmpdir)
+        tool = SimpleNamespace(name="search")
+
+        async def drive():
+            agent = SimpleNamespace(name="agent")
+            inv1 = SimpleNamespace(invocation_id="inv1", agent=agent)
+            inv2 = SimpleNamespace(invocation_id="inv2", agent=agent)
+            await plugin.before_run_callback(invocation_context=inv1)
+            await plugin.before_run_callback(invocation_context=inv2)
+
+            ctx1 = SimpleNamespace(invocation_id="inv1", state={}, function_call_id="c1")
+            ctx2 = SimpleNamespace(invocation_id="inv2", state={}, function_call_id="c2")
+            await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=ctx1)
+            await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=ctx2)
+            await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=ctx2)
+
+            await plugin.after_run_callback(invocation_context=inv1)
+            assert list(plugin._invocations) == ["inv2"]
+            await plugin.after_run_callback(invocation_context=inv2)
+
+        asyncio.run(drive())
+        assert not plugin._invocations
+
+        traces = sorted(Path(tmpdir).glob("*.jsonl"))
+        assert len(traces) == 2
+        ends = {}
+        for trace in traces:
+            events = _read_trace(trace)
+            assert len({e["run_id"] for e in events}) == 1
+            ends[events[-1]["invocation_id"]] = events[-1]["summary"]
+        assert ends["inv1"]["tool_calls"] == 1
+        assert ends["inv2"]["tool_calls"] == 2
+
+
+def test_plugin_evicts_abandoned_invocations():
+    """Test invocations that never finish are evicted after the TTL."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(trace_dir=tmpdir, invocation_ttl=0)
+        agent = SimpleNamespace(name="agent")
+
+        async def drive():
+            for i in range(3):
+                inv = SimpleNamespace(invocation_id=f"inv{i}", agent=agent)
+                await plugin.before_run_callback(invocation_context=inv)
+
+        asyncio.run(drive())
+        assert list(plugin._invocations) == ["inv2"]
+        assert plugin._evicted_invocations == 2
+
+        # An evicted invocation finishing gets no run.end (it has no run.start)
+        inv0 = SimpleNamespace(invocation_id="inv0", agent=agent)
+        asyncio.run(plugin.after_run_callback(invocation_context=inv0))
+        assert list(plugin._invocations) == ["inv2"]
+
+        # Nor does an ADK event for it recreate its state
+        event = SimpleNamespace(author="agent", actions=SimpleNamespace(state_delta={"k": 1}))
+        asyncio.run(plugin.on_event_callback(invocation_context=inv0, event=event))
+        assert list(plugin._invocations) == ["inv2"]
+        plugin.shutdown()
+        ends = [
+            event
+            for path in Path(tmpdir).glob("*.jsonl")
+            for event in _read_trace(path)
+            if event["type"] == "run.end"
+        ]
+        assert ends == []
+
+
+def test_plugin_sampling():
+    """Test head sampling is deterministic and tail sampling keeps failed runs."""
+    from watchtower.sampling import Sampler
+
+    sampler = Sampler(sample_rate=0.25)
+    run_ids = [f"run{i}" for i in range(2000)]
+    kept = [run_id for run_id in run_ids if sampler.head_sample(run_id)]
+    assert kept == [run_id for run_id in run_ids if sampler.head_sample(run_id)]
+    assert 400 < len(kept) < 600
+    assert Sampler(sample_rate=0.0).head_sample("run0") is False
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(trace_dir=tmpdir, tail_sampling=True)
+        agent = SimpleNamespace(name="agent")
+        tool = SimpleNamespace(name="search")
+
+        async def drive(invocation_id, fail):
+            inv = SimpleNamespace(invocation_id=invocation_id, agent=agent)
+            ctx = SimpleNamespace(invocation_id=invocation_id, state={}, function_call_id="c")
+            await plugin.before_run_callback(invocation_context=inv)
+            await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=ctx)
+            if fail:
+                await plugin.on_tool_error_callback(
+                    tool=tool, tool_args={}, tool_context=ctx, error=ValueError("boom")
+                )
+            await plugin.after_run_callback(invocation_context=inv)
+
+        asyncio.run(drive("ok", fail=False))
+        assert not list(Path(tmpdir).glob("*.jsonl"))
+
+        asyncio.run(drive("failed", fail=True))
+        traces = list(Path(tmpdir).glob("*.jsonl"))
+        assert len(traces) == 1
+        events = _read_trace(traces[0])
+        assert [e["type"] for e in events] == ["run.start", "tool.start", "tool.error", "run.end"]
+        assert events[-1]["summary"]["sampling"]["reason"] == "error"
+        assert events[-1]["summary"]["sampling"]["dropped_runs"] == 1
+
+
+def test_config_from_environment(monkeypatch):
+    """Test environment variables reach the plugin through WatchtowerConfig."""
+    from watchtower import WatchtowerConfig
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("WATCHTOWER_TRACE_DIR", tmpdir)
+        monkeypatch.setenv("WATCHTOWER_SAMPLE_RATE", "0.25")
+        monkeypatch.setenv("WATCHTOWER_TAIL_SAMPLING", "true")
+        monkeypatch.setenv("WATCHTOWER_TAIL_LATENCY_MS", "250")
+        monkeypatch.setenv("WATCHTOWER_COMPRESSION", "gzip")
+        monkeypatch.setenv("WATCHTOWER_WRITER_QUEUES", "file=block,stdout=drop_oldest")
+        monkeypatch.setenv("WATCHTOWER_RETENTION_DAYS", "none")
+        monkeypatch.setenv("WATCHTOWER_BUFFER_SIZE", "many")  # Ignored
+
+        config = WatchtowerConfig.from_environment()
+        assert config.sample_rate == 0.25
+        assert config.tail_sampling is True
+        assert config.tail_latency_ms == 250.0
+        assert config.writer_queues == {"file": "block", "stdout": "drop_oldest"}
+        assert config.retention_days is None
+        assert config.buffer_size == 10
+
+        # Config values replace the keyword arguments
+        plugin = AgentTracePlugin(sample_rate=1.0, config=config)
+        assert plugin.sampler.sample_rate == 0.25
+        assert plugin.sampler.tail_latency_ms == 250.0
+        assert plugin.get_writer_stats()["file"]["queue_depth"] == 0
+        plugin.file_writer.write({"type": "run.start", "run_id": "cfg"})
+        plugin.shutdown()
+        traces = list(Path(tmpdir).glob("*.jsonl.gz"))
+        assert len(traces) == 1 and traces[0].name.endswith("_cfg.jsonl.gz")
+
+
+def test_plugin_overhead_telemetry():
+    """Test hooks record their own overhead in run.end and get_overhead_stats."""
+    from watchtower.utils.histogram import BUCKET_BOUNDS_US, LatencyHistogram
+
+    histogram = LatencyHistogram()
+    for elapsed_ns in (500, 1_500, 30_000, 250_000_000):
+        histogram.record(elapsed_ns)
+    assert histogram.counts[0] == 1 and histogram.counts[-1] == 1
+    assert len(histogram.counts) == len(BUCKET_BOUNDS_US) + 1
+    assert histogram.quantile_us(0.5) == 2.0
+    assert histogram.quantile_us(1.0) == 250_000.0
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(trace_dir=tmpdir)
+        inv = SimpleNamespace(invocation_id="inv", agent=SimpleNamespace(name="agent"))
+        ctx = SimpleNamespace(invocation_id="inv", state={}, function_call_id="c1")
+        tool = SimpleNamespace(name="search")
+
+        async def drive():
+            await plugin.before_run_callback(invocation_context=inv)
+            await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=ctx)
+            await plugin.after_tool_callback(tool=tool, tool_args={}, tool_context=ctx, result={})
+            await plugin.after_run_callback(invocation_context=inv)
+
+        asyncio.run(drive())
+
+        events = _read_trace(next(Path(tmpdir).glob("*.jsonl")))
+        overhead = events[-1]["summary"]["overhead"]
+        sections = overhead["sections"]
+        assert sections["before_tool_callback"]["count"] == 1
+        assert sections["emit"]["count"] == 3
+        assert "after_run_callback" not in sections
+        hooks_us = sum(v["total_us"] for k, v in sections.items() if k != "emit")
+        assert overhead["total_us"] == pytest.approx(hooks_us, abs=0.5)
+
+        stats = plugin.get_overhead_stats()
+        assert stats["sections"]["after_run_callback"]["count"] == 1
+        assert stats["sections"]["emit"]["count"] == 4
+
+
+def test_latency_quantiles():
+    """Test DDSketch accuracy, merging and bounded size, and run.end latency."""
+    from watchtower.utils.quantiles import DDSketch, latency_registry
+
+    values = [(i * 7919) % 10000 / 10 + 0.5 for i in range(10000)]
+    whole, left, right = DDSketch(), DDSketch(), DDSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert whole.quantile(q) == pytest.approx(exact, rel=0.02)
+        assert left.quantile(q) == whole.quantile(q)
+
+    bounded = DDSketch(max_bins=32)
+    for value in values:
+        bounded.add(value)
+    assert len(bounded._bins) <= 32 and bounded.count == len(values)
+
+    latency_registry.reset()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plugin = AgentTracePlugin(trace_dir=tmpdir)
+        inv = SimpleNamespace(invocation_id="inv", agent=SimpleNamespace(name="agent"))
+        tool = SimpleNamespace(name="search")
+
+        async def drive():
+            await plugin.before_run_callback(invocation_context=inv)
+            for i in range(3):
+                ctx = SimpleNamespace(invocation_id="inv", state={}, function_call_id=f"c{i}")
+                await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=ctx)
+                await plugin.after_tool_callback(
+                    tool=tool, tool_args={}, tool_context=ctx, result={}
+                )
+            llm_ctx = SimpleNamespace(invocation_id="inv", state={})
+            request = SimpleNamespace(model="gemini-2.0-flash", contents=[], tools=[])
+            await plugin.before_model_callback(callback_context=llm_ctx, llm_request=request)
+            await plugin.after_model_callback(
+                callback_context=llm_ctx, llm_response=SimpleNamespace()
+            )
+            await plugin.after_run_callback(invocation_context=inv)
+
+        asyncio.run(drive())
+
+        summary = _read_trace(next(Path(tmpdir).glob("*.jsonl")))[-1]["summary"]
+        assert summary["latency"]["tools"]["search"]["count"] == 3
+        assert summary["latency"]["models"]["gemini-2.0-flash"]["p99_ms"] >= 0
+        assert plugin.get_latency_stats()["tools"]["search"]["count"] == 3
+    latency_registry.reset()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
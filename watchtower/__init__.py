@@ -26,6 +26,8 @@ import logging
 
 from watchtower.plugin import AgentTracePlugin
 from watchtower.config import WatchtowerConfig
+from watchtower.reader import TraceReader, iter_events
+from watchtower.query import TraceQuery, run_query
 from watchtower.models.events import (
     EventType,
     BaseEvent,
@@ -63,6 +65,10 @@ if not logger.handlers:
 __all__ = [
     "AgentTracePlugin",
     "WatchtowerConfig",
+    "TraceReader",
+    "iter_events",
+    "TraceQuery",
+    "run_query",
     # Event types
     "EventType",
     "BaseEvent",
@@ -0,0 +1,99 @@
+"""Command-line entry point: ``python -m watchtower <command>``.
+
+Commands:
+    query    Aggregate events across the trace directory
+
+Example:
+    python -m watchtower query --type tool.error --since 7d
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from watchtower.query import TraceQuery, parse_time, run_query
+
+
+def _format_ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:,.1f}"
+
+
+def _cmd_query(args: argparse.Namespace) -> int:
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    query = TraceQuery(
+        types=args.type,
+        tool_name=args.tool,
+        run_id=args.run_id,
+        since=since,
+        until=until,
+        group_by=args.group_by,
+    )
+    result = run_query(query, trace_dir=args.dir, workers=args.workers)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+        return 0
+
+    print(
+        f"{result.events_matched:,} events in {result.files_scanned:,} files "
+        f"({result.files_pruned:,} pruned)"
+    )
+    if not result.groups:
+        return 0
+
+    print(
+        f"\n{args.group_by:<32} {'count':>9} {'errors':>7} "
+        f"{'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10}"
+    )
+    for name, stats in result.top(args.limit):
+        summary = stats.to_dict()
+        print(
+            f"{name[:32]:<32} {stats.count:>9,} {stats.errors:>7,} "
+            f"{_format_ms(summary['p50_ms']):>10} {_format_ms(summary['p90_ms']):>10} "
+            f"{_format_ms(summary['p99_ms']):>10}"
+        )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line.
+
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="python -m watchtower")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query = commands.add_parser("query", help="aggregate events across trace files")
+    query.add_argument(
+        "--type", action="append", help="event type to include (repeatable; default: all)"
+    )
+    query.add_argument("--tool", help="only events for this tool")
+    query.add_argument("--run-id", help="only events from this run")
+    query.add_argument("--since", help="start of time window (e.g. 7d, 24h, 2024-01-15)")
+    query.add_argument("--until", help="end of time window (same formats as --since)")
+    query.add_argument(
+        "--group-by", default="tool_name", help="event field to group by (default: tool_name)"
+    )
+    query.add_argument("--limit", type=int, default=20, help="groups to show (default: 20)")
+    query.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    query.add_argument("--dir", default="~/.watchtower/traces", help="trace directory")
+    query.add_argument("--json", action="store_true", help="print the full result as JSON")
+    query.set_defaults(handler=_cmd_query)
+
+    args = parser.parse_args(argv)
+    return int(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,40 @@
 """Cleanup utilities for Watchtower trace files.
 
-Implements retention policy enforcement for trace files.
+Implements retention policy enforcement for trace files: by age
+(``retention_days``) and by total size (``max_bytes``, oldest files first).
+RetentionTask runs both periodically inside the traced process.
 """
 
+import logging
+import os
 import re
+import shutil
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
+from watchtower.utils.flush_timer import FlushTimer
+from watchtower.utils.manifest import ManifestEntry, TraceManifest, get_manifest
+from watchtower.utils.trace_index import INDEX_SUFFIX, index_path
 
-# Trace file pattern: {date}_{run_id}.jsonl
-TRACE_FILE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})_([a-zA-Z0-9]+)\.jsonl$")
+logger = logging.getLogger("watchtower")
+
+
+# Trace file pattern: {date}_{run_id}.jsonl, optionally compressed (.jsonl.gz / .jsonl.zst),
+# with the writer's pid before .jsonl if written by a forked child process
+TRACE_FILE_PATTERN = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})_([a-zA-Z0-9]+)(?:\.\d+)?\.jsonl(?:\.gz|\.zst)?$"
+)
+
+# Partition directory names by depth below the trace directory: YYYY/MM/DD,
+# plus an optional agent directory inside each day
+_PARTITION_PATTERNS = (
+    re.compile(r"^\d{4}$"),
+    re.compile(r"^\d{2}$"),
+    re.compile(r"^\d{2}$"),
+    re.compile(r"^[A-Za-z0-9_-]+$"),
+)
 
 
 def get_trace_dir(trace_dir: str = "~/.watchtower/traces") -> Path:
@@ -25,55 +49,441 @@ def get_trace_dir(trace_dir: str = "~/.watchtower/traces") -> Path:
     return Path(trace_dir).expanduser()
 
 
-def list_expired_traces(
-    trace_dir: str = "~/.watchtower/traces",
-    retention_days: int = 30,
-) -> List[Tuple[Path, str, int]]:
-    """List trace files that have exceeded the retention period.
+def date_partition(date: str) -> str:
+    """Relative partition directory for a trace date.
+
+    Args:
+        date: Date as YYYY-MM-DD
+
+    Returns:
+        Partition path as YYYY/MM/DD
+    """
+    return date.replace("-", "/")
+
+
+class TraceFileInfo(NamedTuple):
+    """A trace file found by scan_trace_files()."""
+
+    path: Path
+    date: str
+    run_id: str
+    size: int
+    mtime: float
+    sidecar_size: int
+    events: Optional[int] = None
+
+
+def scan_trace_files(
+    trace_dir: str = "~/.watchtower/traces", use_manifest: bool = True
+) -> List[TraceFileInfo]:
+    """List trace files with their sizes.
+
+    Covers both the flat layout and date partitions (YYYY/MM/DD[/agent]).
+    If the directory has a manifest (see watchtower.utils.manifest), the
+    listing comes from it: directories whose mtime is unchanged since the
+    last sync are not listed at all, and only new files are stat'ed, so a
+    scan costs one stat per directory. Without a manifest, each directory
+    is listed in a single os.scandir pass.
 
     Args:
         trace_dir: Directory containing trace files
-        retention_days: Number of days to retain traces
+        use_manifest: Whether to use the directory's manifest if it has one
 
     Returns:
-        List of tuples: (file_path, date_str, size_bytes)
+        Trace files (event counts are None unless known from the manifest)
     """
     dir_path = get_trace_dir(trace_dir)
+    if use_manifest:
+        manifest = get_manifest(dir_path)
+        if manifest.exists():
+            try:
+                return _scan_manifest(manifest)
+            except OSError as e:
+                logger.warning("Trace manifest unusable, listing directory: %s", e)
+
+    found: List[TraceFileInfo] = []
+    pending = [""]
+    while pending:
+        partition = pending.pop()
+        try:
+            found.extend(_scan_directory(dir_path, partition, pending))
+        except OSError:
+            # Directory may not exist or may have been deleted (TOCTOU)
+            continue
+    return found
 
-    if not dir_path.exists():
-        return []
 
-    cutoff_date = datetime.now() - timedelta(days=retention_days)
-    cutoff_str = cutoff_date.strftime("%Y-%m-%d")
+def _child_partition(partition: str, name: str) -> Optional[str]:
+    """Relative path of a subdirectory if it is a partition, else None."""
+    depth = partition.count("/") + 1 if partition else 0
+    if depth >= len(_PARTITION_PATTERNS) or not _PARTITION_PATTERNS[depth].match(name):
+        return None
+    return f"{partition}/{name}" if partition else name
+
+
+def _scan_directory(dir_path: Path, partition: str, subdirs: List[str]) -> List[TraceFileInfo]:
+    """List the trace files in one directory with a single os.scandir pass.
+
+    Entries carry the file type from the directory listing itself, so only
+    matching files cost a stat() call. Sidecar index sizes are picked up in
+    the same pass, and partition subdirectories are appended to ``subdirs``.
+
+    Raises:
+        OSError: If the directory cannot be listed
+    """
+    found: List[Tuple[Path, str, str, int, float]] = []
+    sidecars = {}
+
+    with os.scandir(dir_path / partition) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith(INDEX_SUFFIX):
+                try:
+                    sidecars[name[: -len(INDEX_SUFFIX)]] = entry.stat().st_size
+                except OSError:
+                    pass
+                continue
+
+            match = TRACE_FILE_PATTERN.match(name)
+            try:
+                if not match:
+                    child = _child_partition(partition, name)
+                    if child is not None and entry.is_dir(follow_symlinks=False):
+                        subdirs.append(child)
+                    continue
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                # File may have been deleted between listing and stat
+                continue
+            found.append(
+                (Path(entry.path), match.group(1), match.group(2), stat.st_size, stat.st_mtime)
+            )
+
+    return [
+        TraceFileInfo(path, date, run_id, size, mtime, sidecars.get(path.name, 0))
+        for path, date, run_id, size, mtime in found
+    ]
+
+
+def _scan_manifest(manifest: TraceManifest) -> List[TraceFileInfo]:
+    """List trace files from a manifest, reconciling changed directories first.
+
+    Every directory the manifest has synced is stat'ed; only those whose
+    mtime changed (a file or partition was created or removed) are listed.
+    """
+    entries = manifest.refresh()
+    children: Dict[str, List[str]] = {}
+    for partition in manifest.synced:
+        if partition:
+            parent = partition.rpartition("/")[0]
+            children.setdefault(parent, []).append(partition)
+
+    records: List[Dict[str, Any]] = []
+    pending = [""]
+    while pending:
+        partition = pending.pop()
+        mtime_ns = manifest.dir_mtime_ns(partition)
+        if mtime_ns is None:
+            if partition:
+                records.append(TraceManifest.dropped(partition))
+            continue
+        if mtime_ns == manifest.synced.get(partition):
+            pending.extend(children.get(partition, ()))
+            continue
+        records.extend(_reconcile(manifest, entries, partition, mtime_ns, pending))
+
+    if records:
+        manifest.append(records)
+        entries = manifest.refresh()
+
+    return [
+        TraceFileInfo(
+            manifest.trace_dir / entry.name,
+            entry.date,
+            entry.run_id,
+            entry.size,
+            entry.mtime,
+            entry.sidecar_size,
+            entry.events,
+        )
+        for entry in entries.values()
+    ]
+
+
+def _reconcile(
+    manifest: TraceManifest,
+    known: Dict[str, ManifestEntry],
+    partition: str,
+    mtime_ns: int,
+    subdirs: List[str],
+) -> List[Dict[str, Any]]:
+    """Records bringing the manifest in line with one changed directory.
+
+    Lists the directory (names only), stats just the trace files the
+    manifest does not know about yet, and queues partition subdirectories
+    in ``subdirs``. The directory mtime must be read before listing, so
+    changes made meanwhile trigger another reconcile next time.
+    """
+    prefix = partition + "/" if partition else ""
+    in_dir = {name for name in known if name.startswith(prefix) and "/" not in name[len(prefix) :]}
+
+    records: List[Dict[str, Any]] = []
+    listed = set()
+    sidecars: Dict[str, os.DirEntry] = {}
+    with os.scandir(manifest.trace_dir / partition) as entries:
+        for entry in entries:
+            name = prefix + entry.name
+            if name.endswith(INDEX_SUFFIX):
+                sidecars[name[: -len(INDEX_SUFFIX)]] = entry
+                continue
+            match = TRACE_FILE_PATTERN.match(entry.name)
+            if not match:
+                child = _child_partition(partition, entry.name)
+                if child is not None and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(child)
+                continue
+            listed.add(name)
+            if name in known:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            records.append(
+                {
+                    "a": name,
+                    "d": match.group(1),
+                    "r": match.group(2),
+                    "b": stat.st_size,
+                    "e": None,
+                    "m": stat.st_mtime,
+                    "i": 0,
+                }
+            )
+
+    # Sidecars the manifest has not accounted for (e.g. built by TraceReader)
+    new = {record["a"]: record for record in records}
+    for base, entry in sidecars.items():
+        if base not in listed or (base in known and known[base].sidecar_size):
+            continue
+        try:
+            size = entry.stat().st_size
+        except OSError:
+            continue
+        if base in new:
+            new[base]["i"] = size
+        else:
+            records.append(TraceManifest.written(base, 0, 0, size, known[base].mtime))
+
+    records.extend(TraceManifest.removed(name) for name in in_dir if name not in listed)
+    sync = manifest.sync_record(mtime_ns, partition)
+    if sync is not None:
+        records.append(sync)
+    return records
+
+
+def _forget(dir_path: Path, paths: List[Path], partitions: List[str]) -> None:
+    """Record deleted trace files and partitions in the manifest, if any."""
+    manifest = get_manifest(dir_path)
+    if not (paths or partitions) or not manifest.exists():
+        return
+    records = [TraceManifest.dropped(partition) for partition in partitions]
+    for path in paths:
+        try:
+            records.append(TraceManifest.removed(path.relative_to(dir_path).as_posix()))
+        except ValueError:
+            continue
+    try:
+        manifest.append(records)
+    except OSError as e:
+        logger.warning("Failed to update trace manifest %s: %s", manifest.path, e)
 
-    expired: List[Tuple[Path, str, int]] = []
 
+def _remove_sidecars(trace_file: Path) -> None:
+    """Delete the sidecar index of a removed trace file, if any.
+
+    Args:
+        trace_file: Trace file that was deleted
+    """
     try:
-        entries = list(dir_path.iterdir())
+        index_path(trace_file).unlink()
     except OSError:
-        # Directory may have been deleted between exists() and iterdir() (TOCTOU)
-        return []
+        pass
 
-    for entry in entries:
-        if not entry.is_file():
-            continue
 
-        match = TRACE_FILE_PATTERN.match(entry.name)
-        if not match:
-            continue
+def _day_partition(dir_path: Path, path: Path) -> Optional[str]:
+    """The YYYY/MM/DD partition a trace file lives in, if any."""
+    try:
+        parts = path.relative_to(dir_path).parts
+    except ValueError:
+        return None
+    if len(parts) < 4 or not all(p.match(n) for p, n in zip(_PARTITION_PATTERNS, parts[:3])):
+        return None
+    return "/".join(parts[:3])
+
+
+def _delete(
+    dir_path: Path,
+    files: List[TraceFileInfo],
+    dry_run: bool,
+    whole_partitions: bool = False,
+) -> Tuple[int, int]:
+    """Delete trace files (and sidecars) and record it in the manifest.
+
+    With ``whole_partitions``, files in day partitions are removed with one
+    directory removal per day instead of per-file unlinks; callers must
+    pass every trace file of those days.
 
-        date_str = match.group(1)
+    Returns:
+        Tuple of (deleted_count, bytes_freed)
+    """
+    deleted_count = 0
+    bytes_freed = 0
+    deleted: List[Path] = []
+    by_day: Dict[str, List[TraceFileInfo]] = {}
+
+    for info in files:
+        day = _day_partition(dir_path, info.path) if whole_partitions else None
+        if day is not None:
+            by_day.setdefault(day, []).append(info)
+            continue
+        try:
+            if not dry_run:
+                info.path.unlink()
+                _remove_sidecars(info.path)
+                deleted.append(info.path)
+        except FileNotFoundError:
+            # Already gone, but the manifest may still list it
+            deleted.append(info.path)
+            continue
+        except OSError:
+            # File may have become inaccessible
+            continue
+        deleted_count += 1
+        bytes_freed += info.size
 
-        # Compare date strings (works because YYYY-MM-DD sorts correctly)
-        if date_str < cutoff_str:
+    dropped: List[str] = []
+    for day, members in by_day.items():
+        if not dry_run:
             try:
-                size = entry.stat().st_size
-                expired.append((entry, date_str, size))
-            except OSError:
-                # File may have been deleted between listing and stat
+                shutil.rmtree(dir_path / day)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Failed to remove trace partition %s: %s", day, e)
                 continue
+            dropped.append(day)
+            _remove_empty_parents(dir_path, day)
+        deleted_count += len(members)
+        bytes_freed += sum(info.size for info in members)
+
+    if not dry_run:
+        _forget(dir_path, deleted, dropped)
+    return (deleted_count, bytes_freed)
+
+
+def _remove_empty_parents(dir_path: Path, partition: str) -> None:
+    """Remove the month and year directories above a deleted day if empty."""
+    parent = partition.rpartition("/")[0]
+    while parent:
+        try:
+            os.rmdir(dir_path / parent)
+        except OSError:
+            return
+        parent = parent.rpartition("/")[0]
+
+
+def find_trace_file(
+    run_id: str,
+    trace_dir: str = "~/.watchtower/traces",
+    date: Optional[str] = None,
+    max_days: int = 31,
+) -> Optional[Path]:
+    """Find the trace file of a run in either layout.
+
+    Partitioned traces are found by probing the day partitions directly
+    (newest first, ``{date}_{run_id}.jsonl`` and its compressed variants),
+    so nothing but the day's agent directories is listed. Only if that
+    finds nothing are the candidate directories listed once for files of
+    forked workers (``{date}_{run_id}.{pid}.jsonl``); the newest day's
+    first such file is returned.
 
-    return expired
+    Args:
+        run_id: Run to look up
+        trace_dir: Directory containing trace files
+        date: Date of the run (YYYY-MM-DD) if known
+        max_days: How many days back to look when the date is unknown
+
+    Returns:
+        Path of the trace file, or None if not found
+    """
+    dir_path = get_trace_dir(trace_dir)
+    if date is not None:
+        dates = [date]
+    else:
+        today = datetime.now()
+        dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(max_days)]
+
+    day_dirs: Dict[str, List[Path]] = {}
+    for day in dates:
+        names = [f"{day}_{run_id}.jsonl{ext}" for ext in ("", ".gz", ".zst")]
+        partition = dir_path / date_partition(day)
+        day_dirs[day] = [partition]
+        try:
+            with os.scandir(partition) as entries:
+                day_dirs[day].extend(Path(e.path) for e in entries if e.is_dir())
+        except OSError:
+            pass
+        for directory in [dir_path] + day_dirs[day]:
+            for name in names:
+                path = directory / name
+                if path.is_file():
+                    return path
+
+    # Per-process files of forked workers: {day}_{run_id}.{pid}.jsonl
+    matches: List[Tuple[str, str, Path]] = []
+    wanted = set(dates)
+    for directory in [dir_path] + [d for day in dates for d in day_dirs[day]]:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    match = TRACE_FILE_PATTERN.match(entry.name)
+                    if match and match.group(2) == run_id and match.group(1) in wanted:
+                        matches.append((match.group(1), entry.name, Path(entry.path)))
+        except OSError:
+            continue
+    if not matches:
+        return None
+    newest = max(day for day, _, _ in matches)
+    return min((name, path) for day, name, path in matches if day == newest)[1]
+
+
+def list_expired_traces(
+    trace_dir: str = "~/.watchtower/traces",
+    retention_days: int = 30,
+) -> List[Tuple[Path, str, int]]:
+    """List trace files that have exceeded the retention period.
+
+    Args:
+        trace_dir: Directory containing trace files
+        retention_days: Number of days to retain traces
+
+    Returns:
+        List of tuples: (file_path, date_str, size_bytes)
+    """
+    return [(info.path, info.date, info.size) for info in _expired(trace_dir, retention_days)]
+
+
+def _expired(trace_dir: str, retention_days: int) -> List[TraceFileInfo]:
+    cutoff_date = datetime.now() - timedelta(days=retention_days)
+    cutoff_str = cutoff_date.strftime("%Y-%m-%d")
+
+    # Compare date strings (works because YYYY-MM-DD sorts correctly)
+    return [info for info in scan_trace_files(trace_dir) if info.date < cutoff_str]
 
 
 def cleanup_old_traces(
@@ -83,6 +493,8 @@ def cleanup_old_traces(
 ) -> Tuple[int, int]:
     """Delete trace files that have exceeded the retention period.
 
+    Expired day partitions are removed as a whole; flat files one by one.
+
     Args:
         trace_dir: Directory containing trace files
         retention_days: Number of days to retain traces
@@ -91,28 +503,10 @@ def cleanup_old_traces(
     Returns:
         Tuple of (deleted_count, bytes_freed)
     """
-    expired = list_expired_traces(trace_dir, retention_days)
-
+    expired = _expired(trace_dir, retention_days)
     if not expired:
         return (0, 0)
-
-    deleted_count = 0
-    bytes_freed = 0
-
-    for file_path, _, size in expired:
-        if dry_run:
-            deleted_count += 1
-            bytes_freed += size
-        else:
-            try:
-                file_path.unlink()
-                deleted_count += 1
-                bytes_freed += size
-            except OSError:
-                # File may have been deleted or become inaccessible
-                continue
-
-    return (deleted_count, bytes_freed)
+    return _delete(get_trace_dir(trace_dir), expired, dry_run, whole_partitions=True)
 
 
 def cleanup_all_traces(
@@ -128,38 +522,46 @@ def cleanup_all_traces(
     Returns:
         Tuple of (deleted_count, bytes_freed)
     """
-    dir_path = get_trace_dir(trace_dir)
+    files = scan_trace_files(trace_dir)
+    return _delete(get_trace_dir(trace_dir), files, dry_run, whole_partitions=True)
 
-    if not dir_path.exists():
-        return (0, 0)
 
-    deleted_count = 0
-    bytes_freed = 0
+def enforce_size_quota(
+    trace_dir: str = "~/.watchtower/traces",
+    max_bytes: int = 1024**3,
+    min_age_seconds: float = 60.0,
+    dry_run: bool = False,
+) -> Tuple[int, int]:
+    """Delete the least recently written trace files until under a size quota.
 
-    try:
-        entries = list(dir_path.iterdir())
-    except OSError:
-        # Directory may have been deleted between exists() and iterdir() (TOCTOU)
-        return (0, 0)
+    Files are ranked by modification time, so a long-running trace that is
+    still being appended to outlives newer but finished ones. Sidecar
+    indexes count toward the quota and are removed with their trace file.
 
-    for entry in entries:
-        if not entry.is_file():
-            continue
+    Args:
+        trace_dir: Directory containing trace files
+        max_bytes: Maximum total size of trace files and sidecars
+        min_age_seconds: Never delete files modified more recently than this
+            (they likely belong to runs still in progress)
+        dry_run: If True, don't actually delete files
 
-        match = TRACE_FILE_PATTERN.match(entry.name)
-        if not match:
-            continue
+    Returns:
+        Tuple of (deleted_count, bytes_freed)
+    """
+    files = scan_trace_files(trace_dir)
+    total = sum(info.size + info.sidecar_size for info in files)
+    if total <= max_bytes:
+        return (0, 0)
 
-        try:
-            size = entry.stat().st_size
-            if not dry_run:
-                entry.unlink()
-            deleted_count += 1
-            bytes_freed += size
-        except OSError:
-            continue
+    cutoff = time.time() - min_age_seconds
+    evict: List[TraceFileInfo] = []
+    for info in sorted(files, key=lambda f: (f.mtime, f.path.name)):
+        if total <= max_bytes or info.mtime > cutoff:
+            break
+        evict.append(info._replace(size=info.size + info.sidecar_size))
+        total -= info.size + info.sidecar_size
 
-    return (deleted_count, bytes_freed)
+    return _delete(get_trace_dir(trace_dir), evict, dry_run)
 
 
 def get_trace_stats(
@@ -171,48 +573,22 @@ def get_trace_stats(
         trace_dir: Directory containing trace files
 
     Returns:
-        Dictionary with stats: total_count, total_size, oldest_date, newest_date
+        Dictionary with stats: total_count, compressed_count, total_size,
+        total_events (events in files tracked by the manifest, or None),
+        oldest_date, newest_date
     """
-    dir_path = get_trace_dir(trace_dir)
-
-    empty_stats = {
-        "total_count": 0,
-        "total_size": 0,
-        "oldest_date": None,
-        "newest_date": None,
-    }
-
-    if not dir_path.exists():
-        return empty_stats
-
-    dates: List[str] = []
-    total_size = 0
-    total_count = 0
-
-    try:
-        entries = list(dir_path.iterdir())
-    except OSError:
-        # Directory may have been deleted between exists() and iterdir() (TOCTOU)
-        return empty_stats
-
-    for entry in entries:
-        if not entry.is_file():
-            continue
-
-        match = TRACE_FILE_PATTERN.match(entry.name)
-        if not match:
-            continue
-
-        try:
-            total_size += entry.stat().st_size
-            total_count += 1
-            dates.append(match.group(1))
-        except OSError:
-            continue
+    files = scan_trace_files(trace_dir)
+    dates = [info.date for info in files]
+    total_size = sum(info.size for info in files)
+    total_count = len(files)
+    compressed_count = sum(1 for info in files if not info.path.name.endswith(".jsonl"))
+    counted = [info.events for info in files if info.events is not None]
 
     return {
         "total_count": total_count,
+        "compressed_count": compressed_count,
         "total_size": total_size,
+        "total_events": sum(counted) if counted else None,
         "oldest_date": min(dates) if dates else None,
         "newest_date": max(dates) if dates else None,
     }
@@ -235,3 +611,83 @@ def format_bytes(size: int) -> str:
         return f"{size / (1024 * 1024):.1f} MB"
     else:
         return f"{size / (1024 * 1024 * 1024):.1f} GB"
+
+
+class RetentionTask:
+    """Periodically enforces age and size retention from a background thread.
+
+    Runs on a FlushTimer that re-arms itself after each pass, so it costs
+    one idle daemon thread and one scandir pass per interval. Errors are
+    logged and the next pass is still scheduled. Forked child processes
+    inherit the task disarmed, so only the parent enforces retention.
+
+    Example:
+        >>> task = RetentionTask("~/.watchtower/traces", max_bytes=5 * 1024**3)
+        >>> task.start()
+        >>> ...
+        >>> task.stop()
+    """
+
+    def __init__(
+        self,
+        trace_dir: str = "~/.watchtower/traces",
+        retention_days: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        interval: float = 300.0,
+    ):
+        """Initialize task (call start() to begin).
+
+        Args:
+            trace_dir: Directory containing trace files
+            retention_days: Delete files older than this many days (None: no age limit)
+            max_bytes: Keep the directory under this many bytes (None: no size limit)
+            interval: Seconds between passes
+        """
+        self.trace_dir = trace_dir
+        self.retention_days = retention_days
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.deleted_count = 0
+        self.bytes_freed = 0
+        self._timer = FlushTimer(self._tick, name="watchtower-retention")
+
+    def start(self, delay: float = 0.0) -> None:
+        """Schedule the first pass.
+
+        Args:
+            delay: Seconds until the first pass
+        """
+        self._timer.arm(delay)
+
+    def _tick(self) -> None:
+        """Timer callback: run a pass, discarding its counts."""
+        self.run_once()
+
+    def run_once(self) -> Tuple[int, int]:
+        """Run one retention pass now and schedule the next one.
+
+        Returns:
+            Tuple of (deleted_count, bytes_freed) for this pass
+        """
+        deleted, freed = 0, 0
+        try:
+            if self.retention_days is not None:
+                count, size = cleanup_old_traces(self.trace_dir, self.retention_days)
+                deleted, freed = deleted + count, freed + size
+            if self.max_bytes is not None:
+                count, size = enforce_size_quota(self.trace_dir, self.max_bytes)
+                deleted, freed = deleted + count, freed + size
+        except Exception as e:
+            logger.warning("Trace retention pass failed: %s", e)
+        finally:
+            self._timer.arm(self.interval)
+
+        if deleted:
+            logger.info("Retention removed %d trace files (%s)", deleted, format_bytes(freed))
+        self.deleted_count += deleted
+        self.bytes_freed += freed
+        return (deleted, freed)
+
+    def stop(self) -> None:
+        """Stop scheduling passes."""
+        self._timer.stop()
@@ -2,6 +2,13 @@
 
 from typing import Dict, Any, Set
 
+from watchtower.utils.histogram import LatencyHistogram
+from watchtower.utils.quantiles import DDSketch
+
+# Latency sketches kept per kind; further names share OTHER_LATENCY_KEY
+MAX_LATENCY_KEYS = 64
+OTHER_LATENCY_KEY = "(other)"
+
 
 class EventCollector:
     """Aggregates event statistics and normalizes event data.
@@ -17,6 +24,10 @@ class EventCollector:
         self._total_tokens = 0
         self._errors = 0
         self._tools_used: Set[str] = set()
+        self._dropped_events = 0
+        self._overhead: Dict[str, LatencyHistogram] = {}
+        self._nested_sections: Set[str] = set()
+        self._latency: Dict[str, Dict[str, DDSketch]] = {}
         self._run_start_time: float = 0
 
     def create_event(self, type: str, **kwargs: Any) -> Dict[str, Any]:
@@ -55,19 +66,95 @@ class EventCollector:
         """Track an error occurrence."""
         self._errors += 1
 
+    def track_dropped_events(self, count: int) -> None:
+        """Track events dropped by writers during this run.
+
+        Args:
+            count: Number of events dropped
+        """
+        self._dropped_events += count
+
+    def track_latency(self, kind: str, name: str, duration_ms: float) -> None:
+        """Track a call duration in a streaming quantile sketch.
+
+        Args:
+            kind: Category, "tools" or "models"
+            name: Tool or model name
+            duration_ms: Call duration in milliseconds
+        """
+        sketches = self._latency.setdefault(kind, {})
+        sketch = sketches.get(name)
+        if sketch is None:
+            if len(sketches) >= MAX_LATENCY_KEYS:
+                name = OTHER_LATENCY_KEY
+            sketch = sketches.setdefault(name, DDSketch())
+        sketch.add(duration_ms)
+
+    def get_latency_sketches(self) -> Dict[str, Dict[str, DDSketch]]:
+        """Get the latency sketches tracked so far.
+
+        Returns:
+            Dictionary of kind -> name -> sketch
+        """
+        return self._latency
+
+    def track_overhead(self, section: str, elapsed_ns: int, nested: bool = False) -> None:
+        """Track time spent by watchtower itself.
+
+        Args:
+            section: Name of the timed section (e.g. "before_tool_callback")
+            elapsed_ns: Time spent in nanoseconds
+            nested: Whether the section runs inside another timed section, in
+                which case it is left out of the overhead total
+        """
+        histogram = self._overhead.get(section)
+        if histogram is None:
+            histogram = self._overhead[section] = LatencyHistogram()
+            if nested:
+                self._nested_sections.add(section)
+        histogram.record(elapsed_ns)
+
+    def get_overhead(self) -> Dict[str, Any]:
+        """Get self-telemetry histograms.
+
+        Returns:
+            Dictionary with total_us (time across top-level sections) and a
+            histogram per section under "sections"
+        """
+        total_ns = sum(
+            histogram.total_ns
+            for section, histogram in self._overhead.items()
+            if section not in self._nested_sections
+        )
+        return {
+            "total_us": round(total_ns / 1000, 1),
+            "sections": {
+                section: histogram.to_dict() for section, histogram in self._overhead.items()
+            },
+        }
+
     def get_summary(self) -> Dict[str, Any]:
         """Get current run summary statistics.
 
         Returns:
             Dictionary with aggregated statistics
         """
-        return {
+        summary: Dict[str, Any] = {
             "llm_calls": self._llm_calls,
             "tool_calls": self._tool_calls,
             "total_tokens": self._total_tokens,
             "errors": self._errors,
             "tools_used": sorted(list(self._tools_used)),
+            "dropped_events": self._dropped_events,
         }
+        if self._latency:
+            summary["latency"] = {
+                kind: {name: sketch.to_dict() for name, sketch in sketches.items()}
+                for kind, sketches in self._latency.items()
+            }
+        if self._overhead:
+            summary["overhead"] = self.get_overhead()
+        return summary
 
     def reset(self) -> None:
         """Reset all statistics for a new run."""
@@ -76,4 +163,8 @@ class EventCollector:
         self._total_tokens = 0
         self._errors = 0
         self._tools_used.clear()
+        self._dropped_events = 0
+        self._overhead.clear()
+        self._nested_sections.clear()
+        self._latency.clear()
         self._run_start_time = 0
@@ -2,8 +2,8 @@
 
 import logging
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Union, get_args, get_origin
 from pathlib import Path
 
 logger = logging.getLogger("watchtower")
@@ -18,15 +18,41 @@ class WatchtowerConfig:
     2. Environment variables
     3. Config file (~/.watchtower/config.yaml)
     4. Defaults
+
+    Pass an instance to ``AgentTracePlugin(config=...)`` to configure the
+    plugin from it.
     """
 
     trace_dir: str = "~/.watchtower/traces"
-    retention_days: int = 30
+    retention_days: Optional[int] = 30
+    max_trace_bytes: Optional[int] = None
+    retention_interval: float = 300.0
     buffer_size: int = 10
+    max_buffer_size: int = 1000
+    overflow_policy: str = "drop_oldest"
+    compression: Optional[str] = None
+    index_traces: bool = False
+    trace_manifest: bool = True
+    trace_layout: str = "flat"
+    adaptive_buffering: bool = False
+    max_buffer_age_ms: Optional[float] = None
+    sqlite_path: Optional[str] = None
     sanitize_args: bool = True
     max_response_preview: int = 500
     enable_file: bool = True
     enable_stdout: bool = False
+    stdout_batch_size: int = 1
+    stdout_max_delay_ms: float = 50.0
+    async_writes: bool = False
+    shared_writers: bool = False
+    offload_writes: bool = False
+    writer_queues: Optional[Dict[str, str]] = None
+    keep_files_open: bool = False
+    sample_rate: float = 1.0
+    tail_sampling: bool = False
+    tail_sample_rate: float = 0.0
+    tail_latency_ms: Optional[float] = None
+    tail_token_threshold: Optional[int] = None
 
     @classmethod
     def from_environment(cls) -> "WatchtowerConfig":
@@ -36,6 +62,11 @@ class WatchtowerConfig:
             WATCHTOWER_TRACE_DIR: Override trace directory
             WATCHTOWER_LIVE: Enable stdout streaming
             WATCHTOWER_DISABLE: Disable all tracing
+            WATCHTOWER_<FIELD>: Any other field, upper-cased, e.g.
+                WATCHTOWER_SAMPLE_RATE=0.1, WATCHTOWER_COMPRESSION=gzip or
+                WATCHTOWER_WRITER_QUEUES=file=block,stdout=drop_oldest.
+                Booleans accept 1/true/yes, optional fields "none".
+                Unparseable values are ignored with a warning.
 
         Returns:
             Configuration instance
@@ -45,13 +76,20 @@ class WatchtowerConfig:
             return cls(enable_file=False, enable_stdout=False)
 
         # Load from environment
-        trace_dir = os.environ.get("WATCHTOWER_TRACE_DIR", "~/.watchtower/traces")
-        enable_stdout = os.environ.get("WATCHTOWER_LIVE") == "1"
-
-        return cls(
-            trace_dir=trace_dir,
-            enable_stdout=enable_stdout,
-        )
+        values: Dict[str, Any] = {}
+        for config_field in fields(cls):
+            name = f"WATCHTOWER_{config_field.name.upper()}"
+            value = os.environ.get(name)
+            if value is None:
+                continue
+            try:
+                values[config_field.name] = _parse_env_value(value, config_field.type)
+            except ValueError as e:
+                logger.warning("Ignoring %s=%r: %s", name, value, e)
+        if os.environ.get("WATCHTOWER_LIVE") == "1":
+            values["enable_stdout"] = True
+
+        return cls(**values)
 
     @classmethod
     def load_from_file(cls, config_path: Optional[str] = None) -> "WatchtowerConfig":
@@ -85,3 +123,25 @@ class WatchtowerConfig:
         except Exception as e:
             logger.warning("Failed to load config from %s: %s", config_file, e)
             return cls()
+
+
+def _parse_env_value(value: str, field_type: Any) -> Any:
+    """Convert an environment variable to a config field's type.
+
+    Raises:
+        ValueError: If the value does not parse as that type
+    """
+    if get_origin(field_type) is Union:
+        if value.strip().lower() in ("", "none"):
+            return None
+        field_type = next(arg for arg in get_args(field_type) if arg is not type(None))
+    if field_type is bool:
+        return value.strip().lower() in ("1", "true", "yes")
+    if field_type in (int, float):
+        return field_type(value)
+    if get_origin(field_type) is dict:
+        pairs = [item.split("=", 1) for item in value.split(",") if item.strip()]
+        if any(len(pair) != 2 for pair in pairs):
+            raise ValueError("expected comma-separated key=value pairs")
+        return {key.strip(): item.strip() for key, item in pairs}
+    return value
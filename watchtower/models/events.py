@@ -104,6 +104,8 @@ class ToolEndEvent(BaseEvent):
     tool_name: str = ""
     duration_ms: float = 0
     response_preview: str = ""
+    response_bytes: Optional[int] = None
+    response_items: Optional[int] = None
     success: bool = True
 
 
@@ -147,6 +149,10 @@ class RunSummary:
     total_tokens: int = 0
     errors: int = 0
     tools_used: List[str] = field(default_factory=list)
+    dropped_events: int = 0
+    sampling: Optional[Dict[str, Any]] = None
+    latency: Optional[Dict[str, Any]] = None
+    overhead: Optional[Dict[str, Any]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert summary to dictionary."""
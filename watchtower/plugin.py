@@ -1,10 +1,14 @@
 """Main plugin implementation for Google ADK observability."""
 
+import asyncio
+import functools
 import logging
 import os
 import time
 import uuid
-from typing import Optional, List, Any, Dict
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, List, Any, Callable, Dict, Sequence, Tuple, TypeVar, Union, cast
 
 logger = logging.getLogger("watchtower")
 
@@ -36,15 +40,74 @@ except ImportError:
     ToolContext = Any  # type: ignore[misc,assignment]
     Event = Any  # type: ignore[misc,assignment]
 
+from watchtower.cleanup import RetentionTask  # noqa: E402
 from watchtower.collector import EventCollector  # noqa: E402
+from watchtower.config import WatchtowerConfig  # noqa: E402
+from watchtower.sampling import Sampler, REASON_BUFFER_FULL  # noqa: E402
+from watchtower.writers.base import AnyTraceWriter, AsyncTraceWriter, TraceWriter  # noqa: E402
+from watchtower.writers.async_writer import ThreadOffloadWriter  # noqa: E402
 from watchtower.writers.file_writer import FileWriter  # noqa: E402
 from watchtower.writers.stdout_writer import StdoutWriter  # noqa: E402
+from watchtower.writers.background_writer import BackgroundWriter  # noqa: E402
+from watchtower.writers.sqlite_writer import SQLiteWriter  # noqa: E402
+from watchtower.writers.hub import HubWriter, get_writer_hub  # noqa: E402
 from watchtower.utils.sanitization import sanitize_args, truncate_response  # noqa: E402
+from watchtower.utils.preview import measure_response  # noqa: E402
+from watchtower.utils.quantiles import latency_registry  # noqa: E402
+from watchtower.utils.serialization import encode_event  # noqa: E402
+from watchtower.utils.ring_buffer import OverflowPolicy  # noqa: E402
+from watchtower.utils.fork import register_at_fork  # noqa: E402
 from watchtower.exceptions import (  # noqa: E402
+    WatchtowerConfigError,
     WatchtowerError,
     WatchtowerWriteError,
+    WatchtowerSerializationError,
 )
 
+_Hook = TypeVar("_Hook", bound=Callable[..., Any])
+
+# Keyword arguments through which ADK passes the context of a callback
+_CONTEXT_KWARGS = ("invocation_context", "callback_context", "tool_context")
+
+
+def _timed_hook(hook: _Hook) -> _Hook:
+    """Record the time spent in a plugin hook as self-telemetry.
+
+    Args:
+        hook: Async plugin hook taking keyword arguments only
+
+    Returns:
+        Wrapped hook
+    """
+    section = hook.__name__
+
+    @functools.wraps(hook)
+    async def wrapper(self: "AgentTracePlugin", **kwargs: Any) -> Any:
+        start = time.perf_counter_ns()
+        try:
+            return await hook(self, **kwargs)
+        finally:
+            self._track_hook_overhead(section, kwargs, time.perf_counter_ns() - start)
+
+    return cast(_Hook, wrapper)
+
+
+@dataclass
+class _InvocationState:
+    """Tracing state for a single in-flight agent invocation."""
+
+    invocation_id: str
+    run_id: str
+    collector: EventCollector = field(default_factory=EventCollector)
+    start_time: float = field(default_factory=time.perf_counter)
+    last_seen: float = field(default_factory=time.monotonic)
+    dropped_at_start: int = 0
+    # False if head sampling dropped the run
+    traced: bool = True
+    # Encoded events held back until the tail sampling decision (None if not buffering)
+    pending: Optional[List[Tuple[Dict[str, Any], bytes]]] = None
+    keep_reason: Optional[str] = None
+
 
 class AgentTracePlugin(BasePlugin):
     """Observability plugin for Google ADK that captures all agent activity.
@@ -52,12 +115,31 @@ class AgentTracePlugin(BasePlugin):
     This plugin hooks into all ADK lifecycle events and emits structured
     trace events to file and/or stdout for real-time monitoring and debugging.
 
+    A single plugin instance can serve many concurrent invocations. Timing and
+    summary statistics are kept per ``invocation_id`` and discarded when the
+    invocation ends, or after ``invocation_ttl`` seconds if it is abandoned.
+
+    With ``sample_rate`` below 1.0 only a deterministic fraction of run IDs is
+    traced. With ``tail_sampling`` the events of each run are held in memory
+    and written at the end of the run only if it is worth keeping (see
+    :class:`~watchtower.sampling.Sampler`).
+
+    The plugin times its own work in every hook and reports it as an
+    ``overhead`` section of the run.end summary; process-wide totals are
+    available from :meth:`get_overhead_stats`.
+
     Example:
         >>> from watchtower import AgentTracePlugin
         >>> plugin = AgentTracePlugin()
         >>> runner = InMemoryRunner(agent=agent, plugins=[plugin])
     """
 
+    # Upper bound on tracked in-flight invocations (oldest are evicted first)
+    MAX_INVOCATIONS = 10000
+
+    # Events buffered per run before tail sampling gives up and keeps the run
+    MAX_TAIL_EVENTS = 10000
+
     def __init__(
         self,
         trace_dir: str = "~/.watchtower/traces",
@@ -65,7 +147,34 @@ class AgentTracePlugin(BasePlugin):
         enable_stdout: bool = False,
         run_id: Optional[str] = None,
         sanitize: bool = True,
+        max_response_preview: int = 500,
         debug: bool = False,
+        async_writes: bool = False,
+        keep_files_open: bool = False,
+        overflow_policy: str = "drop_oldest",
+        compression: Optional[str] = None,
+        index_traces: bool = False,
+        trace_manifest: bool = True,
+        trace_layout: str = "flat",
+        adaptive_buffering: bool = False,
+        max_buffer_age_ms: Optional[float] = None,
+        shared_writers: bool = False,
+        offload_writes: bool = False,
+        writers: Optional[Sequence[Union[TraceWriter, AsyncTraceWriter]]] = None,
+        writer_queues: Optional[Dict[str, str]] = None,
+        sqlite_path: Optional[str] = None,
+        retention_days: Optional[int] = None,
+        max_trace_bytes: Optional[int] = None,
+        retention_interval: float = 300.0,
+        stdout_batch_size: int = 1,
+        stdout_max_delay_ms: float = 50.0,
+        invocation_ttl: float = 3600.0,
+        sample_rate: float = 1.0,
+        tail_sampling: bool = False,
+        tail_sample_rate: float = 0.0,
+        tail_latency_ms: Optional[float] = None,
+        tail_token_threshold: Optional[int] = None,
+        config: Optional[WatchtowerConfig] = None,
     ):
         """Initialize the trace plugin.
 
@@ -73,15 +182,129 @@ class AgentTracePlugin(BasePlugin):
             trace_dir: Directory to store trace files
             enable_file: Whether to write traces to files
             enable_stdout: Whether to emit events to stdout (for live tailing)
-            run_id: Custom run ID (auto-generated if None)
+            run_id: Custom run ID shared by all invocations. If None, each
+                   invocation gets its own auto-generated run ID.
             sanitize: Whether to sanitize sensitive data from arguments
+            max_response_preview: Maximum characters kept from tool responses
             debug: Whether to raise exceptions instead of catching them.
                    Can also be enabled via WATCHTOWER_DEBUG=1 environment variable.
+            async_writes: Whether to write trace files from a background thread so
+                   ADK callbacks never block on disk I/O. Call shutdown() (or rely on
+                   interpreter exit) to drain pending events.
+            keep_files_open: Whether to keep one O_APPEND handle open per trace file
+                   and write each batch with a single system call
+            overflow_policy: What the file writer does when its buffer is full:
+                   "drop_oldest", "drop_newest" or "block". Drops are reported in
+                   the run.end summary as dropped_events.
+            compression: Compress trace files with "gzip" (.jsonl.gz) or "zstd"
+                   (.jsonl.zst, gzip if zstandard is missing), one frame per batch
+            index_traces: Maintain a sidecar offset index next to each trace file
+                   so TraceReader can seek straight to matching events
+            trace_manifest: Record trace files, sizes and event counts in a
+                   manifest in trace_dir, so stats and cleanup need not stat every file
+            trace_layout: "flat" (all files in trace_dir), "date" (YYYY/MM/DD/
+                   partitions, expired a day at a time) or "date_agent"
+                   (YYYY/MM/DD/{agent_name}/)
+            adaptive_buffering: Let the file writer batch more events per write
+                   while events arrive quickly (up to its 1000-event buffer) and
+                   fewer when traffic is quiet
+            max_buffer_age_ms: Write buffered file events once the oldest has
+                   waited this long (default: 1000 with adaptive_buffering,
+                   otherwise events wait for a full batch or the end of the run)
+            shared_writers: Write through the process-wide WriterHub, so plugin
+                   instances with the same output settings share one buffer, one
+                   background writer thread and one pool of open trace files.
+                   Implies asynchronous writes and persistent file handles.
+            offload_writes: Run the file and SQLite writers through ThreadOffloadWriter:
+                   events go on an asyncio queue, batches are written on worker
+                   threads, and after_run_callback awaits the flush without blocking
+                   the event loop (ignored with async_writes or shared_writers)
+            writers: Additional writers, e.g. network-backed ones. AsyncTraceWriters
+                   are used as is; synchronous TraceWriters are wrapped in
+                   ThreadOffloadWriter so they run concurrently off the event loop.
+            writer_queues: Give writers their own bounded queue and writer thread,
+                   keyed by writer ("file", "sqlite", "stdout") with the policy for
+                   a full queue: "block", "drop_oldest", "drop_newest" or "sample".
+                   A stalled writer then never slows the others or the agent
+                   (unless its policy is "block"); see get_writer_stats() for lag.
+            sqlite_path: Also write events to this SQLite database (one indexed
+                   row per event) for SQL analysis; None disables it
+            retention_days: Periodically delete trace files older than this many days
+            max_trace_bytes: Periodically delete the least recently written trace
+                   files while trace_dir holds more than this many bytes
+            retention_interval: Seconds between background retention passes
+            stdout_batch_size: Number of events to coalesce per stdout write
+                   (1 writes every event immediately)
+            stdout_max_delay_ms: Maximum time a coalesced stdout event may wait
+            invocation_ttl: Seconds after which an invocation that never reached
+                   after_run_callback is evicted from memory
+            sample_rate: Fraction of runs to trace, decided from a hash of the run ID
+            tail_sampling: Whether to buffer each run's events and write them at
+                   after_run_callback only if the run errored, crossed a latency or
+                   token threshold, or won the tail_sample_rate lottery
+            tail_sample_rate: Fraction of runs kept by tail sampling that are
+                   otherwise unremarkable
+            tail_latency_ms: Tail sampling keeps runs at least this slow
+            tail_token_threshold: Tail sampling keeps runs using at least this
+                   many tokens
+            config: Settings to use instead of the keyword arguments of the same
+                   names (sanitize_args for sanitize), e.g. from
+                   WatchtowerConfig.from_environment(); its buffer_size and
+                   max_buffer_size size the file writer's buffer
+
+        Raises:
+            WatchtowerConfigError: If a sampling rate is outside [0, 1], or
+                writer_queues names an unknown writer or policy
         """
         super().__init__(name="watchtower")
 
+        buffer_size = 10
+        max_buffer_size = FileWriter.MAX_BUFFER_SIZE
+        if config is not None:
+            trace_dir = config.trace_dir
+            enable_file = config.enable_file
+            enable_stdout = config.enable_stdout
+            sanitize = config.sanitize_args
+            max_response_preview = config.max_response_preview
+            buffer_size = config.buffer_size
+            max_buffer_size = config.max_buffer_size
+            async_writes = config.async_writes
+            keep_files_open = config.keep_files_open
+            overflow_policy = config.overflow_policy
+            compression = config.compression
+            index_traces = config.index_traces
+            trace_manifest = config.trace_manifest
+            trace_layout = config.trace_layout
+            adaptive_buffering = config.adaptive_buffering
+            max_buffer_age_ms = config.max_buffer_age_ms
+            shared_writers = config.shared_writers
+            offload_writes = config.offload_writes
+            writer_queues = config.writer_queues
+            sqlite_path = config.sqlite_path
+            retention_days = config.retention_days
+            max_trace_bytes = config.max_trace_bytes
+            retention_interval = config.retention_interval
+            stdout_batch_size = config.stdout_batch_size
+            stdout_max_delay_ms = config.stdout_max_delay_ms
+            sample_rate = config.sample_rate
+            tail_sampling = config.tail_sampling
+            tail_sample_rate = config.tail_sample_rate
+            tail_latency_ms = config.tail_latency_ms
+            tail_token_threshold = config.tail_token_threshold
+
+        # Event factory and process-wide overhead statistics; per-invocation
+        # statistics live in _InvocationState
         self.collector = EventCollector()
         self.sanitize = sanitize
+        self.max_response_preview = max_response_preview
+        self.sampler = Sampler(
+            sample_rate=sample_rate,
+            tail_sampling=tail_sampling,
+            tail_sample_rate=tail_sample_rate,
+            tail_latency_ms=tail_latency_ms,
+            tail_token_threshold=tail_token_threshold,
+        )
+        self._sampled_out_runs = 0
 
         # Debug mode: re-raise exceptions instead of silently catching
         self.debug = debug or os.environ.get("WATCHTOWER_DEBUG", "").lower() in (
@@ -90,15 +313,139 @@ class AgentTracePlugin(BasePlugin):
             "yes",
         )
 
+        # A run ID supplied by the caller or the CLI is shared by every
+        # invocation (and every forked worker); otherwise each gets its own.
+        self._run_id_pinned = bool(run_id or os.environ.get("WATCHTOWER_RUN_ID"))
+
         # Initialize writers
-        self.file_writer = FileWriter(trace_dir) if enable_file else None
-        self.stdout_writer = StdoutWriter() if enable_stdout else None
+        queue_policies = self._queue_policies(writer_queues)
+        hub = get_writer_hub() if shared_writers else None
+        self.file_writer: Optional[AnyTraceWriter] = None
+        if enable_file and hub is not None:
+            self.file_writer = hub.file_writer(
+                trace_dir,
+                overflow_policy=overflow_policy,
+                compression=compression,
+                index=index_traces,
+                manifest=trace_manifest,
+                layout=trace_layout,
+                adaptive=adaptive_buffering,
+                max_buffer_age_ms=max_buffer_age_ms,
+                per_process_files=self._run_id_pinned,
+            )
+            if "file" in queue_policies:
+                self.file_writer = BackgroundWriter(self.file_writer, policy=queue_policies["file"])
+        elif enable_file:
+            self.file_writer = FileWriter(
+                trace_dir,
+                buffer_size=buffer_size,
+                max_buffer_size=max_buffer_size,
+                keep_open=keep_files_open,
+                overflow_policy=overflow_policy,
+                compression=compression,
+                index=index_traces,
+                manifest=trace_manifest,
+                layout=trace_layout,
+                adaptive=adaptive_buffering,
+                max_buffer_age_ms=max_buffer_age_ms,
+                per_process_files=self._run_id_pinned,
+            )
+            if "file" in queue_policies:
+                self.file_writer = BackgroundWriter(self.file_writer, policy=queue_policies["file"])
+            elif async_writes:
+                self.file_writer = BackgroundWriter(self.file_writer)
+            elif offload_writes:
+                self.file_writer = ThreadOffloadWriter(self.file_writer)
+        # Background retention for the trace directory (file output only)
+        self.retention: Optional[RetentionTask] = None
+        if enable_file and (retention_days is not None or max_trace_bytes is not None):
+            self.retention = RetentionTask(
+                trace_dir,
+                retention_days=retention_days,
+                max_bytes=max_trace_bytes,
+                interval=retention_interval,
+            )
+            self.retention.start()
+
+        self.sqlite_writer: Optional[AnyTraceWriter] = None
+        if sqlite_path and hub is not None:
+            self.sqlite_writer = hub.sqlite_writer(sqlite_path, overflow_policy=overflow_policy)
+        elif sqlite_path:
+            self.sqlite_writer = SQLiteWriter(sqlite_path, overflow_policy=overflow_policy)
+        if self.sqlite_writer is not None and "sqlite" in queue_policies:
+            self.sqlite_writer = BackgroundWriter(
+                self.sqlite_writer, policy=queue_policies["sqlite"]
+            )
+        elif self.sqlite_writer is not None and hub is None:
+            if async_writes:
+                self.sqlite_writer = BackgroundWriter(self.sqlite_writer)
+            elif offload_writes:
+                self.sqlite_writer = ThreadOffloadWriter(self.sqlite_writer)
+        self.stdout_writer: Optional[TraceWriter] = None
+        if enable_stdout and hub is not None:
+            self.stdout_writer = hub.stdout_writer(
+                batch_size=stdout_batch_size,
+                max_delay_ms=stdout_max_delay_ms,
+            )
+        elif enable_stdout:
+            self.stdout_writer = StdoutWriter(
+                batch_size=stdout_batch_size,
+                max_delay_ms=stdout_max_delay_ms,
+            )
+        if self.stdout_writer is not None and "stdout" in queue_policies:
+            self.stdout_writer = BackgroundWriter(
+                self.stdout_writer, policy=queue_policies["stdout"]
+            )
+        self.extra_writers: List[AsyncTraceWriter] = [
+            writer if isinstance(writer, AsyncTraceWriter) else ThreadOffloadWriter(writer)
+            for writer in writers or ()
+        ]
 
         # Generate or use provided run ID
+        self._run_id_used = False
         self.run_id = run_id or self._generate_run_id()
 
-        # Track timing
-        self._invocation_start: float = 0
+        # Per-invocation state, ordered by last activity for TTL eviction
+        self._invocations: "OrderedDict[str, _InvocationState]" = OrderedDict()
+        self._invocation_ttl = invocation_ttl
+        self._evicted_invocations = 0
+        register_at_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        """Start a forked worker with its own run ID and no inherited runs.
+
+        Invocations in flight belong to the parent, which finishes them.
+        A pinned run ID stays shared, as it is across invocations.
+        """
+        if not self._run_id_pinned:
+            self.run_id = str(uuid.uuid4())[:8]
+            self._run_id_used = False
+        self._invocations = OrderedDict()
+        self._evicted_invocations = 0
+        self._sampled_out_runs = 0
+        self.collector = EventCollector()
+
+    @staticmethod
+    def _queue_policies(writer_queues: Optional[Dict[str, str]]) -> Dict[str, OverflowPolicy]:
+        """Validate the writer_queues argument.
+
+        Raises:
+            WatchtowerConfigError: If a writer or policy name is unknown
+        """
+        policies: Dict[str, OverflowPolicy] = {}
+        for writer_type, policy in (writer_queues or {}).items():
+            if writer_type not in ("file", "sqlite", "stdout"):
+                raise WatchtowerConfigError(
+                    f"writer_queues keys must be 'file', 'sqlite' or 'stdout', got {writer_type!r}"
+                )
+            try:
+                policies[writer_type] = OverflowPolicy(policy)
+            except ValueError:
+                raise WatchtowerConfigError(
+                    f"Unknown queue policy {policy!r} for {writer_type} writer "
+                    f"(expected one of {[p.value for p in OverflowPolicy]})"
+                )
+        return policies
 
     def _generate_run_id(self) -> str:
         """Generate a unique run ID.
@@ -114,6 +461,7 @@ class AgentTracePlugin(BasePlugin):
 
     # === Lifecycle Hooks ===
 
+    @_timed_hook
     async def before_run_callback(
         self,
         *,
@@ -128,22 +476,26 @@ class AgentTracePlugin(BasePlugin):
             Optional event (None for this plugin)
         """
         try:
-            self._invocation_start = time.perf_counter()
+            self._evict_expired_invocations()
+            state = self._start_invocation(
+                getattr(invocation_context, "invocation_id", None) or "unknown"
+            )
 
             event = self.collector.create_event(
                 type="run.start",
-                run_id=self.run_id,
-                invocation_id=getattr(invocation_context, "invocation_id", "unknown"),
+                run_id=state.run_id,
+                invocation_id=state.invocation_id,
                 agent_name=getattr(invocation_context.agent, "name", "unknown"),
                 timestamp=time.time(),
             )
 
-            self._emit(event)
+            self._emit(event, state)
         except Exception as e:
             self._log_internal_error("before_run_callback", e)
 
         return None
 
+    @_timed_hook
     async def after_run_callback(
         self,
         *,
@@ -155,27 +507,57 @@ class AgentTracePlugin(BasePlugin):
             invocation_context: ADK invocation context
         """
         try:
-            duration = time.perf_counter() - self._invocation_start
+            state = self._end_invocation(invocation_context)
+            if state is None or not state.traced:
+                return
+
+            duration = time.perf_counter() - state.start_time
+            # Fold this run's sketches into the process-wide registry, whether
+            # or not the run is kept by tail sampling
+            for kind, sketches in state.collector.get_latency_sketches().items():
+                for name, sketch in sketches.items():
+                    latency_registry.merge(kind, name, sketch)
+
+            reason = state.keep_reason or "head"
+            if state.pending is not None:
+                stats = state.collector.get_summary()
+                tail_reason = self.sampler.tail_decision(
+                    errors=stats["errors"],
+                    duration_ms=duration * 1000,
+                    total_tokens=stats["total_tokens"],
+                )
+                if tail_reason is None:
+                    self._sampled_out_runs += 1
+                    return
+                reason = tail_reason
+                self._release_pending(state, reason)
+
+            # Drop counters are writer-wide, so this counts drops that happened
+            # while the run was active (including those of overlapping runs)
+            state.collector.track_dropped_events(
+                self._dropped_events_total() - state.dropped_at_start
+            )
+            summary = state.collector.get_summary()
+            if self.sampler.enabled:
+                summary["sampling"] = self.sampler.describe(reason, self._sampled_out_runs)
 
             event = self.collector.create_event(
                 type="run.end",
-                run_id=self.run_id,
-                invocation_id=getattr(invocation_context, "invocation_id", "unknown"),
+                run_id=state.run_id,
+                invocation_id=state.invocation_id,
                 duration_ms=duration * 1000,
-                summary=self.collector.get_summary(),
+                summary=summary,
                 timestamp=time.time(),
             )
 
-            self._emit(event)
-            self._flush()
-
-            # Reset collector for next run
-            self.collector.reset()
+            self._emit(event, state)
+            await self._flush()
         except Exception as e:
             self._log_internal_error("after_run_callback", e)
 
     # === LLM Hooks ===
 
+    @_timed_hook
     async def before_model_callback(
         self,
         *,
@@ -192,14 +574,18 @@ class AgentTracePlugin(BasePlugin):
             Optional LLM response (None for this plugin)
         """
         try:
+            state = self._get_invocation(callback_context)
+            if not state.traced:
+                return None
             callback_context.state["_llm_start"] = time.perf_counter()
             callback_context.state["_llm_request_id"] = str(uuid.uuid4())[:8]
+            callback_context.state["_llm_model"] = self._extract_model(llm_request)
 
             event = self.collector.create_event(
                 type="llm.request",
-                run_id=self.run_id,
+                run_id=state.run_id,
                 request_id=callback_context.state["_llm_request_id"],
-                model=self._extract_model(llm_request),
+                model=callback_context.state["_llm_model"],
                 message_count=(
                     len(llm_request.contents)
                     if hasattr(llm_request, "contents") and llm_request.contents
@@ -209,12 +595,13 @@ class AgentTracePlugin(BasePlugin):
                 timestamp=time.time(),
             )
 
-            self._emit(event)
+            self._emit(event, state)
         except Exception as e:
             self._log_internal_error("before_model_callback", e)
 
         return None
 
+    @_timed_hook
     async def after_model_callback(
         self,
         *,
@@ -231,6 +618,9 @@ class AgentTracePlugin(BasePlugin):
             Optional LLM response (None for this plugin)
         """
         try:
+            state = self._get_invocation(callback_context)
+            if not state.traced:
+                return None
             duration = time.perf_counter() - callback_context.state.get("_llm_start", 0)
 
             input_tokens = self._safe_token_count(llm_response, "input")
@@ -238,11 +628,14 @@ class AgentTracePlugin(BasePlugin):
             total_tokens = self._safe_token_count(llm_response, "total")
 
             # Track for summary statistics
-            self.collector.track_llm_call(total_tokens)
+            state.collector.track_llm_call(total_tokens)
+            state.collector.track_latency(
+                "models", callback_context.state.get("_llm_model", "unknown"), duration * 1000
+            )
 
             event = self.collector.create_event(
                 type="llm.response",
-                run_id=self.run_id,
+                run_id=state.run_id,
                 request_id=callback_context.state.get("_llm_request_id", "unknown"),
                 duration_ms=duration * 1000,
                 input_tokens=input_tokens,
@@ -253,7 +646,7 @@ class AgentTracePlugin(BasePlugin):
                 timestamp=time.time(),
             )
 
-            self._emit(event)
+            self._emit(event, state)
         except Exception as e:
             self._log_internal_error("after_model_callback", e)
 
@@ -261,6 +654,7 @@ class AgentTracePlugin(BasePlugin):
 
     # === Tool Hooks ===
 
+    @_timed_hook
     async def before_tool_callback(
         self,
         *,
@@ -279,6 +673,9 @@ class AgentTracePlugin(BasePlugin):
             Optional modified arguments (None for this plugin)
         """
         try:
+            state = self._get_invocation(tool_context)
+            if not state.traced:
+                return None
             tool_context.state["_tool_start"] = time.perf_counter()
             tool_context.state["_tool_call_id"] = (
                 getattr(tool_context, "function_call_id", None) or str(uuid.uuid4())[:8]
@@ -286,11 +683,11 @@ class AgentTracePlugin(BasePlugin):
 
             # Track for summary
             tool_name = getattr(tool, "name", "unknown")
-            self.collector.track_tool_call(tool_name)
+            state.collector.track_tool_call(tool_name)
 
             event = self.collector.create_event(
                 type="tool.start",
-                run_id=self.run_id,
+                run_id=state.run_id,
                 tool_call_id=tool_context.state["_tool_call_id"],
                 tool_name=tool_name,
                 tool_args=sanitize_args(tool_args) if self.sanitize else tool_args,
@@ -298,12 +695,13 @@ class AgentTracePlugin(BasePlugin):
                 timestamp=time.time(),
             )
 
-            self._emit(event)
+            self._emit(event, state)
         except Exception as e:
             self._log_internal_error("before_tool_callback", e)
 
         return None
 
+    @_timed_hook
     async def after_tool_callback(
         self,
         *,
@@ -324,25 +722,34 @@ class AgentTracePlugin(BasePlugin):
             Optional modified response (None for this plugin)
         """
         try:
+            state = self._get_invocation(tool_context)
+            if not state.traced:
+                return None
             duration = time.perf_counter() - tool_context.state.get("_tool_start", 0)
+            response_bytes, response_items = measure_response(result)
+            tool_name = getattr(tool, "name", "unknown")
+            state.collector.track_latency("tools", tool_name, duration * 1000)
 
             event = self.collector.create_event(
                 type="tool.end",
-                run_id=self.run_id,
+                run_id=state.run_id,
                 tool_call_id=tool_context.state.get("_tool_call_id", "unknown"),
-                tool_name=getattr(tool, "name", "unknown"),
+                tool_name=tool_name,
                 duration_ms=duration * 1000,
-                response_preview=truncate_response(result),
+                response_preview=truncate_response(result, self.max_response_preview),
+                response_bytes=response_bytes,
+                response_items=response_items,
                 success=True,
                 timestamp=time.time(),
             )
 
-            self._emit(event)
+            self._emit(event, state)
         except Exception as e:
             self._log_internal_error("after_tool_callback", e)
 
         return None
 
+    @_timed_hook
     async def on_tool_error_callback(
         self,
         *,
@@ -364,11 +771,14 @@ class AgentTracePlugin(BasePlugin):
         """
         try:
             # Track error
-            self.collector.track_error()
+            state = self._get_invocation(tool_context)
+            if not state.traced:
+                return None
+            state.collector.track_error()
 
             event = self.collector.create_event(
                 type="tool.error",
-                run_id=self.run_id,
+                run_id=state.run_id,
                 tool_call_id=tool_context.state.get("_tool_call_id", "unknown"),
                 tool_name=getattr(tool, "name", "unknown"),
                 error_type=type(error).__name__,
@@ -376,7 +786,7 @@ class AgentTracePlugin(BasePlugin):
                 timestamp=time.time(),
             )
 
-            self._emit(event)
+            self._emit(event, state)
         except Exception as e:
             self._log_internal_error("on_tool_error_callback", e)
 
@@ -384,6 +794,7 @@ class AgentTracePlugin(BasePlugin):
 
     # === Event Hooks ===
 
+    @_timed_hook
     async def on_event_callback(
         self,
         *,
@@ -407,63 +818,357 @@ class AgentTracePlugin(BasePlugin):
                 and hasattr(event.actions, "state_delta")
                 and event.actions.state_delta
             ):
+                # Events can arrive after after_run_callback ended the
+                # invocation; recreating its state would leak it until the TTL
+                state = self._find_invocation(invocation_context)
+                if state is None:
+                    logger.debug(
+                        "No state for invocation %s; skipping state.change",
+                        getattr(invocation_context, "invocation_id", None),
+                    )
+                    return None
                 trace_event = self.collector.create_event(
                     type="state.change",
-                    run_id=self.run_id,
+                    run_id=state.run_id,
                     author=getattr(event, "author", "unknown"),
                     state_delta=dict(event.actions.state_delta),
                     timestamp=time.time(),
                 )
-                self._emit(trace_event)
+                self._emit(trace_event, state)
         except Exception as e:
             self._log_internal_error("on_event_callback", e)
 
         return None
 
+    # === Invocation State ===
+
+    def _next_run_id(self) -> str:
+        """Pick the run ID for a new invocation.
+
+        A pinned run ID is shared by all invocations. Otherwise the first
+        invocation uses the ID generated at construction time and later ones
+        get fresh IDs; ``self.run_id`` always reflects the latest invocation.
+
+        Returns:
+            Run ID for the invocation
+        """
+        if self._run_id_pinned:
+            return self.run_id
+
+        if self._run_id_used:
+            self.run_id = str(uuid.uuid4())[:8]
+        self._run_id_used = True
+        return self.run_id
+
+    def _start_invocation(self, invocation_id: str) -> _InvocationState:
+        """Create tracking state for a new invocation.
+
+        Args:
+            invocation_id: ADK invocation identifier
+
+        Returns:
+            Fresh invocation state
+        """
+        run_id = self._next_run_id()
+        state = _InvocationState(
+            invocation_id=invocation_id,
+            run_id=run_id,
+            dropped_at_start=self._dropped_events_total(),
+            traced=self.sampler.head_sample(run_id),
+        )
+        if not state.traced:
+            self._sampled_out_runs += 1
+        elif self.sampler.tail_sampling:
+            state.pending = []
+        self._invocations[invocation_id] = state
+        self._invocations.move_to_end(invocation_id)
+
+        while len(self._invocations) > self.MAX_INVOCATIONS:
+            self._invocations.popitem(last=False)
+            self._evicted_invocations += 1
+
+        return state
+
+    def _get_invocation(self, context: Any) -> _InvocationState:
+        """Look up the state for the invocation a callback belongs to.
+
+        Invocations that started before the plugin saw them (or were already
+        evicted) get state created on demand.
+
+        Args:
+            context: Any ADK context exposing ``invocation_id``
+
+        Returns:
+            Invocation state
+        """
+        state = self._find_invocation(context)
+        if state is None:
+            invocation_id = getattr(context, "invocation_id", None) or "unknown"
+            return self._start_invocation(invocation_id)
+        return state
+
+    def _find_invocation(self, context: Any) -> Optional[_InvocationState]:
+        """Look up the state for a tracked invocation without creating any.
+
+        Args:
+            context: Any ADK context exposing ``invocation_id``
+
+        Returns:
+            Invocation state, or None if the invocation is not tracked
+            (ended, evicted or never started)
+        """
+        invocation_id = getattr(context, "invocation_id", None) or "unknown"
+        state = self._invocations.get(invocation_id)
+        if state is None:
+            return None
+
+        state.last_seen = time.monotonic()
+        self._invocations.move_to_end(invocation_id)
+        return state
+
+    def _end_invocation(self, context: Any) -> Optional[_InvocationState]:
+        """Remove and return the state for a finished invocation.
+
+        Unlike _get_invocation(), no state is created: an invocation that was
+        evicted or never started has no run.start, so it gets no run.end.
+
+        Args:
+            context: Any ADK context exposing ``invocation_id``
+
+        Returns:
+            Invocation state, or None if the invocation is not tracked
+        """
+        invocation_id = getattr(context, "invocation_id", None) or "unknown"
+        state = self._invocations.pop(invocation_id, None)
+        if state is None:
+            logger.debug("No state for finished invocation %s; skipping run.end", invocation_id)
+        return state
+
+    def _evict_expired_invocations(self) -> None:
+        """Drop state for invocations idle for longer than the TTL."""
+        cutoff = time.monotonic() - self._invocation_ttl
+
+        while self._invocations:
+            invocation_id, state = next(iter(self._invocations.items()))
+            if state.last_seen >= cutoff:
+                break
+            del self._invocations[invocation_id]
+            self._evicted_invocations += 1
+            logger.debug("Evicted abandoned invocation %s (run %s)", invocation_id, state.run_id)
+
     # === Internal Helper Methods ===
 
-    def _emit(self, event: Dict[str, Any]) -> None:
-        """Emit event to all enabled writers.
+    def _writers(self) -> List[Tuple[str, AnyTraceWriter]]:
+        """List enabled writers with their type names.
+
+        Returns:
+            List of (writer_type, writer) tuples
+        """
+        writers: List[Tuple[str, AnyTraceWriter]] = []
+        if self.file_writer:
+            writers.append(("file", self.file_writer))
+        if self.sqlite_writer:
+            writers.append(("sqlite", self.sqlite_writer))
+        if self.stdout_writer:
+            writers.append(("stdout", self.stdout_writer))
+        for writer in self.extra_writers:
+            writers.append(("custom", writer))
+        return writers
+
+    def _dropped_events_total(self) -> int:
+        """Total events dropped so far by all writers.
+
+        Returns:
+            Sum of each writer's dropped_events counter
+        """
+        total = 0
+        for _, writer in self._writers():
+            total += writer.get_stats().get("dropped_events", 0)
+        return total
+
+    def _emit(self, event: Dict[str, Any], state: _InvocationState) -> None:
+        """Emit event to all enabled writers, subject to sampling.
+
+        The event is serialized once and the bytes are shared by every writer.
+        Events of runs awaiting a tail sampling decision are buffered instead.
 
         Args:
             event: Event dictionary to emit
+            state: State of the invocation the event belongs to
         """
-        if self.file_writer:
+        if not state.traced or not (
+            self.file_writer or self.sqlite_writer or self.stdout_writer or self.extra_writers
+        ):
+            return
+
+        start = time.perf_counter_ns()
+        try:
+            data = encode_event(event)
+        except WatchtowerSerializationError as e:
+            self._log_internal_error("_emit", e)
+            return
+
+        if state.pending is None:
+            self._write_encoded(event, data)
+        else:
+            state.pending.append((event, data))
+            if len(state.pending) >= self.MAX_TAIL_EVENTS:
+                # Bound memory: keep the run and stop buffering it
+                self._release_pending(state, REASON_BUFFER_FULL)
+
+        elapsed = time.perf_counter_ns() - start
+        state.collector.track_overhead("emit", elapsed, nested=True)
+        self.collector.track_overhead("emit", elapsed, nested=True)
+
+    def _release_pending(self, state: _InvocationState, reason: str) -> None:
+        """Write a run's buffered events and stop buffering it.
+
+        Args:
+            state: Invocation state with buffered events
+            reason: Why the run is being kept
+        """
+        pending = state.pending or []
+        state.pending = None
+        state.keep_reason = reason
+        for event, data in pending:
+            self._write_encoded(event, data)
+
+    def _write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Write an encoded event to all enabled writers.
+
+        Args:
+            event: Event dictionary
+            data: Compact JSON encoding of the event
+        """
+        for writer_type, writer in self._writers():
             try:
-                self.file_writer.write(event)
+                writer.write_encoded(event, data)
             except Exception as e:
                 self._log_internal_error(
                     "_emit",
-                    WatchtowerWriteError(str(e), writer_type="file"),
+                    WatchtowerWriteError(str(e), writer_type=writer_type),
                 )
 
-        if self.stdout_writer:
+    async def _flush(self) -> None:
+        """Flush all writers at end of run.
+
+        Asynchronous writers are flushed concurrently and awaited, so the
+        event loop keeps running while they wait for I/O. Background writers
+        are only asked to flush so the event loop is never blocked waiting
+        for disk I/O.
+        """
+        pending: List[Tuple[str, Any]] = []
+        for writer_type, writer in self._writers():
             try:
-                self.stdout_writer.write(event)
+                if isinstance(writer, AsyncTraceWriter):
+                    pending.append((writer_type, writer.flush()))
+                elif isinstance(writer, (BackgroundWriter, HubWriter)):
+                    writer.request_flush()
+                else:
+                    writer.flush()
             except Exception as e:
                 self._log_internal_error(
-                    "_emit",
-                    WatchtowerWriteError(str(e), writer_type="stdout"),
+                    "_flush",
+                    WatchtowerWriteError(str(e), writer_type=writer_type),
                 )
 
-    def _flush(self) -> None:
-        """Flush all writers at end of run."""
-        if self.file_writer:
-            try:
-                self.file_writer.flush()
-            except Exception as e:
+        results = await asyncio.gather(*(flush for _, flush in pending), return_exceptions=True)
+        for (writer_type, _), result in zip(pending, results):
+            if isinstance(result, Exception):
                 self._log_internal_error(
                     "_flush",
-                    WatchtowerWriteError(str(e), writer_type="file"),
+                    WatchtowerWriteError(str(result), writer_type=writer_type),
                 )
 
-        if self.stdout_writer:
+    def _track_hook_overhead(self, section: str, kwargs: Dict[str, Any], elapsed_ns: int) -> None:
+        """Record time spent in a hook, process-wide and for its invocation.
+
+        The run.end summary is built inside after_run_callback, so a run's own
+        after_run_callback time only appears in the process-wide statistics.
+
+        Args:
+            section: Hook name
+            kwargs: Keyword arguments the hook was called with
+            elapsed_ns: Time spent in the hook in nanoseconds
+        """
+        try:
+            self.collector.track_overhead(section, elapsed_ns)
+            for name in _CONTEXT_KWARGS:
+                context = kwargs.get(name)
+                if context is not None:
+                    invocation_id = getattr(context, "invocation_id", None) or "unknown"
+                    state = self._invocations.get(invocation_id)
+                    if state is not None:
+                        state.collector.track_overhead(section, elapsed_ns)
+                    break
+        except Exception as e:
+            self._log_internal_error("_track_hook_overhead", e)
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Get rolling latency quantiles for tools and models.
+
+        Quantiles come from the process-wide registry, which every plugin
+        instance feeds at the end of each run (runs dropped by head sampling
+        are not timed). They cover roughly the last hour.
+
+        Returns:
+            Dictionary of "tools"/"models" -> name -> {count, p50_ms, p90_ms, p99_ms}
+        """
+        return latency_registry.snapshot()
+
+    def get_writer_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get each writer's counters.
+
+        Writers with their own queue (writer_queues, async_writes) report
+        queue_depth, lag_ms (age of the oldest queued event), max_lag_ms
+        and drops, so a stalled consumer (e.g. a live tail that stopped
+        reading stdout) can be spotted and alerted on.
+
+        Returns:
+            Dictionary of writer ("file", "sqlite", "stdout", "custom",
+            "custom_2", ...) -> counters
+        """
+        stats: Dict[str, Dict[str, int]] = {}
+        for writer_type, writer in self._writers():
+            name, n = writer_type, 1
+            while name in stats:
+                n += 1
+                name = f"{writer_type}_{n}"
             try:
-                self.stdout_writer.flush()
+                stats[name] = writer.get_stats()
+            except Exception as e:
+                self._log_internal_error("get_writer_stats", e)
+        return stats
+
+    def get_overhead_stats(self) -> Dict[str, Any]:
+        """Get the time this plugin has spent in its own code.
+
+        Covers every invocation handled so far. Use it to alert when tracing
+        overhead exceeds a budget, e.g. on the p99 of a hook.
+
+        Returns:
+            Dictionary with total_us and a histogram per section ("emit" is
+            contained in the hook sections and excluded from total_us). Each
+            histogram has count, total_us, max_us, p50_us, p99_us and bucket
+            counts aligned with watchtower.utils.histogram.BUCKET_BOUNDS_US.
+        """
+        return self.collector.get_overhead()
+
+    def shutdown(self) -> None:
+        """Flush and close all writers.
+
+        Blocks until background writers have drained their queues. Call this
+        when the runner is being torn down.
+        """
+        if self.retention is not None:
+            self.retention.stop()
+        for writer_type, writer in self._writers():
+            try:
+                writer.close()
             except Exception as e:
                 self._log_internal_error(
-                    "_flush",
-                    WatchtowerWriteError(str(e), writer_type="stdout"),
+                    "shutdown",
+                    WatchtowerWriteError(str(e), writer_type=writer_type),
                 )
 
     def _extract_model(self, llm_request: LlmRequest) -> str:
@@ -0,0 +1,390 @@
+"""Parallel queries over a directory of trace files.
+
+A query filters events by type, tool name, run ID and time window and
+aggregates the matches into per-group counts, error counts, duration sums
+and duration quantile sketches. Files are first pruned by the date and run
+ID in their names, then scanned in a process pool; each worker returns a
+partial result and the partials are merged, so throughput scales with the
+number of cores.
+
+Example:
+    >>> query = TraceQuery(types=["tool.error"], since=parse_time("7d"))
+    >>> result = run_query(query)
+    >>> for name, group in result.top(5):
+    ...     print(name, group.count)
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from watchtower.cleanup import TRACE_FILE_PATTERN, scan_trace_files
+from watchtower.reader import iter_events
+from watchtower.utils.quantiles import DDSketch
+
+logger = logging.getLogger("watchtower")
+
+# Batches handed out per worker, so uneven file sizes still balance out
+BATCHES_PER_WORKER = 4
+
+# A run's events can be written to a file named after the following day
+# (e.g. a run started just before midnight), so "until" pruning allows a day
+UNTIL_SLACK = timedelta(days=1)
+
+_RELATIVE_TIME = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_time(value: str, now: Optional[float] = None) -> float:
+    """Parse a time given on the command line into a Unix timestamp.
+
+    Args:
+        value: Relative age ("30m", "24h", "7d", "2w"), ISO date or datetime
+            ("2024-01-15", "2024-01-15T12:00:00") or Unix timestamp
+        now: Reference time for relative values (default: current time)
+
+    Returns:
+        Unix timestamp
+
+    Raises:
+        ValueError: If the value cannot be parsed
+    """
+    value = value.strip()
+    match = _RELATIVE_TIME.match(value)
+    if match:
+        reference = time.time() if now is None else now
+        return reference - float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time {value!r} (use e.g. 7d, 2024-01-15 or a timestamp)")
+
+
+@dataclass
+class TraceQuery:
+    """Predicates and grouping for a trace query.
+
+    Attributes:
+        types: Event types to include (all if None)
+        tool_name: Only events for this tool
+        run_id: Only events from this run
+        since: Only events with timestamp >= since (Unix time)
+        until: Only events with timestamp < until (Unix time)
+        group_by: Event field to aggregate by, e.g. "tool_name", "type" or "run_id"
+    """
+
+    types: Optional[List[str]] = None
+    tool_name: Optional[str] = None
+    run_id: Optional[str] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    group_by: str = "tool_name"
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """Check an event against all predicates.
+
+        Args:
+            event: Parsed trace event
+
+        Returns:
+            True if the event matches
+        """
+        if self.types is not None and event.get("type") not in self.types:
+            return False
+        if self.tool_name is not None and event.get("tool_name") != self.tool_name:
+            return False
+        if self.run_id is not None and event.get("run_id") != self.run_id:
+            return False
+        if self.since is not None or self.until is not None:
+            timestamp = event.get("timestamp")
+            if not isinstance(timestamp, (int, float)):
+                return False
+            if self.since is not None and timestamp < self.since:
+                return False
+            if self.until is not None and timestamp >= self.until:
+                return False
+        return True
+
+    def prefilter(self) -> Optional[bytes]:
+        """Raw bytes every matching line must contain, if any.
+
+        Returns:
+            The JSON-encoded tool name, or None when there is no cheap filter
+        """
+        if self.tool_name is None or not self.tool_name.isascii():
+            return None
+        return json.dumps(self.tool_name).encode("ascii")
+
+    def keep_file(self, path: Path, mtime: Optional[float] = None) -> bool:
+        """Decide from a trace file's name (and mtime if needed) whether to scan it.
+
+        Args:
+            path: Trace file path
+            mtime: The file's modification time if already known
+
+        Returns:
+            False if the file cannot contain matching events
+        """
+        match = TRACE_FILE_PATTERN.match(path.name)
+        if not match:
+            return False
+        date_str, file_run_id = match.group(1), match.group(2)
+
+        if self.run_id is not None and file_run_id != self.run_id:
+            return False
+        if self.until is not None:
+            last_date = (datetime.fromtimestamp(self.until) + UNTIL_SLACK).strftime("%Y-%m-%d")
+            if date_str > last_date:
+                return False
+        if self.since is not None:
+            first_date = datetime.fromtimestamp(self.since).strftime("%Y-%m-%d")
+            if date_str < first_date:
+                # Older file: only relevant if it was still written to since then
+                if mtime is None:
+                    try:
+                        mtime = path.stat().st_mtime
+                    except OSError:
+                        return False
+                return mtime >= self.since
+        return True
+
+
+@dataclass
+class GroupStats:
+    """Aggregates for one group of matching events."""
+
+    count: int = 0
+    errors: int = 0
+    duration_count: int = 0
+    duration_sum_ms: float = 0.0
+    total_tokens: int = 0
+    durations: DDSketch = field(default_factory=DDSketch)
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Add one event.
+
+        Args:
+            event: Matching trace event
+        """
+        self.count += 1
+        if event.get("type") == "tool.error":
+            self.errors += 1
+        duration = event.get("duration_ms")
+        if isinstance(duration, (int, float)):
+            self.duration_count += 1
+            self.duration_sum_ms += duration
+            self.durations.add(duration)
+        tokens = event.get("total_tokens")
+        if isinstance(tokens, int):
+            self.total_tokens += tokens
+
+    def merge(self, other: "GroupStats") -> None:
+        """Add another partial aggregate for the same group.
+
+        Args:
+            other: Partial aggregate
+        """
+        self.count += other.count
+        self.errors += other.errors
+        self.duration_count += other.duration_count
+        self.duration_sum_ms += other.duration_sum_ms
+        self.total_tokens += other.total_tokens
+        self.durations.merge(other.durations)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the group.
+
+        Returns:
+            Dictionary with counts, token total, mean and quantile durations
+        """
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "errors": self.errors,
+            "total_tokens": self.total_tokens,
+            "mean_ms": (
+                round(self.duration_sum_ms / self.duration_count, 3)
+                if self.duration_count
+                else None
+            ),
+        }
+        quantiles = self.durations.to_dict()
+        del quantiles["count"]
+        summary.update(quantiles)
+        return summary
+
+
+@dataclass
+class QueryResult:
+    """Merged result of a trace query."""
+
+    files_scanned: int = 0
+    files_pruned: int = 0
+    events_matched: int = 0
+    by_type: Dict[str, int] = field(default_factory=dict)
+    groups: Dict[str, GroupStats] = field(default_factory=dict)
+
+    def add(self, event: Dict[str, Any], group_by: str) -> None:
+        """Add one matching event.
+
+        Args:
+            event: Matching trace event
+            group_by: Event field to group by
+        """
+        self.events_matched += 1
+        event_type = str(event.get("type"))
+        self.by_type[event_type] = self.by_type.get(event_type, 0) + 1
+
+        key = event.get(group_by)
+        name = "(none)" if key is None else str(key)
+        group = self.groups.get(name)
+        if group is None:
+            group = self.groups[name] = GroupStats()
+        group.add(event)
+
+    def merge(self, other: "QueryResult") -> None:
+        """Add a partial result (e.g. from another worker).
+
+        Args:
+            other: Partial result
+        """
+        self.files_scanned += other.files_scanned
+        self.files_pruned += other.files_pruned
+        self.events_matched += other.events_matched
+        for event_type, count in other.by_type.items():
+            self.by_type[event_type] = self.by_type.get(event_type, 0) + count
+        for name, stats in other.groups.items():
+            group = self.groups.get(name)
+            if group is None:
+                self.groups[name] = stats
+            else:
+                group.merge(stats)
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[str, GroupStats]]:
+        """Groups ordered by event count, largest first.
+
+        Args:
+            limit: Maximum number of groups (all if None)
+
+        Returns:
+            List of (group name, stats) tuples
+        """
+        ordered = sorted(self.groups.items(), key=lambda item: (-item[1].count, item[0]))
+        return ordered[:limit] if limit is not None else ordered
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "files_scanned": self.files_scanned,
+            "files_pruned": self.files_pruned,
+            "events_matched": self.events_matched,
+            "by_type": dict(self.by_type),
+            "groups": {name: stats.to_dict() for name, stats in self.top()},
+        }
+
+
+def scan_files(query: TraceQuery, paths: List[Path]) -> QueryResult:
+    """Scan trace files in the current process.
+
+    This is the unit of work run in each pool worker.
+
+    Args:
+        query: Query to evaluate
+        paths: Trace files to scan
+
+    Returns:
+        Partial result for these files
+    """
+    result = QueryResult()
+    contains = query.prefilter()
+    for path in paths:
+        try:
+            for event in iter_events(path, types=query.types, contains=contains):
+                if query.matches(event):
+                    result.add(event, query.group_by)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable trace file %s: %s", path, e)
+            continue
+        result.files_scanned += 1
+    return result
+
+
+def find_trace_files(query: TraceQuery, trace_dir: Union[str, Path]) -> Tuple[List[Path], int]:
+    """List the trace files a query has to scan, in either directory layout.
+
+    Args:
+        query: Query whose predicates are used for pruning
+        trace_dir: Directory containing trace files
+
+    Returns:
+        Tuple of (files to scan, number of files pruned)
+    """
+    keep: List[Path] = []
+    pruned = 0
+    for info in scan_trace_files(str(trace_dir)):
+        if query.keep_file(info.path, info.mtime):
+            keep.append(info.path)
+        else:
+            pruned += 1
+    return sorted(keep), pruned
+
+
+def _batches(paths: List[Path], count: int) -> List[List[Path]]:
+    """Split files into ``count`` batches of roughly equal total size."""
+    sized = []
+    for path in paths:
+        try:
+            sized.append((path.stat().st_size, path))
+        except OSError:
+            sized.append((0, path))
+    sized.sort(key=lambda item: item[0], reverse=True)
+
+    # Greedy: largest remaining file goes to the lightest batch
+    batches: List[List[Path]] = [[] for _ in range(count)]
+    totals = [0] * count
+    for size, path in sized:
+        lightest = totals.index(min(totals))
+        batches[lightest].append(path)
+        totals[lightest] += size
+    return [batch for batch in batches if batch]
+
+
+def run_query(
+    query: TraceQuery,
+    trace_dir: Union[str, Path] = "~/.watchtower/traces",
+    workers: Optional[int] = None,
+) -> QueryResult:
+    """Run a query over every trace file in a directory.
+
+    Args:
+        query: Query to evaluate
+        trace_dir: Directory containing trace files
+        workers: Worker processes (default: CPU count; 1 scans in-process)
+
+    Returns:
+        Merged query result
+    """
+    paths, pruned = find_trace_files(query, trace_dir)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+
+    if workers <= 1:
+        result = scan_files(query, paths)
+    else:
+        result = QueryResult()
+        batches = _batches(paths, workers * BATCHES_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(scan_files, [query] * len(batches), batches):
+                result.merge(partial)
+
+    result.files_pruned = pruned
+    return result
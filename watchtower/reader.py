@@ -0,0 +1,324 @@
+"""Readers for Watchtower trace files.
+
+Two ways of reading a trace without loading it into memory:
+
+- scan_lines() / iter_events() memory-map the file and walk it lazily,
+  decoding only lines that pass a cheap pre-filter on the raw bytes.
+- TraceReader uses the sidecar offset index to seek straight to matching
+  events.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Union
+
+from watchtower.cleanup import find_trace_file
+from watchtower.utils.compression import codec_for_path, iter_frames, read_frame
+from watchtower.utils.trace_index import IndexEntry, load_index
+
+logger = logging.getLogger("watchtower")
+
+# Any bytes-like buffer searchable with find() and re (bytes or mmap)
+_Buffer = Union[bytes, mmap.mmap]
+
+
+def _type_pattern(types: Optional[Iterable[str]]) -> Optional[Pattern[bytes]]:
+    """Compile a pre-filter matching any of the event types as a JSON string.
+
+    Only the quoted value is matched (not the "type" key), so the filter
+    works regardless of the separators the file was written with; decoded
+    events are checked again by iter_events().
+    """
+    if types is None:
+        return None
+    alternatives = b"|".join(re.escape(t.encode("utf-8")) for t in types)
+    return re.compile(b'"(?:' + alternatives + b')"')
+
+
+def _filter_lines(
+    buf: _Buffer,
+    pattern: Optional[Pattern[bytes]],
+    contains: Optional[bytes],
+) -> Iterator[bytes]:
+    """Yield the lines of ``buf`` that pass the raw-bytes pre-filters.
+
+    With a filter, the buffer is searched for the needle directly (in C)
+    and only the lines containing a hit are expanded and copied, so lines
+    that cannot match are never touched from Python.
+    """
+    end = len(buf)
+
+    if pattern is None and contains is None:
+        pos = 0
+        while pos < end:
+            newline = buf.find(b"\n", pos)
+            if newline == -1:
+                newline = end
+            if newline > pos:
+                yield buf[pos:newline]
+            pos = newline + 1
+        return
+
+    # Search for the primary needle; verify the other one within the line
+    search = pattern if pattern is not None else re.compile(re.escape(contains or b""))
+    check = contains if pattern is not None else None
+
+    pos = 0
+    while pos < end:
+        match = search.search(buf, pos)
+        if match is None:
+            return
+        start = buf.rfind(b"\n", 0, match.start()) + 1
+        newline = buf.find(b"\n", match.end())
+        if newline == -1:
+            newline = end
+        if check is None or buf.find(check, start, newline) != -1:
+            yield buf[start:newline]
+        pos = newline + 1
+
+
+def scan_lines(
+    path: Union[str, Path],
+    types: Optional[Iterable[str]] = None,
+    contains: Optional[bytes] = None,
+) -> Iterator[bytes]:
+    """Lazily yield raw JSONL lines that pass a cheap pre-filter.
+
+    Plain trace files are memory-mapped and line boundaries are found
+    without copying; only the lines yielded are copied out of the map.
+    Compressed traces are decompressed one frame at a time. Either way
+    memory use stays flat regardless of file size.
+
+    Args:
+        path: Trace file path (.jsonl, .jsonl.gz or .jsonl.zst)
+        types: Only lines mentioning one of these event types as a JSON string
+        contains: Only lines containing these bytes (e.g. b'"tool_name":"search"')
+
+    Yields:
+        Candidate lines without the trailing newline. The pre-filter can
+        let through lines that merely mention a type elsewhere; use
+        iter_events() for exact type matching.
+    """
+    path = Path(path).expanduser()
+    pattern = _type_pattern(types)
+
+    if codec_for_path(path) is not None:
+        for frame in iter_frames(path):
+            yield from _filter_lines(frame, pattern, contains)
+        return
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from _filter_lines(mm, pattern, contains)
+
+
+def iter_events(
+    path: Union[str, Path],
+    types: Optional[Iterable[str]] = None,
+    contains: Optional[bytes] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Lazily yield decoded events, decoding only pre-filtered lines.
+
+    Args:
+        path: Trace file path (.jsonl, .jsonl.gz or .jsonl.zst)
+        types: Only events of these types
+        contains: Only events whose raw line contains these bytes
+
+    Yields:
+        Parsed events in file order (unparseable lines are skipped)
+
+    Example:
+        >>> for event in iter_events(path, types=["tool.error"]):
+        ...     print(event["tool_name"], event["error_message"])
+    """
+    wanted = set(types) if types is not None else None
+    for line in scan_lines(path, types=wanted, contains=contains):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            logger.debug("Skipping unreadable line in %s", path)
+            continue
+        if not isinstance(event, dict):
+            continue
+        if wanted is not None and event.get("type") not in wanted:
+            continue
+        yield event
+
+
+class TraceReader:
+    """Reads events from a trace file through its sidecar offset index.
+
+    Queries are answered from the in-memory index, and only matching events
+    are read from disk with a seek (plus decompressing their frame for
+    compressed traces), so finding one ``tool.error`` in a large trace does
+    not parse every line. Files without an index are indexed on first use.
+    For a one-off pass that does not need the index, use scan().
+
+    Example:
+        >>> reader = TraceReader("~/.watchtower/traces/2024-01-15_abc123.jsonl")
+        >>> for event in reader.events(types=["tool.error"]):
+        ...     print(event["tool_name"], event["error_message"])
+    """
+
+    def __init__(self, path: Union[str, Path], persist_index: bool = True):
+        """Initialize reader (the index is loaded on first query).
+
+        Args:
+            path: Trace file path (.jsonl, .jsonl.gz or .jsonl.zst)
+            persist_index: Write a sidecar index for files that have none
+        """
+        self.path = Path(path).expanduser()
+        self._persist_index = persist_index
+        self._entries: Optional[List[IndexEntry]] = None
+        self._compressed = codec_for_path(self.path) is not None
+
+    @classmethod
+    def for_run(
+        cls,
+        run_id: str,
+        trace_dir: str = "~/.watchtower/traces",
+        date: Optional[str] = None,
+        persist_index: bool = True,
+    ) -> "TraceReader":
+        """Open the trace of a run by its ID, in either directory layout.
+
+        See cleanup.find_trace_file() for how the file is found, including
+        the per-process files of forked workers.
+
+        Args:
+            run_id: Run to open
+            trace_dir: Directory containing trace files
+            date: Date of the run (YYYY-MM-DD) if known, to skip the search
+            persist_index: Write a sidecar index for files that have none
+
+        Returns:
+            Reader for the run's trace file
+
+        Raises:
+            FileNotFoundError: If no trace file for the run exists
+        """
+        path = find_trace_file(run_id, trace_dir, date=date)
+        if path is None:
+            raise FileNotFoundError(f"No trace file for run {run_id!r} in {trace_dir}")
+        return cls(path, persist_index=persist_index)
+
+    @property
+    def entries(self) -> List[IndexEntry]:
+        """Index entries for every event in the file, in file order."""
+        if self._entries is None:
+            self._entries = load_index(self.path, persist=self._persist_index)
+        return self._entries
+
+    def refresh(self) -> None:
+        """Drop the cached index so events appended since are picked up."""
+        self._entries = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(
+        self,
+        types: Optional[Iterable[str]] = None,
+        tool_name: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[IndexEntry]:
+        """Find index entries matching all given filters.
+
+        Args:
+            types: Event types to include (all if None)
+            tool_name: Only events for this tool
+            start: Only events with timestamp >= start
+            end: Only events with timestamp < end
+
+        Returns:
+            Matching entries in file order
+        """
+        wanted = set(types) if types is not None else None
+        matches = []
+        for entry in self.entries:
+            if wanted is not None and entry.type not in wanted:
+                continue
+            if tool_name is not None and entry.tool_name != tool_name:
+                continue
+            if start is not None or end is not None:
+                if entry.timestamp is None:
+                    continue
+                if start is not None and entry.timestamp < start:
+                    continue
+                if end is not None and entry.timestamp >= end:
+                    continue
+            matches.append(entry)
+        return matches
+
+    def events(
+        self,
+        types: Optional[Iterable[str]] = None,
+        tool_name: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Read events matching all given filters.
+
+        Args:
+            types: Event types to include (all if None)
+            tool_name: Only events for this tool
+            start: Only events with timestamp >= start
+            end: Only events with timestamp < end
+
+        Yields:
+            Parsed events in file order (unparseable lines are skipped)
+        """
+        return self.read(self.find(types=types, tool_name=tool_name, start=start, end=end))
+
+    def scan(
+        self,
+        types: Optional[Iterable[str]] = None,
+        contains: Optional[bytes] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream events with a memory-mapped pre-filtered scan (no index).
+
+        Args:
+            types: Only events of these types
+            contains: Only events whose raw line contains these bytes
+
+        Yields:
+            Parsed events in file order
+        """
+        return iter_events(self.path, types=types, contains=contains)
+
+    def read(self, entries: Iterable[IndexEntry]) -> Iterator[Dict[str, Any]]:
+        """Read the events at the given index entries.
+
+        Args:
+            entries: Entries from find() or ``entries``
+
+        Yields:
+            Parsed events (unparseable lines are skipped)
+        """
+        if self._compressed:
+            cached_offset = -1
+            frame = b""
+            for entry in entries:
+                if entry.frame_offset != cached_offset:
+                    frame = read_frame(self.path, entry.frame_offset, entry.frame_length)
+                    cached_offset = entry.frame_offset
+                yield from self._parse(frame[entry.position : entry.position + entry.length])
+            return
+
+        with open(self.path, "rb") as f:
+            for entry in entries:
+                f.seek(entry.frame_offset + entry.position)
+                yield from self._parse(f.read(entry.length))
+
+    def _parse(self, line: bytes) -> Iterator[Dict[str, Any]]:
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            logger.warning("Skipping unreadable event in %s: %s", self.path, e)
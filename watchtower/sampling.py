@@ -0,0 +1,123 @@
+"""Head- and tail-based sampling decisions for trace capture."""
+
+import random
+import zlib
+from typing import Any, Dict, Optional
+
+from watchtower.exceptions import WatchtowerConfigError
+
+# Tail sampling reasons, in the order they are checked
+REASON_ERROR = "error"
+REASON_LATENCY = "latency"
+REASON_TOKENS = "tokens"
+REASON_BUFFER_FULL = "buffer_full"
+REASON_SAMPLED = "sampled"
+
+
+class Sampler:
+    """Decides which runs are written to the trace writers.
+
+    Head sampling is decided when a run starts: a run is kept when a hash of
+    its run ID falls below ``sample_rate``, so every process sharing a run ID
+    makes the same decision.
+
+    Tail sampling is decided when a run ends. The plugin buffers the events
+    of head-sampled runs and writes them only if the run had errors, was
+    slower than ``tail_latency_ms``, used at least ``tail_token_threshold``
+    tokens, or won a ``tail_sample_rate`` lottery.
+
+    Example:
+        >>> sampler = Sampler(sample_rate=0.5, tail_sampling=True, tail_latency_ms=5000)
+        >>> sampler.head_sample("abc123")
+        False
+        >>> sampler.tail_decision(errors=0, duration_ms=7200.0, total_tokens=900)
+        'latency'
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        tail_sampling: bool = False,
+        tail_sample_rate: float = 0.0,
+        tail_latency_ms: Optional[float] = None,
+        tail_token_threshold: Optional[int] = None,
+    ):
+        """Initialize sampler.
+
+        Args:
+            sample_rate: Fraction of runs kept by head sampling (0.0 to 1.0)
+            tail_sampling: Whether to buffer runs and decide at run end
+            tail_sample_rate: Fraction of unremarkable runs kept by tail sampling
+            tail_latency_ms: Keep runs at least this slow (None disables)
+            tail_token_threshold: Keep runs using at least this many tokens (None disables)
+
+        Raises:
+            WatchtowerConfigError: If a rate is outside [0, 1]
+        """
+        for name, rate in (("sample_rate", sample_rate), ("tail_sample_rate", tail_sample_rate)):
+            if not 0.0 <= rate <= 1.0:
+                raise WatchtowerConfigError(f"{name} must be between 0 and 1, got {rate}")
+
+        self.sample_rate = sample_rate
+        self.tail_sampling = tail_sampling
+        self.tail_sample_rate = tail_sample_rate
+        self.tail_latency_ms = tail_latency_ms
+        self.tail_token_threshold = tail_token_threshold
+        # Hash values below this threshold are head-sampled
+        self._head_threshold = int(sample_rate * 0xFFFFFFFF)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any run can be dropped."""
+        return self.sample_rate < 1.0 or self.tail_sampling
+
+    def head_sample(self, run_id: str) -> bool:
+        """Decide whether a run is kept by head sampling.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            True if the run should be traced
+        """
+        if self.sample_rate >= 1.0:
+            return True
+        return zlib.crc32(run_id.encode("utf-8")) < self._head_threshold
+
+    def tail_decision(self, errors: int, duration_ms: float, total_tokens: int) -> Optional[str]:
+        """Decide whether a finished run is kept by tail sampling.
+
+        Args:
+            errors: Number of errors during the run
+            duration_ms: Run duration in milliseconds
+            total_tokens: Tokens used by the run
+
+        Returns:
+            Reason the run is kept, or None if it should be dropped
+        """
+        if errors > 0:
+            return REASON_ERROR
+        if self.tail_latency_ms is not None and duration_ms >= self.tail_latency_ms:
+            return REASON_LATENCY
+        if self.tail_token_threshold is not None and total_tokens >= self.tail_token_threshold:
+            return REASON_TOKENS
+        if self.tail_sample_rate > 0.0 and random.random() < self.tail_sample_rate:
+            return REASON_SAMPLED
+        return None
+
+    def describe(self, reason: Optional[str], dropped_runs: int) -> Dict[str, Any]:
+        """Build the sampling section of a run.end summary.
+
+        Args:
+            reason: Why the run was kept ("head" when tail sampling is off)
+            dropped_runs: Runs dropped by this plugin so far
+
+        Returns:
+            Dictionary describing the sampling decision
+        """
+        return {
+            "sample_rate": self.sample_rate,
+            "tail_sampling": self.tail_sampling,
+            "reason": reason,
+            "dropped_runs": dropped_runs,
+        }
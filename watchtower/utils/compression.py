@@ -0,0 +1,252 @@
+"""Frame-per-batch compression for trace files.
+
+Compressed trace files are a concatenation of independent frames (gzip
+members or zstd frames), one per flushed batch. Each frame decompresses on
+its own, so a crash while appending can only damage the last frame, and
+readers can stream a file frame by frame while it is still being written.
+"""
+
+import gzip
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger("watchtower")
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+# Bytes read from disk per step when streaming frames
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class Codec(ABC):
+    """Compresses batches into independent frames and decompresses them back."""
+
+    name = "none"
+    extension = ""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compress one batch into a self-contained frame.
+
+        Args:
+            data: Newline-terminated JSONL batch
+
+        Returns:
+            Compressed frame
+        """
+        pass
+
+    @abstractmethod
+    def decompressobj(self) -> Any:
+        """Create a decompressor for a single frame.
+
+        Returns:
+            Object with decompress(), eof and unused_data, like zlib's
+        """
+        pass
+
+
+class GzipCodec(Codec):
+    """gzip members from the standard library."""
+
+    name = "gzip"
+    extension = ".gz"
+
+    def __init__(self, level: int = 6):
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self._level, mtime=0)
+
+    def decompressobj(self) -> Any:
+        # wbits=31 reads exactly one gzip member and leaves the rest in unused_data
+        return zlib.decompressobj(wbits=31)
+
+
+class ZstdCodec(Codec):
+    """zstd frames from the optional ``zstandard`` package."""
+
+    name = "zstd"
+    extension = ".zst"
+
+    def __init__(self, level: int = 3):
+        # Content size in the frame header lets readers preallocate
+        self._compressor = zstandard.ZstdCompressor(level=level, write_content_size=True)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        frame: bytes = self._compressor.compress(data)
+        return frame
+
+    def decompressobj(self) -> Any:
+        return self._decompressor.decompressobj()
+
+
+def get_codec(compression: Optional[str]) -> Optional[Codec]:
+    """Resolve a compression setting to a codec.
+
+    Args:
+        compression: None (no compression), "gzip" or "zstd". "zstd" falls
+            back to gzip when the zstandard package is not installed.
+
+    Returns:
+        Codec instance, or None for uncompressed output
+
+    Raises:
+        ValueError: If the compression name is unknown
+    """
+    if compression is None or compression == "none":
+        return None
+    if compression == "zstd":
+        if HAS_ZSTD:
+            return ZstdCodec()
+        logger.info("zstandard is not installed; compressing traces with gzip instead")
+        return GzipCodec()
+    if compression == "gzip":
+        return GzipCodec()
+    raise ValueError(f"Unknown trace compression {compression!r} (use 'gzip' or 'zstd')")
+
+
+def codec_for_path(path: Path) -> Optional[Codec]:
+    """Pick the codec matching a trace file's extension.
+
+    Args:
+        path: Trace file path
+
+    Returns:
+        Codec for .gz/.zst files, None for plain JSONL
+
+    Raises:
+        ValueError: If the file is zstd-compressed and zstandard is not installed
+    """
+    if path.name.endswith(GzipCodec.extension):
+        return GzipCodec()
+    if path.name.endswith(ZstdCodec.extension):
+        if not HAS_ZSTD:
+            raise ValueError(f"Reading {path.name} requires zstandard (pip install zstandard)")
+        return ZstdCodec()
+    return None
+
+
+def iter_frames(path: Path) -> Iterator[bytes]:
+    """Stream the decompressed contents of a trace file, one frame at a time.
+
+    A truncated or corrupt final frame (e.g. from a crash mid-append) is
+    skipped with a warning; every complete frame before it is returned.
+    Plain JSONL files are returned in chunks ending on a line boundary.
+
+    Args:
+        path: Trace file path
+
+    Yields:
+        Decompressed frames (newline-terminated JSONL batches)
+    """
+    for _, _, frame in iter_frames_at(path):
+        yield frame
+
+
+def iter_frames_at(path: Path, start: int = 0) -> Iterator[Tuple[int, int, bytes]]:
+    """Like iter_frames, but also report where each frame is stored.
+
+    Args:
+        path: Trace file path
+        start: Byte offset to start reading from (must be a frame boundary)
+
+    Yields:
+        Tuples of (file offset, stored length, decompressed frame)
+    """
+    codec = codec_for_path(path)
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+
+        if codec is None:
+            tail = b""
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                data = tail + chunk
+                cut = data.rfind(b"\n") + 1
+                tail = data[cut:]
+                if cut:
+                    yield offset, cut, data[:cut]
+                    offset += cut
+            if tail:
+                yield offset, len(tail), tail
+            return
+
+        pending = b""
+        consumed = 0
+        decompressor = codec.decompressobj()
+        parts = []
+        while True:
+            if not pending:
+                pending = f.read(READ_CHUNK_SIZE)
+                if not pending:
+                    break
+
+            try:
+                parts.append(decompressor.decompress(pending))
+            except Exception as e:
+                logger.warning("Skipping corrupt frame in %s: %s", path, e)
+                return
+            consumed += len(pending)
+
+            if not decompressor.eof:
+                pending = b""
+                continue
+
+            pending = decompressor.unused_data
+            length = consumed - len(pending)
+            yield offset, length, b"".join(parts)
+            offset += length
+            consumed = 0
+            decompressor = codec.decompressobj()
+            parts = []
+
+        if parts:
+            logger.warning("Skipping truncated final frame in %s", path)
+
+
+def read_frame(path: Path, offset: int, length: int) -> bytes:
+    """Read and decompress a single frame.
+
+    Args:
+        path: Trace file path
+        offset: File offset of the frame
+        length: Stored length of the frame
+
+    Returns:
+        Decompressed frame (the raw bytes for plain JSONL files)
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+
+    codec = codec_for_path(path)
+    if codec is None:
+        return data
+    decompressor = codec.decompressobj()
+    return bytes(decompressor.decompress(data))
+
+
+def iter_lines(path: Path) -> Iterator[bytes]:
+    """Stream the JSONL lines of a plain or compressed trace file.
+
+    Args:
+        path: Trace file path
+
+    Yields:
+        Lines without the trailing newline (empty lines are skipped)
+    """
+    for frame in iter_frames(path):
+        for line in frame.split(b"\n"):
+            if line:
+                yield line
@@ -0,0 +1,116 @@
+"""Deadline timer used by writers to bound flush latency."""
+
+import logging
+import threading
+import time
+import weakref
+from typing import Callable, Optional
+
+from watchtower.utils.fork import register_at_fork
+
+logger = logging.getLogger("watchtower")
+
+
+class FlushTimer:
+    """Runs a callback on a background thread once a deadline passes.
+
+    A single long-lived daemon thread serves every arm() call, so arming
+    the timer for each batch costs a lock and a notify rather than a new
+    thread. Arming an already-armed timer keeps the earlier deadline.
+
+    Bound-method callbacks are held weakly, so the timer does not keep its
+    owner alive; the thread exits once the owner is garbage collected.
+
+    In a forked child process the timer starts out disarmed, and its thread
+    is started again by the next arm().
+
+    Example:
+        >>> timer = FlushTimer(writer.flush, name="watchtower-stdout-flush")
+        >>> timer.arm(0.05)  # writer.flush() runs ~50ms from now
+    """
+
+    # Seconds between owner liveness checks while no deadline is armed
+    IDLE_POLL = 1.0
+
+    def __init__(self, callback: Callable[[], None], name: str = "watchtower-flush-timer"):
+        """Initialize timer (the thread starts on first arm()).
+
+        Args:
+            callback: Function to call when the deadline passes
+            name: Thread name
+        """
+        self._callback: Callable[[], Optional[Callable[[], None]]]
+        if hasattr(callback, "__self__"):
+            self._callback = weakref.WeakMethod(callback)  # type: ignore[arg-type]
+        else:
+            self._callback = lambda: callback
+        self._name = name
+        self._cond = threading.Condition(threading.Lock())
+        self._deadline: Optional[float] = None
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        register_at_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        """Disarm; the thread did not survive the fork."""
+        self._cond = threading.Condition(threading.Lock())
+        self._deadline = None
+        self._thread = None
+
+    def arm(self, delay: float) -> None:
+        """Schedule the callback ``delay`` seconds from now.
+
+        Args:
+            delay: Seconds until the callback runs
+        """
+        deadline = time.monotonic() + delay
+        with self._cond:
+            if self._stopped:
+                return
+            if self._deadline is not None and self._deadline <= deadline:
+                return
+            self._deadline = deadline
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self) -> None:
+        """Cancel the pending deadline, if any."""
+        with self._cond:
+            self._deadline = None
+
+    def stop(self) -> None:
+        """Cancel the deadline and stop the timer thread."""
+        with self._cond:
+            self._deadline = None
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self) -> None:
+        """Timer thread main loop."""
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._deadline is None:
+                        # Wake up periodically to notice a collected owner
+                        if not self._cond.wait(self.IDLE_POLL) and self._callback() is None:
+                            return
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                if self._stopped:
+                    return
+                self._deadline = None
+
+            callback = self._callback()
+            if callback is None:
+                return
+
+            try:
+                callback()
+            except Exception as e:
+                logger.warning("Flush timer callback failed: %s", e)
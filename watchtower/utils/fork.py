@@ -0,0 +1,43 @@
+"""Re-initialization of writer state in child processes after os.fork().
+
+Pre-fork servers (gunicorn, multiprocessing with the fork start method)
+fork workers after Watchtower is imported and often after a plugin is
+built. A child inherits its parent's buffered events, open descriptors,
+locks in whatever state they were in, and none of its threads. Objects
+registered here get their ``_after_fork_in_child()`` method called in
+every child, where they drop inherited buffers (the parent still writes
+them), reopen what cannot be shared and restart their threads.
+"""
+
+import logging
+import os
+import weakref
+from typing import Any
+
+logger = logging.getLogger("watchtower")
+
+HAS_REGISTER_AT_FORK = hasattr(os, "register_at_fork")
+
+# Objects to re-initialize in forked children (held weakly)
+_registered: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def register_at_fork(obj: Any) -> None:
+    """Have ``obj._after_fork_in_child()`` called in forked child processes.
+
+    Args:
+        obj: Object with an ``_after_fork_in_child()`` method (held weakly)
+    """
+    _registered.add(obj)
+
+
+def _after_fork_in_child() -> None:
+    for obj in list(_registered):
+        try:
+            obj._after_fork_in_child()
+        except Exception as e:
+            logger.warning("Failed to reset %s after fork: %s", type(obj).__name__, e)
+
+
+if HAS_REGISTER_AT_FORK:
+    os.register_at_fork(after_in_child=_after_fork_in_child)
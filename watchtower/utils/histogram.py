@@ -0,0 +1,97 @@
+"""Fixed-bucket latency histogram for self-telemetry."""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+# Bucket upper bounds in microseconds (1, 2, 5, 10, ... 50000, 100000);
+# a final overflow bucket holds anything slower
+BUCKET_BOUNDS_US: Tuple[int, ...] = (*(m * 10**e for e in range(5) for m in (1, 2, 5)), 100000)
+
+_BUCKET_BOUNDS_NS = tuple(bound * 1000 for bound in BUCKET_BOUNDS_US)
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed bucket boundaries.
+
+    Recording is a binary search over 16 bounds and an increment, so it is
+    cheap enough to run on every callback. Because all histograms share
+    BUCKET_BOUNDS_US, they can be merged by adding counts. Quantiles are
+    reported as the upper bound of the bucket they fall in.
+
+    Example:
+        >>> histogram = LatencyHistogram()
+        >>> histogram.record(3_500)  # 3.5us
+        >>> histogram.record(40_000)
+        >>> histogram.quantile_us(0.5)
+        5.0
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts: List[int] = [0] * (len(_BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int) -> None:
+        """Record one duration.
+
+        Args:
+            elapsed_ns: Duration in nanoseconds
+        """
+        self.counts[bisect_left(_BUCKET_BOUNDS_NS, elapsed_ns)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's samples to this one.
+
+        Args:
+            other: Histogram to merge in
+        """
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def quantile_us(self, q: float) -> float:
+        """Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Upper bound of the bucket containing the quantile in microseconds,
+            capped at the maximum recorded value (0 if empty)
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(BUCKET_BOUNDS_US):
+                    return float(min(BUCKET_BOUNDS_US[index], self.max_ns / 1000))
+                break
+        return self.max_ns / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert histogram to a compact dictionary.
+
+        Returns:
+            Dictionary with count, total/max/p50/p99 in microseconds and the
+            raw bucket counts (aligned with BUCKET_BOUNDS_US plus overflow)
+        """
+        return {
+            "count": self.count,
+            "total_us": round(self.total_ns / 1000, 1),
+            "max_us": round(self.max_ns / 1000, 1),
+            "p50_us": round(self.quantile_us(0.5), 1),
+            "p99_us": round(self.quantile_us(0.99), 1),
+            "buckets": list(self.counts),
+        }
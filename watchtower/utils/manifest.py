@@ -0,0 +1,382 @@
+"""Incrementally maintained manifest of the trace files in a directory.
+
+The manifest is an append-only JSONL file, ``{trace_dir}/.manifest``, so
+directory statistics and listings don't have to stat every trace file:
+
+    {"c": "2024-01-15_abc123.jsonl", "d": "2024-01-15", "r": "abc123"}    file created
+    {"u": "2024-01-15_abc123.jsonl", "o": 812, "e": 10, "j": 0, "m": 1705329121.2}
+    {"a": "2024-01-15_def456.jsonl", "d": ..., "r": ..., "b": ..., "e": null, "m": ..., "i": ...}
+    {"x": "2024-01-15_abc123.jsonl"}                                      file removed
+    {"s": 1705329125123456789}                                            directory synced
+    {"s": 1705329125123456789, "p": "2024/01/15"}                         partition synced
+    {"s": null, "p": "2024/01/15"}                                        partition removed
+
+File names are relative to the trace directory (``2024/01/15/...`` in a
+date-partitioned layout). ``u`` records are written by FileWriter: the
+file's and its sidecar index's end offsets after a write (``o``, ``j``),
+and the number of events added (``e``). ``a`` records hold absolute values
+and come from reconciling the manifest with the directory. Sizes are
+folded with max(), so a reconcile racing a writer's coalesced records
+never counts the same bytes twice, and a ``c`` record for a file only
+known from a reconcile starts its event count from zero. ``s`` records
+the mtime (in ns) a directory (``p``, the trace directory itself if absent)
+was last reconciled against, so unchanged directories need no listing. Readers
+fold the records into one entry per file, reading only what was appended
+since their previous read, and the file is compacted when it grows much
+larger than the number of live entries.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger("watchtower")
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+MANIFEST_NAME = ".manifest"
+
+# Compact once there are this many more records than live entries...
+COMPACT_MIN_RECORDS = 10000
+# ...and the records outnumber live entries by this factor
+COMPACT_RATIO = 4
+
+# Directory mtimes this recent are not trusted as a sync point, since a
+# change within the filesystem's timestamp granularity would go unnoticed
+SYNC_SETTLE_SECONDS = 2.0
+
+
+@dataclass
+class ManifestEntry:
+    """What the manifest knows about one trace file."""
+
+    name: str
+    date: str
+    run_id: str
+    size: int = 0
+    events: Optional[int] = 0
+    mtime: float = 0.0
+    sidecar_size: int = 0
+
+
+class TraceManifest:
+    """Reads and appends to a trace directory's manifest.
+
+    Writers only append records and never load the manifest. Readers call
+    refresh(), which applies the records appended since the last call, so
+    a long-lived process pays O(changed) per refresh.
+
+    Example:
+        >>> manifest = get_manifest("~/.watchtower/traces")
+        >>> entries = manifest.refresh()
+        >>> sum(entry.size for entry in entries.values())
+    """
+
+    def __init__(self, trace_dir: Union[str, Path]):
+        """Initialize manifest handle (nothing is read until refresh()).
+
+        Args:
+            trace_dir: Directory containing trace files
+        """
+        self.trace_dir = Path(trace_dir).expanduser()
+        self.path = self.trace_dir / MANIFEST_NAME
+        # Partition directory ("" for the trace directory) -> synced mtime
+        self.synced: Dict[str, int] = {}
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._records = 0
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Whether the manifest file exists."""
+        return self.path.exists()
+
+    # === Writing ===
+
+    @staticmethod
+    def created(name: str, date: str, run_id: str) -> Dict[str, Any]:
+        """Record for a trace file a writer has just created."""
+        return {"c": name, "d": date, "r": run_id}
+
+    @staticmethod
+    def written(
+        name: str, end: int, events: int, sidecar_end: int = 0, mtime: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Record for batches appended to a trace file.
+
+        Args:
+            name: File name relative to the trace directory
+            end: File size after the append
+            events: Number of events appended
+            sidecar_end: Sidecar index size after the append (0 if unknown)
+            mtime: Time of the append (default: now)
+        """
+        return {
+            "u": name,
+            "o": end,
+            "e": events,
+            "j": sidecar_end,
+            "m": time.time() if mtime is None else mtime,
+        }
+
+    @staticmethod
+    def removed(name: str) -> Dict[str, Any]:
+        """Record for a deleted trace file."""
+        return {"x": name}
+
+    @staticmethod
+    def dropped(partition: str) -> Dict[str, Any]:
+        """Record for a deleted partition directory and everything in it."""
+        return {"s": None, "p": partition}
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append records with a single O_APPEND write.
+
+        Appends take a shared lock and check they still hold the current
+        file, so a concurrent compaction (which replaces the file under an
+        exclusive lock) cannot lose them.
+
+        Args:
+            records: Records to append
+
+        Raises:
+            OSError: If the manifest cannot be written
+        """
+        data = b"".join(
+            json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in records
+        )
+        if not data:
+            return
+
+        for _ in range(3):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                if HAS_FCNTL:
+                    fcntl.flock(fd, fcntl.LOCK_SH)
+                    if os.fstat(fd).st_ino != os.stat(self.path).st_ino:
+                        continue  # Replaced by a compaction while we waited
+                os.write(fd, data)
+                return
+            finally:
+                os.close(fd)  # Also releases the lock
+        logger.warning("Gave up appending to trace manifest %s", self.path)
+
+    # === Reading ===
+
+    def dir_mtime_ns(self, partition: str = "") -> Optional[int]:
+        """Current mtime of a directory, or None if it is missing.
+
+        Args:
+            partition: Directory relative to the trace directory
+        """
+        try:
+            return os.stat(self.trace_dir / partition).st_mtime_ns
+        except OSError:
+            return None
+
+    def sync_record(self, mtime_ns: int, partition: str = "") -> Optional[Dict[str, Any]]:
+        """Record marking a directory's files as matching the manifest at ``mtime_ns``.
+
+        Args:
+            mtime_ns: Directory mtime read before listing the directory
+            partition: Directory relative to the trace directory
+
+        Returns:
+            The record, or None if the mtime is too recent to be trusted
+        """
+        if time.time_ns() - mtime_ns < SYNC_SETTLE_SECONDS * 1e9:
+            return None
+        return {"s": mtime_ns, "p": partition} if partition else {"s": mtime_ns}
+
+    def refresh(self) -> Dict[str, ManifestEntry]:
+        """Apply records appended since the last refresh.
+
+        Returns:
+            Live entries keyed by file name (do not modify)
+        """
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    inode = os.fstat(f.fileno()).st_ino
+                    size = os.fstat(f.fileno()).st_size
+                    if inode != self._inode or size < self._offset:
+                        # First read, or compacted/replaced since
+                        self._reset(inode)
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                self._reset(None)
+                return self._entries
+            except OSError as e:
+                logger.warning("Failed to read trace manifest %s: %s", self.path, e)
+                return self._entries
+
+            # Only complete lines; a torn last line is picked up next time
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].split(b"\n")[:-1]:
+                self._apply(line)
+            self._offset += end
+
+            if self._records > COMPACT_MIN_RECORDS + COMPACT_RATIO * len(self._entries):
+                self._compact()
+            return self._entries
+
+    def _reset(self, inode: Optional[int]) -> None:
+        self._entries = {}
+        self.synced = {}
+        self._offset = 0
+        self._records = 0
+        self._inode = inode
+
+    def _apply(self, line: bytes) -> None:
+        """Fold one record into the entries."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return
+        if not isinstance(record, dict):
+            return
+        self._records += 1
+
+        if "u" in record:
+            entry = self._entries.get(record["u"])
+            if entry is not None:
+                entry.size = max(entry.size, record.get("o", 0))
+                if entry.events is not None:
+                    entry.events += record.get("e", 0)
+                entry.sidecar_size = max(entry.sidecar_size, record.get("j", 0))
+                entry.mtime = max(entry.mtime, record.get("m", 0.0))
+        elif "c" in record:
+            name = record["c"]
+            entry = self._entries.get(name)
+            if entry is None:
+                self._entries[name] = ManifestEntry(name, record.get("d", ""), record.get("r", ""))
+            elif entry.events is None:
+                # Reconciled before the writer's records arrived; they count
+                # every event the writer appended since creating the file
+                entry.events = 0
+        elif "a" in record:
+            name = record["a"]
+            entry = self._entries.get(name)
+            if entry is None:
+                self._entries[name] = ManifestEntry(
+                    name,
+                    record.get("d", ""),
+                    record.get("r", ""),
+                    size=record.get("b", 0),
+                    events=record.get("e"),
+                    mtime=record.get("m", 0.0),
+                    sidecar_size=record.get("i", 0),
+                )
+            else:
+                # The writer's records got there first; keep its event count
+                entry.size = max(entry.size, record.get("b", 0))
+                entry.sidecar_size = max(entry.sidecar_size, record.get("i", 0))
+                entry.mtime = max(entry.mtime, record.get("m", 0.0))
+        elif "x" in record:
+            self._entries.pop(record["x"], None)
+        elif "s" in record:
+            partition = record.get("p", "")
+            if record["s"] is not None:
+                self.synced[partition] = record["s"]
+                return
+            # Partition removed with everything below it
+            prefix = partition + "/"
+            for key in [k for k in self.synced if k == partition or k.startswith(prefix)]:
+                del self.synced[key]
+            for name in [n for n in self._entries if n.startswith(prefix)]:
+                del self._entries[name]
+
+    def _compact(self) -> None:
+        """Rewrite the manifest as one record per live entry.
+
+        Holds an exclusive lock on the old file while reading its tail and
+        replacing it, so appends either land before the final read or wait
+        and retry against the new file.
+        """
+        if not HAS_FCNTL:
+            return
+
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return
+        tmp = self.path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_ino != self._inode:
+                return
+            os.lseek(fd, self._offset, os.SEEK_SET)
+            tail = b""
+            for chunk in iter(lambda: os.read(fd, 1 << 16), b""):
+                tail += chunk
+            for line in tail.split(b"\n"):
+                if line:
+                    self._apply(line)
+
+            records: List[Dict[str, Any]] = [
+                {
+                    "a": entry.name,
+                    "d": entry.date,
+                    "r": entry.run_id,
+                    "b": entry.size,
+                    "e": entry.events,
+                    "m": entry.mtime,
+                    "i": entry.sidecar_size,
+                }
+                for entry in self._entries.values()
+            ]
+            for partition, mtime_ns in self.synced.items():
+                records.append({"s": mtime_ns, "p": partition} if partition else {"s": mtime_ns})
+            data = b"".join(
+                json.dumps(r, separators=(",", ":")).encode("utf-8") + b"\n" for r in records
+            )
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+
+            self._inode = os.stat(self.path).st_ino
+            self._offset = len(data)
+            self._records = len(records)
+        except OSError as e:
+            logger.warning("Failed to compact trace manifest %s: %s", self.path, e)
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+        finally:
+            os.close(fd)
+
+
+# Per-process manifests, so repeated reads only apply new records
+_manifests: Dict[Path, TraceManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(trace_dir: Union[str, Path]) -> TraceManifest:
+    """Get the shared manifest reader for a trace directory.
+
+    Args:
+        trace_dir: Directory containing trace files
+
+    Returns:
+        Manifest handle cached for the life of the process
+    """
+    key = Path(trace_dir).expanduser().resolve()
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = _manifests[key] = TraceManifest(key)
+        return manifest
@@ -0,0 +1,213 @@
+"""Bounded-cost previews and size measurement for tool responses.
+
+``str(response)`` on a multi-megabyte tool result materializes the whole
+string just to keep the first few hundred characters. The renderer here
+walks dicts, lists, tuples, sets and strings incrementally and stops as
+soon as the preview budget is used up.
+"""
+
+from typing import Any, List, Optional, Set, Tuple
+
+# Maximum nodes visited when measuring a container response
+MAX_MEASURE_NODES = 10000
+
+
+class _PreviewFull(Exception):
+    """Raised internally once the preview budget is exhausted."""
+
+
+class _PreviewRenderer:
+    """Accumulates repr()-compatible text until a character budget runs out."""
+
+    def __init__(self, budget: int):
+        self.parts: List[str] = []
+        self.remaining = budget
+
+    def emit(self, text: str) -> None:
+        if len(text) >= self.remaining:
+            self.parts.append(text[: self.remaining])
+            self.remaining = 0
+            raise _PreviewFull()
+        self.parts.append(text)
+        self.remaining -= len(text)
+
+    def render(self, obj: Any, seen: Set[int]) -> None:
+        """Render ``obj`` the way repr() would, stopping when the budget runs out."""
+        obj_type = type(obj)
+
+        if obj_type is str:
+            self.emit(_bounded_str_repr(obj, self.remaining))
+        elif obj_type in (bytes, bytearray):
+            self.emit(repr(obj[: self.remaining]))
+        elif obj_type is dict:
+            self._render_container(obj, seen, "{", "}", "{...}", is_dict=True)
+        elif obj_type is list:
+            self._render_container(obj, seen, "[", "]", "[...]")
+        elif obj_type is tuple:
+            self._render_container(obj, seen, "(", ",)" if len(obj) == 1 else ")", "(...)")
+        elif obj_type is set:
+            if obj:
+                self._render_container(obj, seen, "{", "}", "{...}")
+            else:
+                self.emit("set()")
+        elif obj_type is frozenset:
+            if obj:
+                self._render_container(obj, seen, "frozenset({", "})", "frozenset({...})")
+            else:
+                self.emit("frozenset()")
+        else:
+            self.emit(repr(obj))
+
+    def _render_container(
+        self,
+        obj: Any,
+        seen: Set[int],
+        open_text: str,
+        close_text: str,
+        recursive_text: str,
+        is_dict: bool = False,
+    ) -> None:
+        if id(obj) in seen:
+            self.emit(recursive_text)
+            return
+
+        seen.add(id(obj))
+        self.emit(open_text)
+        first = True
+        for item in obj.items() if is_dict else obj:
+            if not first:
+                self.emit(", ")
+            first = False
+            if is_dict:
+                self.render(item[0], seen)
+                self.emit(": ")
+                self.render(item[1], seen)
+            else:
+                self.render(item, seen)
+        self.emit(close_text)
+        seen.discard(id(obj))
+
+
+def _bounded_str_repr(value: str, budget: int) -> str:
+    """repr() of a string, computing at most enough of it to fill ``budget``.
+
+    Long strings are cut before escaping; the quote character is still
+    chosen from the whole string so the output is a prefix of repr(value).
+    """
+    if len(value) <= budget:
+        return repr(value)
+
+    # Every character renders as at least one, so this prefix fills the budget
+    prefix_repr = repr(value[:budget])
+    quote = '"' if "'" in value and '"' not in value else "'"
+    body = prefix_repr[1:-1]
+    if prefix_repr[0] == '"' and quote == "'":
+        body = body.replace("'", "\\'")
+    return quote + body
+
+
+def render_preview(response: Any, max_length: int = 500) -> str:
+    """Render a preview of a response without stringifying all of it.
+
+    The result equals ``str(response)[:max_length] + "..."`` (or
+    ``str(response)`` if it fits) for strings, bytes, numbers and nested
+    dicts, lists, tuples and sets of them. Other objects fall back to str().
+
+    Args:
+        response: Response object to preview
+        max_length: Maximum length of preview string
+
+    Returns:
+        Preview string, suffixed with "..." if truncated
+    """
+    if type(response) is str:
+        text = response[: max_length + 1]
+    else:
+        renderer = _PreviewRenderer(max_length + 1)
+        try:
+            if type(response) in (dict, list, tuple, set, frozenset, bytes, bytearray):
+                renderer.render(response, set())
+            else:
+                renderer.emit(str(response))
+        except _PreviewFull:
+            pass
+        text = "".join(renderer.parts)
+
+    if len(text) <= max_length:
+        return text
+    return text[:max_length] + "..."
+
+
+def measure_response(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Measure the original size of a response cheaply.
+
+    Bytes are the UTF-8 size of string data (and the length of binary data)
+    found in the response. Containers are walked for at most
+    MAX_MEASURE_NODES nodes; beyond that the byte size is reported as None.
+
+    Args:
+        response: Response object to measure
+
+    Returns:
+        Tuple of (size_bytes, item_count). item_count is the number of
+        top-level entries for containers and None for scalars.
+    """
+    if isinstance(response, (dict, list, tuple, set, frozenset)):
+        return _measure_container(response), len(response)
+    return _leaf_size(response), None
+
+
+def _leaf_size(value: Any) -> Optional[int]:
+    """Size in bytes of a scalar value."""
+    if isinstance(value, str):
+        # isascii() is O(1) for CPython strings, so ASCII text is never copied
+        return len(value) if value.isascii() else len(value.encode("utf-8", "surrogatepass"))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return len(repr(value))
+    return None
+
+
+def _measure_container(response: Any) -> Optional[int]:
+    """Sum leaf sizes in a container, giving up after MAX_MEASURE_NODES nodes."""
+    total = 0
+    stack = [response]
+    visited = 1
+    seen: Set[int] = set()
+
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+
+        # Exact type checks first: they are the common case and cheaper than
+        # isinstance() or a call into _leaf_size()
+        if value_type is str:
+            total += len(value) if value.isascii() else len(value.encode("utf-8", "surrogatepass"))
+            continue
+        if value_type is int or value_type is float or value_type is bool or value is None:
+            total += len(repr(value))
+            continue
+
+        if isinstance(value, (dict, list, tuple, set, frozenset)):
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            if isinstance(value, dict):
+                visited += 2 * len(value)
+                if visited > MAX_MEASURE_NODES:
+                    return None
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            else:
+                visited += len(value)
+                if visited > MAX_MEASURE_NODES:
+                    return None
+                stack.extend(value)
+        else:
+            size = _leaf_size(value)
+            if size is None:
+                return None
+            total += size
+
+    return total
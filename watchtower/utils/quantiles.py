@@ -0,0 +1,283 @@
+"""Mergeable streaming quantile sketches for tool and model latencies."""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Quantiles reported in summaries and registry snapshots
+REPORTED_QUANTILES = ((0.5, "p50_ms"), (0.9, "p90_ms"), (0.99, "p99_ms"))
+
+
+class DDSketch:
+    """Quantile sketch with relative-error guarantees (DDSketch).
+
+    Values are counted in logarithmic bins, so any quantile is estimated
+    within ``relative_accuracy`` of the true value. The number of bins is
+    capped at ``max_bins`` (the lowest bins are collapsed together when the
+    cap is hit), which keeps memory constant regardless of how many values
+    are added. Sketches with the same accuracy merge exactly by adding bins.
+
+    With the default 1% accuracy, latencies from 1 microsecond to 3 hours
+    fit in about 1,200 bins; a typical tool spanning 10ms to 10s uses ~350.
+
+    Example:
+        >>> sketch = DDSketch()
+        >>> for ms in range(1, 101):
+        ...     sketch.add(ms)
+        >>> round(sketch.quantile(0.5))
+        50
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 2048,
+        min_value: float = 1e-3,
+    ):
+        """Initialize an empty sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates
+            max_bins: Maximum number of bins kept
+            min_value: Values at or below this are counted as zero
+
+        Raises:
+            ValueError: If relative_accuracy is not between 0 and 1
+        """
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError(f"relative_accuracy must be between 0 and 1, got {relative_accuracy}")
+
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._max_bins = max_bins
+        self._min_value = min_value
+        self._bins: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Add a value.
+
+        Args:
+            value: Value to add (negative values are counted as zero)
+        """
+        if value <= self._min_value:
+            self._zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self._bins[key] = self._bins.get(key, 0) + 1
+            if len(self._bins) > self._max_bins:
+                self._collapse()
+
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's values to this one.
+
+        Args:
+            other: Sketch with the same relative accuracy
+
+        Raises:
+            ValueError: If the sketches have different accuracies
+        """
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge DDSketches with different relative accuracy")
+        if not other.count:
+            return
+
+        for key, count in other._bins.items():
+            self._bins[key] = self._bins.get(key, 0) + count
+        if len(self._bins) > self._max_bins:
+            self._collapse()
+
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self._zero_count:
+            return max(self.min, 0.0)
+
+        seen = self._zero_count
+        value = self.max
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            if seen > rank:
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                break
+        return min(max(value, self.min), self.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the sketch.
+
+        Returns:
+            Dictionary with count and the p50/p90/p99 estimates in milliseconds
+        """
+        summary: Dict[str, Any] = {"count": self.count}
+        for q, name in REPORTED_QUANTILES:
+            estimate = self.quantile(q)
+            summary[name] = round(estimate, 3) if estimate is not None else None
+        return summary
+
+    def _collapse(self) -> None:
+        """Merge the lowest bins until at most max_bins remain."""
+        keys = sorted(self._bins)
+        excess = len(keys) - self._max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self._bins[target] += self._bins.pop(key)
+
+
+class LatencyRegistry:
+    """Process-wide rolling latency sketches keyed by (kind, name).
+
+    Each key keeps one DDSketch per time window in a ring of ``windows``
+    slots; a snapshot merges the slots from the last ``windows`` windows, so
+    old data ages out instead of accumulating forever. Keys are capped at
+    ``max_keys`` (least recently updated are evicted), which together with
+    the per-sketch bin cap keeps memory bounded.
+
+    Example:
+        >>> registry = LatencyRegistry(window_seconds=60, windows=5)
+        >>> registry.record("tools", "search", 120.0)
+        >>> registry.snapshot()["tools"]["search"]["count"]
+        1
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300.0,
+        windows: int = 12,
+        max_keys: int = 512,
+    ):
+        """Initialize registry.
+
+        Args:
+            window_seconds: Length of each window
+            windows: Number of windows covered by snapshots
+            max_keys: Maximum number of (kind, name) keys tracked
+        """
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], List[Optional[Tuple[int, DDSketch]]]]" = (
+            OrderedDict()
+        )
+
+    def record(self, kind: str, name: str, value: float) -> None:
+        """Add a single value.
+
+        Args:
+            kind: Category, e.g. "tools" or "models"
+            name: Tool or model name
+            value: Latency in milliseconds
+        """
+        with self._lock:
+            self._current(kind, name).add(value)
+
+    def merge(self, kind: str, name: str, sketch: DDSketch) -> None:
+        """Merge a sketch (e.g. from a finished run) into the current window.
+
+        Args:
+            kind: Category, e.g. "tools" or "models"
+            name: Tool or model name
+            sketch: Sketch to merge
+        """
+        with self._lock:
+            self._current(kind, name).merge(sketch)
+
+    def get(self, kind: str, name: str) -> Optional[DDSketch]:
+        """Get the merged sketch for a key over the covered windows.
+
+        Args:
+            kind: Category, e.g. "tools" or "models"
+            name: Tool or model name
+
+        Returns:
+            Merged sketch, or None if the key has no recent data
+        """
+        with self._lock:
+            slots = self._entries.get((kind, name))
+            return self._merge_recent(slots) if slots else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Summarize all keys with recent data.
+
+        Returns:
+            Dictionary of kind -> name -> {count, p50_ms, p90_ms, p99_ms}
+        """
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with self._lock:
+            for (kind, name), slots in self._entries.items():
+                merged = self._merge_recent(slots)
+                if merged is not None:
+                    result.setdefault(kind, {})[name] = merged.to_dict()
+        return result
+
+    def reset(self) -> None:
+        """Discard all recorded data."""
+        with self._lock:
+            self._entries.clear()
+
+    def _window(self) -> int:
+        return int(time.monotonic() // self.window_seconds)
+
+    def _current(self, kind: str, name: str) -> DDSketch:
+        """Get (creating or recycling as needed) the current window's sketch."""
+        key = (kind, name)
+        slots = self._entries.get(key)
+        if slots is None:
+            slots = self._entries[key] = [None] * self.windows
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        window = self._window()
+        index = window % self.windows
+        slot = slots[index]
+        if slot is None or slot[0] != window:
+            slot = slots[index] = (window, DDSketch())
+        return slot[1]
+
+    def _merge_recent(self, slots: List[Optional[Tuple[int, DDSketch]]]) -> Optional[DDSketch]:
+        """Merge the sketches of windows that are still covered."""
+        oldest = self._window() - self.windows + 1
+        merged: Optional[DDSketch] = None
+        for slot in slots:
+            if slot is None or slot[0] < oldest:
+                continue
+            if merged is None:
+                merged = DDSketch(slot[1].relative_accuracy)
+            merged.merge(slot[1])
+        return merged if merged is not None and merged.count else None
+
+
+# Process-wide registry fed by AgentTracePlugin at the end of every run
+latency_registry = LatencyRegistry()
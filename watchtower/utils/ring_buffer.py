@@ -0,0 +1,238 @@
+"""Fixed-capacity event buffer with O(1) overflow handling."""
+
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Generic, List, Optional, TypeVar, Union
+
+logger = logging.getLogger("watchtower")
+
+T = TypeVar("T")
+
+
+class OverflowPolicy(str, Enum):
+    """What a full RingBuffer does with a new item."""
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BLOCK = "block"
+    SAMPLE = "sample"
+
+
+class RingBuffer(Generic[T]):
+    """Bounded FIFO buffer that never copies on overflow.
+
+    Items live in a deque, so dropping from either end is O(1). Drops are
+    counted and reported as a single rate-limited warning instead of one
+    log line per dropped item.
+
+    With the BLOCK policy, append() waits for a consumer on another thread
+    to drain() space (or for ``block_timeout`` to pass, after which the item
+    is dropped). Single-threaded owners should drain before appending
+    instead of relying on BLOCK.
+
+    With the SAMPLE policy, once the buffer is half full only every
+    ``sample_every``-th new item is admitted (items appended as essential
+    always are), so a consumer that falls behind sees a thinned stream
+    instead of a gap; a full buffer then drops its oldest item.
+
+    A consumer thread can sleep in wait() until items arrive.
+
+    Example:
+        >>> buffer = RingBuffer(capacity=2, policy="drop_oldest")
+        >>> for i in range(3):
+        ...     buffer.append(i)
+        >>> buffer.drain()
+        [1, 2]
+        >>> buffer.dropped
+        1
+    """
+
+    # Minimum seconds between overflow warnings
+    WARN_INTERVAL = 10.0
+
+    def __init__(
+        self,
+        capacity: int,
+        policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+        name: str = "Buffer",
+        block_timeout: Optional[float] = None,
+        sample_every: int = 10,
+    ):
+        """Initialize ring buffer.
+
+        Args:
+            capacity: Maximum number of items held
+            policy: Overflow policy ("drop_oldest", "drop_newest" or "block")
+            name: Name used in overflow warnings
+            block_timeout: Seconds BLOCK waits before dropping (None waits forever)
+            sample_every: Fraction (1 in N) of items SAMPLE admits past half capacity
+
+        Raises:
+            ValueError: If capacity is not positive or the policy is unknown
+        """
+        if capacity < 1:
+            raise ValueError(f"RingBuffer capacity must be positive, got {capacity}")
+
+        self._items: Deque[T] = deque()
+        self._capacity = capacity
+        self._policy = OverflowPolicy(policy)
+        self._name = name
+        self._block_timeout = block_timeout
+        self._sample_every = max(1, sample_every)
+        self._sample_threshold = max(1, capacity // 2)
+        self._sampled = 0
+        lock = threading.Lock()
+        self._not_full = threading.Condition(lock)
+        self._not_empty = threading.Condition(lock)
+        self._woken = False
+        self._dropped = 0
+        self._dropped_since_warning = 0
+        self._last_warning = 0.0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of items held."""
+        return self._capacity
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        """Overflow policy."""
+        return self._policy
+
+    @property
+    def is_full(self) -> bool:
+        """Whether the next append will overflow."""
+        return len(self._items) >= self._capacity
+
+    @property
+    def dropped(self) -> int:
+        """Total number of items dropped on overflow."""
+        return self._dropped
+
+    def append(self, item: T, essential: bool = False) -> bool:
+        """Add an item, applying the overflow policy if the buffer is full.
+
+        Args:
+            item: Item to add
+            essential: Never thinned out by the SAMPLE policy (a full buffer
+                still applies its policy)
+
+        Returns:
+            True if the item was stored, False if it was dropped
+        """
+        with self._not_full:
+            if (
+                self._policy is OverflowPolicy.SAMPLE
+                and not essential
+                and len(self._items) >= self._sample_threshold
+            ):
+                self._sampled += 1
+                if self._sampled % self._sample_every:
+                    self._record_drop()
+                    return False
+            if len(self._items) >= self._capacity:
+                if self._policy in (OverflowPolicy.DROP_OLDEST, OverflowPolicy.SAMPLE):
+                    self._items.popleft()
+                    self._record_drop()
+                elif self._policy is OverflowPolicy.DROP_NEWEST:
+                    self._record_drop()
+                    return False
+                elif not self._not_full.wait_for(
+                    lambda: len(self._items) < self._capacity, self._block_timeout
+                ):
+                    self._record_drop()
+                    return False
+
+            self._items.append(item)
+            if len(self._items) == 1:
+                self._not_empty.notify()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the buffer holds items or wake() is called.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if there are items or the buffer was woken
+        """
+        with self._not_empty:
+            woken = self._not_empty.wait_for(lambda: self._items or self._woken, timeout)
+            self._woken = False
+            return bool(woken)
+
+    def wake(self) -> None:
+        """Wake a consumer blocked in wait() even if the buffer is empty."""
+        with self._not_empty:
+            self._woken = True
+            self._not_empty.notify_all()
+
+    def oldest(self) -> Optional[T]:
+        """The item that has been buffered longest, without removing it."""
+        with self._not_full:
+            return self._items[0] if self._items else None
+
+    def popleft(self) -> Optional[T]:
+        """Remove and return the oldest item, or None if the buffer is empty."""
+        with self._not_full:
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._not_full.notify()
+        return item
+
+    def drain(self, max_items: Optional[int] = None) -> List[T]:
+        """Remove and return buffered items in FIFO order.
+
+        Args:
+            max_items: Maximum number of items to remove (all if None)
+
+        Returns:
+            Removed items, oldest first
+        """
+        with self._not_full:
+            if max_items is None or max_items >= len(self._items):
+                items = list(self._items)
+                self._items.clear()
+            else:
+                items = [self._items.popleft() for _ in range(max_items)]
+            self._not_full.notify_all()
+        return items
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get buffer counters.
+
+        Returns:
+            Dictionary with buffered, capacity and dropped counts
+        """
+        return {
+            "buffered": len(self._items),
+            "capacity": self._capacity,
+            "dropped": self._dropped,
+        }
+
+    def _record_drop(self) -> None:
+        """Count a drop and emit a rate-limited warning."""
+        self._dropped += 1
+        self._dropped_since_warning += 1
+
+        now = time.monotonic()
+        if now - self._last_warning >= self.WARN_INTERVAL:
+            logger.warning(
+                "%s at max capacity (%d, policy=%s). Dropped %d event(s) "
+                "since last warning (%d total).",
+                self._name,
+                self._capacity,
+                self._policy.value,
+                self._dropped_since_warning,
+                self._dropped,
+            )
+            self._last_warning = now
+            self._dropped_since_warning = 0
@@ -1,8 +1,11 @@
 """Utilities for sanitizing sensitive data in trace events."""
 
 import re
+from functools import lru_cache
 from typing import Dict, Any, List
 
+from watchtower.utils.preview import render_preview
+
 # Patterns to match sensitive argument names
 SENSITIVE_KEY_PATTERNS = [
     r"password",
@@ -41,6 +44,25 @@ SENSITIVE_VALUE_PATTERNS_COMPILED = [re.compile(pattern) for pattern in SENSITIV
 # Backward compatibility alias
 SENSITIVE_PATTERNS = SENSITIVE_KEY_PATTERNS
 
+# Each pattern set combined into one alternation so a key or value is
+# scanned once instead of once per pattern
+SENSITIVE_KEY_REGEX = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in SENSITIVE_KEY_PATTERNS), re.IGNORECASE
+)
+SENSITIVE_VALUE_REGEX = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in SENSITIVE_VALUE_PATTERNS)
+)
+
+# Shortest string any value pattern can match
+_MIN_SENSITIVE_VALUE_LENGTH = 10
+
+# First character of every value pattern (all are anchored literals), used to
+# reject most strings without running the regex at all
+_SENSITIVE_VALUE_PREFIXES = frozenset(pattern[1] for pattern in SENSITIVE_VALUE_PATTERNS)
+
+# Tool argument keys repeat endlessly; cache their classification
+KEY_CACHE_SIZE = 4096
+
 
 def sanitize_args(args: Dict[str, Any]) -> Dict[str, Any]:
     """Replace sensitive values with [REDACTED].
@@ -57,22 +79,28 @@ def sanitize_args(args: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(args, dict):
         return args
 
-    sanitized: Dict[str, Any] = {}
+    return {
+        key: "[REDACTED]" if _is_sensitive_key(key) else _sanitize_value(value)
+        for key, value in args.items()
+    }
+
 
-    for key, value in args.items():
-        if _is_sensitive_key(key):
-            sanitized[key] = "[REDACTED]"
-        elif isinstance(value, str) and _is_sensitive_value(value):
-            # Check string values for known credential patterns
-            sanitized[key] = "[REDACTED]"
-        elif isinstance(value, dict):
-            sanitized[key] = sanitize_args(value)
-        elif isinstance(value, list):
-            sanitized[key] = _sanitize_list(value)
-        else:
-            sanitized[key] = value
+def _sanitize_value(value: Any) -> Any:
+    """Sanitize a single value in one pass over nested dicts and lists.
+
+    Args:
+        value: Value to sanitize
 
-    return sanitized
+    Returns:
+        Sanitized value (containers are copied, other values returned as-is)
+    """
+    if isinstance(value, str):
+        return "[REDACTED]" if _is_sensitive_value(value) else value
+    if isinstance(value, dict):
+        return sanitize_args(value)
+    if isinstance(value, list):
+        return [_sanitize_value(item) for item in value]
+    return value
 
 
 def _sanitize_list(items: List[Any]) -> List[Any]:
@@ -84,23 +112,14 @@ def _sanitize_list(items: List[Any]) -> List[Any]:
     Returns:
         New list with sensitive values redacted
     """
-    result: List[Any] = []
-    for item in items:
-        if isinstance(item, dict):
-            result.append(sanitize_args(item))
-        elif isinstance(item, str) and _is_sensitive_value(item):
-            result.append("[REDACTED]")
-        elif isinstance(item, list):
-            result.append(_sanitize_list(item))
-        else:
-            result.append(item)
-    return result
-
-
-def _is_sensitive_key(key: str) -> bool:
+    return [_sanitize_value(item) for item in items]
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _is_sensitive_key(key: Any) -> bool:
     """Check if a key name matches sensitive patterns.
 
-    Uses pre-compiled regex patterns for performance.
+    Uses a single combined regex; results are memoized per key.
 
     Args:
         key: Key name to check
@@ -108,14 +127,16 @@ def _is_sensitive_key(key: str) -> bool:
     Returns:
         True if key appears to contain sensitive data
     """
-    # Pre-compiled patterns already have IGNORECASE flag
-    return any(pattern.search(key) for pattern in SENSITIVE_KEY_PATTERNS_COMPILED)
+    if not isinstance(key, str):
+        return False
+    return SENSITIVE_KEY_REGEX.search(key) is not None
 
 
 def _is_sensitive_value(value: str) -> bool:
     """Check if a string value matches known sensitive value patterns.
 
-    Uses pre-compiled regex patterns for performance.
+    Strings too short or starting with a character no pattern starts with
+    are rejected before running the combined regex.
 
     Args:
         value: String value to check
@@ -123,14 +144,21 @@ def _is_sensitive_value(value: str) -> bool:
     Returns:
         True if value appears to be a sensitive credential or token
     """
-    if not isinstance(value, str) or len(value) < 10:
+    if (
+        not isinstance(value, str)
+        or len(value) < _MIN_SENSITIVE_VALUE_LENGTH
+        or value[0] not in _SENSITIVE_VALUE_PREFIXES
+    ):
         return False
-    return any(pattern.match(value) for pattern in SENSITIVE_VALUE_PATTERNS_COMPILED)
+    return SENSITIVE_VALUE_REGEX.match(value) is not None
 
 
 def truncate_response(response: Any, max_length: int = 500) -> str:
     """Truncate a response to a preview string.
 
+    Renders incrementally (see ``watchtower.utils.preview``) so large
+    responses are never fully stringified.
+
     Args:
         response: Response object to truncate
         max_length: Maximum length of preview string
@@ -138,9 +166,4 @@ def truncate_response(response: Any, max_length: int = 500) -> str:
     Returns:
         Truncated string representation
     """
-    response_str = str(response)
-
-    if len(response_str) <= max_length:
-        return response_str
-
-    return response_str[:max_length] + "..."
+    return render_preview(response, max_length)
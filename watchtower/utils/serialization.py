@@ -1,18 +1,103 @@
 """JSON serialization utilities for Watchtower.
 
 Provides a custom JSON encoder with explicit type handling to avoid
-silent string conversion of unknown types.
+silent string conversion of unknown types, and a fast ``encode_event``
+path that uses orjson when it is installed and falls back to the stdlib.
 """
 
 import json
 import logging
+import os
 from datetime import datetime, date
 from pathlib import Path
 from uuid import UUID
-from typing import Any
+from typing import Any, Callable, Dict, Set
+
+from watchtower.exceptions import WatchtowerSerializationError
 
 logger = logging.getLogger("watchtower")
 
+# orjson is optional; it is several times faster than the stdlib encoder
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _to_serializable(obj: Any, strict: bool, warned_types: Set[str]) -> Any:
+    """Convert a non-standard type to a JSON-serializable value.
+
+    Shared by WatchtowerJSONEncoder and the encode_event backends so every
+    encoder handles datetime, Path, UUID, bytes and sets identically.
+
+    Args:
+        obj: Object to serialize
+        strict: Raise TypeError for unknown types instead of using str()
+        warned_types: Type names already warned about (updated in place)
+
+    Returns:
+        JSON-serializable representation
+
+    Raises:
+        TypeError: In strict mode, for unknown types
+    """
+    # Datetime types
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+
+    # Path objects
+    if isinstance(obj, Path):
+        return str(obj)
+
+    # UUID objects
+    if isinstance(obj, UUID):
+        return str(obj)
+
+    # Bytes - decode with replacement for invalid chars
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+
+    # Sets/frozensets - convert to list
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+
+    # Objects with custom __dict__
+    if hasattr(obj, "__dict__"):
+        type_name = type(obj).__name__
+        _warn_unknown_type(type_name, warned_types)
+        return {"__type__": type_name, **obj.__dict__}
+
+    # Unknown type - warn and convert to string
+    type_name = type(obj).__name__
+    _warn_unknown_type(type_name, warned_types)
+
+    if strict:
+        raise TypeError(
+            f"Object of type {type_name} is not JSON serializable. "
+            "Use default=str or add explicit handling for this type."
+        )
+
+    return str(obj)
+
+
+def _warn_unknown_type(type_name: str, warned_types: Set[str]) -> None:
+    """Log a warning for unknown type (once per type).
+
+    Args:
+        type_name: Name of the type that couldn't be serialized
+        warned_types: Type names already warned about (updated in place)
+    """
+    if type_name not in warned_types:
+        warned_types.add(type_name)
+        logger.warning(
+            "Serializing unknown type '%s' as string. Consider adding explicit handling.",
+            type_name,
+        )
+
 
 class WatchtowerJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder with explicit type handling.
@@ -55,58 +140,7 @@ class WatchtowerJSONEncoder(json.JSONEncoder):
         Raises:
             TypeError: In strict mode, for unknown types
         """
-        # Datetime types
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if isinstance(obj, date):
-            return obj.isoformat()
-
-        # Path objects
-        if isinstance(obj, Path):
-            return str(obj)
-
-        # UUID objects
-        if isinstance(obj, UUID):
-            return str(obj)
-
-        # Bytes - decode with replacement for invalid chars
-        if isinstance(obj, bytes):
-            return obj.decode("utf-8", errors="replace")
-
-        # Sets/frozensets - convert to list
-        if isinstance(obj, (set, frozenset)):
-            return list(obj)
-
-        # Objects with custom __dict__
-        if hasattr(obj, "__dict__"):
-            type_name = type(obj).__name__
-            self._warn_unknown_type(type_name)
-            return {"__type__": type_name, **obj.__dict__}
-
-        # Unknown type - warn and convert to string
-        type_name = type(obj).__name__
-        self._warn_unknown_type(type_name)
-
-        if self.strict:
-            raise TypeError(
-                f"Object of type {type_name} is not JSON serializable. "
-                "Use default=str or add explicit handling for this type."
-            )
-
-        return str(obj)
-
-    def _warn_unknown_type(self, type_name: str) -> None:
-        """Log a warning for unknown type (once per type).
-
-        Args:
-            type_name: Name of the type that couldn't be serialized
-        """
-        if type_name not in self._warned_types:
-            self._warned_types.add(type_name)
-            logger.warning(
-                "Serializing unknown type '%s' as string. Consider adding explicit handling.",
-                type_name,
-            )
+        return _to_serializable(obj, self.strict, self._warned_types)
 
 
 def json_dumps(obj: Any, **kwargs: Any) -> str:
@@ -137,3 +171,86 @@ def json_dumps_compact(obj: Any) -> str:
         Compact JSON string
     """
     return json.dumps(obj, cls=WatchtowerJSONEncoder, separators=(",", ":"))
+
+
+if HAS_ORJSON:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+# Type names warned about by the encode_event backends
+_backend_warned_types: Set[str] = set()
+
+
+def _backend_default(obj: Any) -> Any:
+    """``default`` hook shared by the encode_event backends."""
+    return _to_serializable(obj, False, _backend_warned_types)
+
+
+def _encode_stdlib(obj: Any) -> bytes:
+    """Encode compact UTF-8 JSON with the stdlib encoder."""
+    return json.dumps(obj, cls=WatchtowerJSONEncoder, separators=(",", ":")).encode("utf-8")
+
+
+def _encode_orjson(obj: Any) -> bytes:
+    """Encode compact UTF-8 JSON with orjson.
+
+    Datetimes and dataclasses are passed through to the shared default hook
+    so output matches the stdlib encoder. Values orjson rejects (e.g.
+    integers wider than 64 bits) are retried with the stdlib encoder.
+    """
+    try:
+        return orjson.dumps(obj, default=_backend_default, option=_ORJSON_OPTIONS)
+    except TypeError:
+        return _encode_stdlib(obj)
+
+
+# Available encode_event backends, fastest first. msgspec is not offered:
+# it encodes bytes as base64 natively, which would change trace contents.
+_BACKENDS: Dict[str, Callable[[Any], bytes]] = {}
+if HAS_ORJSON:
+    _BACKENDS["orjson"] = _encode_orjson
+_BACKENDS["json"] = _encode_stdlib
+
+
+def _select_backend() -> str:
+    """Pick the encode_event backend.
+
+    Honors WATCHTOWER_JSON_BACKEND ("orjson" or "json") when that backend
+    is available, otherwise uses the fastest installed one.
+
+    Returns:
+        Backend name
+    """
+    requested = os.environ.get("WATCHTOWER_JSON_BACKEND", "").lower()
+    if requested in _BACKENDS:
+        return requested
+    if requested:
+        logger.warning("JSON backend '%s' is not available; using default", requested)
+    return next(iter(_BACKENDS))
+
+
+JSON_BACKEND = _select_backend()
+_encode = _BACKENDS[JSON_BACKEND]
+
+
+def encode_event(event: Any) -> bytes:
+    """Serialize an event to compact UTF-8 JSON bytes (no trailing newline).
+
+    Uses the fastest available backend (see ``JSON_BACKEND``). The result can
+    be shared by every writer so each event is encoded only once.
+
+    Args:
+        event: Event dictionary to serialize
+
+    Returns:
+        Encoded JSON bytes
+
+    Raises:
+        WatchtowerSerializationError: If the event cannot be serialized
+    """
+    try:
+        return _encode(event)
+    except (TypeError, ValueError, OverflowError, RecursionError) as e:
+        event_type = event.get("type", "unknown") if isinstance(event, dict) else "unknown"
+        raise WatchtowerSerializationError(str(e), event_type=event_type) from e
@@ -0,0 +1,197 @@
+"""Sidecar offset index for trace files.
+
+Next to ``{date}_{run_id}.jsonl`` the index lives in ``{date}_{run_id}.jsonl.idx``.
+Each line describes one flushed batch (one frame for compressed files):
+
+    {"o": 4096, "n": 812, "r": "abc123", "e": [[0, 201, "tool.start", 1705329121.2, "search"], ...]}
+
+``o``/``n`` are the batch's offset and stored length in the trace file, and
+every entry gives an event's offset and length within the (decompressed)
+batch, its type, timestamp and tool name. Readers can therefore jump straight
+to matching events without parsing the rest of the file.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from watchtower.utils.compression import iter_frames_at
+
+logger = logging.getLogger("watchtower")
+
+INDEX_SUFFIX = ".idx"
+
+
+class IndexEntry(NamedTuple):
+    """Location and key fields of one event in a trace file."""
+
+    frame_offset: int
+    frame_length: int
+    position: int
+    length: int
+    type: Optional[str]
+    timestamp: Optional[float]
+    tool_name: Optional[str]
+    run_id: Optional[str]
+
+
+def index_path(trace_file: Path) -> Path:
+    """Path of the sidecar index for a trace file.
+
+    Args:
+        trace_file: Trace file path
+
+    Returns:
+        Sidecar index path
+    """
+    return trace_file.with_name(trace_file.name + INDEX_SUFFIX)
+
+
+def encode_batch_record(
+    offset: int,
+    length: int,
+    run_id: Optional[str],
+    events: Sequence[Tuple[Dict[str, Any], bytes]],
+) -> bytes:
+    """Build the index line for a batch just appended to a trace file.
+
+    Args:
+        offset: File offset the batch was written at
+        length: Stored (possibly compressed) length of the batch
+        run_id: Run the batch belongs to
+        events: Events in the batch with their encoded JSON lines
+
+    Returns:
+        Newline-terminated JSON index record
+    """
+    entries = []
+    position = 0
+    for event, data in events:
+        entries.append(
+            [position, len(data), event.get("type"), event.get("timestamp"), event.get("tool_name")]
+        )
+        position += len(data) + 1
+
+    record = {"o": offset, "n": length, "r": run_id, "e": entries}
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def load_index(trace_file: Path, persist: bool = True) -> List[IndexEntry]:
+    """Load a trace file's index, building whatever it is missing.
+
+    Legacy files without a sidecar are scanned once and, with ``persist``,
+    get an index written for next time. If the sidecar does not cover the
+    whole file (a crash between the two appends, or a writer running
+    without indexing), the uncovered tail is scanned in memory.
+
+    Args:
+        trace_file: Trace file path
+        persist: Whether to write a sidecar for files that have none
+
+    Returns:
+        Index entries in file order
+    """
+    sidecar = index_path(trace_file)
+    records: List[Dict[str, Any]] = []
+    if sidecar.exists():
+        records = _read_records(sidecar)
+    elif persist:
+        records = list(_scan(trace_file, 0))
+        _write_records(sidecar, records)
+        return _flatten(records)
+
+    # Keep the records that cover the file contiguously from the start
+    covered = 0
+    contiguous = []
+    for record in sorted(records, key=lambda r: r["o"]):
+        if record["o"] != covered:
+            break
+        contiguous.append(record)
+        covered += record["n"]
+
+    try:
+        size = trace_file.stat().st_size
+    except OSError:
+        size = covered
+    if covered < size:
+        contiguous.extend(_scan(trace_file, covered))
+
+    return _flatten(contiguous)
+
+
+def _read_records(sidecar: Path) -> List[Dict[str, Any]]:
+    """Parse a sidecar, ignoring torn or corrupt lines."""
+    records = []
+    try:
+        with open(sidecar, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and {"o", "n", "e"} <= record.keys():
+                    records.append(record)
+    except OSError as e:
+        logger.warning("Failed to read trace index %s: %s", sidecar, e)
+    return records
+
+
+def _write_records(sidecar: Path, records: List[Dict[str, Any]]) -> None:
+    """Write a rebuilt sidecar atomically."""
+    tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        os.replace(tmp, sidecar)
+    except OSError as e:
+        logger.warning("Failed to write trace index %s: %s", sidecar, e)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _scan(trace_file: Path, start: int) -> Iterator[Dict[str, Any]]:
+    """Build index records by parsing a trace file from ``start``."""
+    for offset, length, frame in iter_frames_at(trace_file, start):
+        if not frame.endswith(b"\n"):
+            # Partially written final line; leave it for the next load
+            break
+
+        entries = []
+        run_id = None
+        position = 0
+        for line in frame.split(b"\n")[:-1]:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = {}
+            if not isinstance(event, dict):
+                event = {}
+            run_id = run_id or event.get("run_id")
+            entries.append(
+                [
+                    position,
+                    len(line),
+                    event.get("type"),
+                    event.get("timestamp"),
+                    event.get("tool_name"),
+                ]
+            )
+            position += len(line) + 1
+        yield {"o": offset, "n": length, "r": run_id, "e": entries}
+
+
+def _flatten(records: List[Dict[str, Any]]) -> List[IndexEntry]:
+    """Expand batch records into one entry per event."""
+    entries = []
+    for record in records:
+        offset, length, run_id = record["o"], record["n"], record.get("r")
+        for position, size, event_type, timestamp, tool_name in record["e"]:
+            entries.append(
+                IndexEntry(offset, length, position, size, event_type, timestamp, tool_name, run_id)
+            )
+    return entries
@@ -1,7 +1,22 @@
 """Writers for trace event output."""
 
-from watchtower.writers.base import TraceWriter
+from watchtower.writers.base import AsyncTraceWriter, TraceWriter
 from watchtower.writers.file_writer import FileWriter
 from watchtower.writers.stdout_writer import StdoutWriter
+from watchtower.writers.background_writer import BackgroundWriter
+from watchtower.writers.sqlite_writer import SQLiteWriter
+from watchtower.writers.async_writer import ThreadOffloadWriter
+from watchtower.writers.hub import HubWriter, WriterHub, get_writer_hub
 
-__all__ = ["TraceWriter", "FileWriter", "StdoutWriter"]
+__all__ = [
+    "TraceWriter",
+    "AsyncTraceWriter",
+    "FileWriter",
+    "StdoutWriter",
+    "BackgroundWriter",
+    "SQLiteWriter",
+    "ThreadOffloadWriter",
+    "HubWriter",
+    "WriterHub",
+    "get_writer_hub",
+]
@@ -0,0 +1,302 @@
+"""Adapter running synchronous trace writers from the asyncio event loop."""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from watchtower.writers.base import AsyncTraceWriter, TraceWriter
+
+logger = logging.getLogger("watchtower")
+
+# A queued event and its encoding, or a flush marker resolved once done
+_QueueItem = Union[tuple, "asyncio.Future[None]"]
+
+
+class ThreadOffloadWriter(AsyncTraceWriter):
+    """Runs a synchronous TraceWriter off the event loop.
+
+    write() puts the event on an asyncio queue. A consumer task on the same
+    loop drains the queue in batches and hands each batch to a worker thread
+    (asyncio.to_thread), so blocking I/O never runs on the loop, while every
+    wrapped writer progresses concurrently with the others. flush() queues
+    a marker and awaits it, which resolves once every earlier event has
+    been written and the wrapped writer flushed.
+
+    Outside a running event loop (e.g. in synchronous code or at shutdown)
+    calls go straight to the wrapped writer. close() from another thread
+    while the loop runs hands the work to aclose() on that loop.
+
+    Example:
+        >>> writer = ThreadOffloadWriter(FileWriter("~/.watchtower/traces"))
+        >>> writer.write({"type": "run.start", "run_id": "abc123"})
+        >>> await writer.flush()
+    """
+
+    # Default number of events that may be pending before drops occur
+    DEFAULT_QUEUE_SIZE = 10000
+
+    # Maximum events handed to the worker thread at once
+    MAX_BATCH = 500
+
+    def __init__(
+        self,
+        writer: TraceWriter,
+        max_queue_size: int = DEFAULT_QUEUE_SIZE,
+        flush_timeout: float = 5.0,
+    ):
+        """Initialize adapter (the consumer task starts with the first write).
+
+        Args:
+            writer: Synchronous writer that performs the actual I/O
+            max_queue_size: Maximum number of pending events (default: 10000)
+            flush_timeout: Seconds close() waits for the event loop when
+                called from another thread
+        """
+        super().__init__()
+        self._writer = writer
+        self._max_queue_size = max_queue_size
+        self._flush_timeout = flush_timeout
+        # Serializes calls into the wrapped writer (worker thread vs. sync fallback)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional["asyncio.Queue[_QueueItem]"] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._closed = False
+        self._dropped_events = 0
+        self._written_events = 0
+        self._write_errors = 0
+
+    @property
+    def writer(self) -> TraceWriter:
+        """Underlying writer that performs the I/O."""
+        return self._writer
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of events waiting to be written."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def write(self, event: Dict[str, Any]) -> None:
+        """Enqueue an event without blocking.
+
+        Args:
+            event: Event dictionary to write
+        """
+        self._enqueue(event, None)
+
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Enqueue an already-serialized event without blocking.
+
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event
+        """
+        self._enqueue(event, data)
+
+    def _enqueue(self, event: Dict[str, Any], data: Optional[bytes]) -> None:
+        if self._closed:
+            self._count_drop()
+            return
+        queue = self._bind()
+        if queue is None:
+            self._process([(event, data)])
+            return
+        try:
+            queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            self._count_drop()
+
+    async def flush(self) -> None:
+        """Wait until all events enqueued so far are written and flushed."""
+        queue = self._bind()
+        if queue is None or self._loop is None:
+            await asyncio.to_thread(self._flush_writer)
+            return
+        done: "asyncio.Future[None]" = self._loop.create_future()
+        await queue.put(done)
+        await done
+
+    async def aclose(self) -> None:
+        """Flush pending events, stop the consumer task and close the writer."""
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+        await asyncio.to_thread(self._close_writer)
+
+    def close(self) -> None:
+        """Write pending events and close the writer from synchronous code.
+
+        Safe to call multiple times, with or without a running loop. From a
+        thread other than the loop's, while the loop runs, this runs aclose()
+        on the loop and waits at most ``flush_timeout`` seconds for it, since
+        the queue may only be touched from the loop's thread.
+        """
+        if self._closed:
+            return
+        loop = self._loop
+        if loop is not None and loop.is_running() and not _is_running_loop(loop):
+            future = asyncio.run_coroutine_threadsafe(self.aclose(), loop)
+            try:
+                future.result(self._flush_timeout)
+            except concurrent.futures.TimeoutError:
+                logger.warning(
+                    "Offloaded writer did not close within %.1fs (%d events pending)",
+                    self._flush_timeout,
+                    self.queue_depth,
+                )
+            except Exception as e:
+                logger.warning("Offloaded writer failed to close on its loop: %s", e)
+            return
+        self._closed = True
+        if self._task is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        self._drain()
+        self._close_writer()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get queue and throughput counters.
+
+        Returns:
+            Dictionary with queue_depth, max_queue_size, written_events,
+            queue_dropped_events, dropped_events (queue drops plus drops in
+            the wrapped writer) and write_errors
+        """
+        writer_dropped = self._writer.get_stats().get("dropped_events", 0)
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self._max_queue_size,
+            "written_events": self._written_events,
+            "queue_dropped_events": self._dropped_events,
+            "dropped_events": self._dropped_events + writer_dropped,
+            "write_errors": self._write_errors,
+        }
+
+    def get_trace_path(self) -> Optional[Path]:
+        """Return the underlying writer's current trace file path, if any."""
+        get_trace_path = getattr(self._writer, "get_trace_path", None)
+        return get_trace_path() if get_trace_path else None
+
+    # === Internals ===
+
+    def _bind(self) -> Optional["asyncio.Queue[_QueueItem]"]:
+        """Queue of the running loop, or None outside an event loop.
+
+        The queue and consumer task belong to one loop; if a different loop
+        shows up (e.g. successive asyncio.run() calls), events left on the
+        previous queue are written synchronously first.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if loop is not self._loop or self._queue is None:
+            self._drain()
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+            self._task = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def _run(self, queue: "asyncio.Queue[_QueueItem]") -> None:
+        """Consumer task: hand queued batches to a worker thread."""
+        while True:
+            batch: List[_QueueItem] = [await queue.get()]
+            while len(batch) < self.MAX_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._process, batch)
+            finally:
+                for item in batch:
+                    if isinstance(item, asyncio.Future) and not item.done():
+                        item.set_result(None)
+
+    def _process(self, batch: List[_QueueItem]) -> None:
+        """Write a batch to the wrapped writer (runs on a worker thread)."""
+        with self._lock:
+            for item in batch:
+                try:
+                    if isinstance(item, asyncio.Future):
+                        self._writer.flush()
+                        continue
+                    event, data = item
+                    if data is None:
+                        self._writer.write(event)
+                    else:
+                        self._writer.write_encoded(event, data)
+                    self._written_events += 1
+                except Exception as e:
+                    self._write_errors += 1
+                    logger.warning("Offloaded writer failed to write event: %s", e)
+
+    def _drain(self) -> None:
+        """Write whatever is left on the current queue from this thread.
+
+        Pending flush() calls are resolved once the events before them are
+        written, so none of them waits forever on a queue nobody consumes.
+        """
+        queue = self._queue
+        if queue is None:
+            return
+        items: List[_QueueItem] = []
+        while not queue.empty():
+            items.append(queue.get_nowait())
+        self._process(items)
+        for item in items:
+            if isinstance(item, asyncio.Future):
+                _resolve_threadsafe(item)
+
+    def _flush_writer(self) -> None:
+        with self._lock:
+            try:
+                self._writer.flush()
+            except Exception as e:
+                self._write_errors += 1
+                logger.warning("Offloaded writer failed to flush: %s", e)
+
+    def _close_writer(self) -> None:
+        with self._lock:
+            try:
+                self._writer.close()
+            except Exception as e:
+                self._write_errors += 1
+                logger.warning("Offloaded writer failed to close: %s", e)
+
+    def _count_drop(self) -> None:
+        """Record a dropped event, warning on the first and every 1000th drop."""
+        self._dropped_events += 1
+        if self._dropped_events == 1 or self._dropped_events % 1000 == 0:
+            logger.warning(
+                "Offloaded writer queue full (%d). %d event(s) dropped so far.",
+                self._max_queue_size,
+                self._dropped_events,
+            )
+
+
+def _is_running_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    """Whether ``loop`` is the event loop running in the calling thread."""
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+def _resolve_threadsafe(future: "asyncio.Future[None]") -> None:
+    """Resolve a flush marker from any thread (no-op once its loop is closed)."""
+    loop = future.get_loop()
+    if loop.is_closed():
+        return
+    if _is_running_loop(loop):
+        if not future.done():
+            future.set_result(None)
+    else:
+        loop.call_soon_threadsafe(_set_pending_result, future)
+
+
+def _set_pending_result(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
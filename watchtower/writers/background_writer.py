@@ -0,0 +1,323 @@
+"""Background writer that moves trace I/O off the caller's thread."""
+
+import atexit
+import logging
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from watchtower.writers.base import TraceWriter
+from watchtower.utils.fork import register_at_fork
+from watchtower.utils.ring_buffer import OverflowPolicy, RingBuffer
+
+logger = logging.getLogger("watchtower")
+
+# A queued event: (enqueue time, event, encoded bytes or None)
+_QueueItem = Tuple[float, Dict[str, Any], Optional[bytes]]
+
+# Live background writers, drained at interpreter exit
+_live_writers: "weakref.WeakSet[BackgroundWriter]" = weakref.WeakSet()
+
+
+def _close_live_writers() -> None:
+    """Drain and stop all background writers at interpreter shutdown."""
+    for writer in list(_live_writers):
+        writer.close()
+
+
+atexit.register(_close_live_writers)
+
+
+class BackgroundWriter(TraceWriter):
+    """Wraps a TraceWriter so that writes happen on a dedicated thread.
+
+    Callers only enqueue events on a bounded queue; serialization, file
+    locking and appending are done by the writer thread. This keeps
+    blocking disk I/O (and its retry backoffs) off the asyncio event loop
+    that runs ADK callbacks, and gives each wrapped writer its own queue,
+    so a slow destination only ever holds up itself.
+
+    What happens when the queue is full depends on ``policy``:
+    "drop_newest" (the default) drops the new event, "drop_oldest" the
+    oldest queued one, "block" makes the caller wait (up to
+    ``flush_timeout``) for the writer thread, and "sample" thins the stream
+    to 1 in 10 events once the queue is half full, never dropping
+    run.start, run.end or tool.error. Drops are counted, and get_stats()
+    reports how far the writer thread lags behind.
+
+    In a forked child process the inherited queue is discarded (the
+    parent's thread writes those events) and a new writer thread started.
+
+    Example:
+        >>> writer = BackgroundWriter(FileWriter("~/.watchtower/traces"))
+        >>> writer.write({"type": "run.start", "run_id": "abc123"})
+        >>> writer.flush()  # Blocks until the event is on disk
+        >>> writer.close()
+    """
+
+    # Default number of events that may be pending before drops occur
+    DEFAULT_QUEUE_SIZE = 10000
+
+    # Event types the "sample" policy never thins out
+    ESSENTIAL_TYPES = frozenset({"run.start", "run.end", "tool.error"})
+
+    def __init__(
+        self,
+        writer: TraceWriter,
+        max_queue_size: int = DEFAULT_QUEUE_SIZE,
+        flush_timeout: float = 5.0,
+        policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_NEWEST,
+    ):
+        """Initialize background writer and start the writer thread.
+
+        Args:
+            writer: Underlying writer that performs the actual I/O
+            max_queue_size: Maximum number of pending events (default: 10000)
+            flush_timeout: Seconds to wait for flush/close handshakes, and
+                for queue space under the "block" policy
+            policy: What a full queue does with new events: "drop_newest",
+                "drop_oldest", "block" or "sample"
+
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        self._writer = writer
+        self._max_queue_size = max_queue_size
+        self._flush_timeout = flush_timeout
+        self._policy = OverflowPolicy(policy)
+        self._queue = self._new_queue()
+        self._lock = threading.Lock()
+        # Flush requests not yet handled by the writer thread (None: nobody waits)
+        self._flush_waiters: List[Optional[threading.Event]] = []
+        self._stopping = False
+        self._closed = False
+        self._closed_drops = 0
+        self._written_events = 0
+        self._write_errors = 0
+        self._max_lag = 0.0
+        # Enqueue time of the event being written, if any
+        self._writing_since: Optional[float] = None
+        self._start_thread()
+        _live_writers.add(self)
+        register_at_fork(self)
+
+    def _new_queue(self) -> RingBuffer[_QueueItem]:
+        return RingBuffer(
+            self._max_queue_size,
+            policy=self._policy,
+            name="Background writer queue",
+            block_timeout=self._flush_timeout,
+        )
+
+    def _start_thread(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run,
+            name="watchtower-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _after_fork_in_child(self) -> None:
+        """Discard the parent's pending events and restart the writer thread."""
+        self._queue = self._new_queue()
+        self._lock = threading.Lock()
+        self._flush_waiters = []
+        self._closed_drops = 0
+        self._written_events = 0
+        self._write_errors = 0
+        self._max_lag = 0.0
+        self._writing_since = None
+        if not self._closed:
+            self._start_thread()
+
+    @property
+    def writer(self) -> TraceWriter:
+        """Underlying writer that performs the I/O."""
+        return self._writer
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        """What a full queue does with new events."""
+        return self._policy
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of events waiting to be written."""
+        return len(self._queue)
+
+    @property
+    def dropped_events(self) -> int:
+        """Number of events dropped by the queue policy or after close()."""
+        return self._queue.dropped + self._closed_drops
+
+    def write(self, event: Dict[str, Any]) -> None:
+        """Enqueue an event (without blocking unless the policy is "block").
+
+        Args:
+            event: Event dictionary to write
+        """
+        self._enqueue(event, None)
+
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Enqueue an already-serialized event (see write()).
+
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event
+        """
+        self._enqueue(event, data)
+
+    def _enqueue(self, event: Dict[str, Any], data: Optional[bytes]) -> None:
+        """Put an event on the queue, applying the queue policy."""
+        if self._closed:
+            self._closed_drops += 1
+            return
+        self._queue.append(
+            (time.monotonic(), event, data), essential=event.get("type") in self.ESSENTIAL_TYPES
+        )
+
+    def flush(self) -> None:
+        """Block until all events enqueued so far have been flushed.
+
+        Waits at most ``flush_timeout`` seconds for the writer thread.
+        """
+        if not self._thread.is_alive():
+            self._write_items(self._queue.drain())
+            self._writer.flush()
+            return
+
+        done = threading.Event()
+        with self._lock:
+            self._flush_waiters.append(done)
+        self._queue.wake()
+
+        if not done.wait(self._flush_timeout):
+            logger.warning(
+                "Background writer did not flush within %.1fs (%d events pending)",
+                self._flush_timeout,
+                self.queue_depth,
+            )
+
+    def request_flush(self) -> None:
+        """Ask the writer thread to flush without waiting for completion."""
+        with self._lock:
+            self._flush_waiters.append(None)
+        self._queue.wake()
+
+    def close(self) -> None:
+        """Drain pending events, stop the writer thread and close the writer.
+
+        Safe to call multiple times.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._stopping = True
+
+        if self._thread.is_alive():
+            self._queue.wake()
+            self._thread.join(self._flush_timeout)
+            if self._thread.is_alive():
+                logger.warning(
+                    "Background writer did not stop within %.1fs (%d events pending)",
+                    self._flush_timeout,
+                    self.queue_depth,
+                )
+        else:
+            self._write_items(self._queue.drain())
+            self._writer.close()
+
+        _live_writers.discard(self)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get queue, lag and throughput counters.
+
+        Returns:
+            Dictionary with queue_depth, max_queue_size, written_events,
+            queue_dropped_events, dropped_events (queue drops plus drops in
+            the wrapped writer), write_errors, lag_ms (age of the oldest
+            event not yet written) and max_lag_ms (longest time an event
+            has waited to be written)
+        """
+        writer_dropped = self._writer.get_stats().get("dropped_events", 0)
+        oldest = self._queue.oldest()
+        since = self._writing_since
+        if since is None and oldest is not None:
+            since = oldest[0]
+        lag = time.monotonic() - since if since is not None else 0.0
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self._max_queue_size,
+            "written_events": self._written_events,
+            "queue_dropped_events": self.dropped_events,
+            "dropped_events": self.dropped_events + writer_dropped,
+            "write_errors": self._write_errors,
+            "lag_ms": int(lag * 1000),
+            "max_lag_ms": int(max(self._max_lag, lag) * 1000),
+        }
+
+    def get_trace_path(self) -> Optional[Path]:
+        """Return the underlying writer's current trace file path, if any."""
+        get_trace_path = getattr(self._writer, "get_trace_path", None)
+        return get_trace_path() if get_trace_path else None
+
+    def _write_items(self, items: List[_QueueItem]) -> None:
+        """Write dequeued events to the wrapped writer."""
+        for item in items:
+            self._write_item(item)
+
+    def _write_item(self, item: _QueueItem) -> None:
+        """Write one dequeued event to the wrapped writer."""
+        enqueued, event, data = item
+        self._writing_since = enqueued
+        try:
+            if data is None:
+                self._writer.write(event)
+            else:
+                self._writer.write_encoded(event, data)
+            self._written_events += 1
+        except Exception as e:
+            self._write_errors += 1
+            logger.warning("Background writer failed to write event: %s", e)
+        self._max_lag = max(self._max_lag, time.monotonic() - enqueued)
+        self._writing_since = None
+
+    def _run(self) -> None:
+        """Writer thread main loop."""
+        while True:
+            self._queue.wait()
+            with self._lock:
+                waiters, self._flush_waiters = self._flush_waiters, []
+                stopping = self._stopping
+
+            # Everything enqueued before the requests were taken; events
+            # arriving meanwhile wait for the next round. Events are taken
+            # one at a time, so a stalled writer holds at most one event
+            # beyond the queue's capacity
+            for _ in range(len(self._queue)):
+                item = self._queue.popleft()
+                if item is None:
+                    break
+                self._write_item(item)
+            if not (waiters or stopping):
+                continue
+
+            try:
+                if stopping:
+                    self._write_items(self._queue.drain())
+                    self._writer.close()
+                else:
+                    self._writer.flush()
+            except Exception as e:
+                self._write_errors += 1
+                logger.warning("Background writer failed to flush: %s", e)
+            finally:
+                for done in waiters:
+                    if done is not None:
+                        done.set()
+
+            if stopping:
+                return
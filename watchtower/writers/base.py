@@ -1,7 +1,11 @@
-"""Base writer interface for trace event output."""
+"""Base writer interfaces for trace event output."""
 
+import asyncio
+import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Union
+
+logger = logging.getLogger("watchtower")
 
 
 class TraceWriter(ABC):
@@ -20,7 +24,116 @@ class TraceWriter(ABC):
         """
         pass
 
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Write a single event that has already been serialized.
+
+        Lets callers encode an event once and share the bytes across all
+        writers. Writers that cannot use the bytes fall back to write().
+
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event (no trailing newline)
+        """
+        self.write(event)
+
     @abstractmethod
     def flush(self) -> None:
         """Flush any buffered events to ensure they are persisted."""
         pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get writer counters.
+
+        Writers that can drop events report the total as ``dropped_events``.
+
+        Returns:
+            Dictionary of counter name to value
+        """
+        return {}
+
+    def close(self) -> None:
+        """Flush and release any resources held by the writer."""
+        self.flush()
+
+
+class AsyncTraceWriter(ABC):
+    """Abstract base class for writers driven from the asyncio event loop.
+
+    The counterpart of TraceWriter for the async ADK hooks: write() only
+    hands the event off and never blocks the loop, and flush() is awaited,
+    so a slow (e.g. network-backed) destination holds up neither the hook
+    nor other coroutines. Use ThreadOffloadWriter to run a synchronous
+    TraceWriter this way.
+    """
+
+    def __init__(self) -> None:
+        # aclose() scheduled by close() on a running loop, if any
+        self._close_task: Optional["asyncio.Task[None]"] = None
+
+    @abstractmethod
+    def write(self, event: Dict[str, Any]) -> None:
+        """Hand off a single event without blocking.
+
+        Args:
+            event: Event dictionary to write
+        """
+        pass
+
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Hand off a single already-serialized event without blocking.
+
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event (no trailing newline)
+        """
+        self.write(event)
+
+    @abstractmethod
+    async def flush(self) -> None:
+        """Wait until every event handed off so far is persisted."""
+        pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get writer counters.
+
+        Writers that can drop events report the total as ``dropped_events``.
+
+        Returns:
+            Dictionary of counter name to value
+        """
+        return {}
+
+    async def aclose(self) -> None:
+        """Flush and release any resources held by the writer."""
+        await self.flush()
+
+    def close(self) -> None:
+        """Close from synchronous code (e.g. AgentTracePlugin.shutdown()).
+
+        Runs aclose() to completion when no event loop is running in this
+        thread. Inside a running loop it cannot wait: aclose() is scheduled
+        as a task and close() returns before anything is flushed, so await
+        aclose() instead where possible. Failures of the scheduled task are
+        logged.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.aclose())
+            return
+        logger.debug(
+            "%s.close() called inside a running loop; closing in the background",
+            type(self).__name__,
+        )
+        self._close_task = loop.create_task(self.aclose())
+        self._close_task.add_done_callback(_log_close_failure)
+
+
+def _log_close_failure(task: "asyncio.Task[None]") -> None:
+    """Done callback reporting a failed background aclose()."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Closing async trace writer failed: %s", task.exception())
+
+
+# Either kind of writer, as accepted by AgentTracePlugin
+AnyTraceWriter = Union[TraceWriter, AsyncTraceWriter]
@@ -2,11 +2,16 @@
 
 import json
 import logging
+import math
+import os
+import re
+import threading
 import time
 import traceback
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Union
 import platform
 
 logger = logging.getLogger("watchtower")
@@ -21,27 +26,128 @@ except ImportError:
 
 from watchtower.writers.base import TraceWriter  # noqa: E402
 from watchtower.utils.sanitization import sanitize_args  # noqa: E402
-from watchtower.utils.serialization import WatchtowerJSONEncoder  # noqa: E402
+from watchtower.utils.ring_buffer import OverflowPolicy, RingBuffer  # noqa: E402
+from watchtower.utils.compression import get_codec  # noqa: E402
+from watchtower.utils.trace_index import encode_batch_record, index_path  # noqa: E402
+from watchtower.utils.manifest import TraceManifest  # noqa: E402
+from watchtower.utils.fork import register_at_fork  # noqa: E402
+from watchtower.utils.flush_timer import FlushTimer  # noqa: E402
+from watchtower.utils.serialization import WatchtowerJSONEncoder, encode_event  # noqa: E402
+
+# A buffered event and its encoded JSON line (without newline)
+_BufferedEvent = Tuple[Dict[str, Any], bytes]
+
+# Directory layouts: flat, YYYY/MM/DD/ partitions, or YYYY/MM/DD/{agent}/
+LAYOUTS = ("flat", "date", "date_agent")
+
+_UNSAFE_DIR_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def agent_partition(agent_name: Optional[str]) -> str:
+    """Directory name for an agent in the "date_agent" layout.
+
+    Args:
+        agent_name: Agent name from a trace event
+
+    Returns:
+        The name restricted to letters, digits, "_" and "-" (at most 64
+        characters), or "_unknown" if nothing is left
+    """
+    name = _UNSAFE_DIR_CHARS.sub("_", str(agent_name or ""))[:64]
+    return name if name.strip("_") else "_unknown"
 
 
 class FileWriter(TraceWriter):
     """Writes trace events to JSONL files in ~/.watchtower/traces/
 
-    File naming: {date}_{run_id}.jsonl
+    File naming: {date}_{run_id}.jsonl (plus .gz/.zst when compressed)
     Example: 2024-01-15_abc123.jsonl
 
+    With ``layout="date"`` files go into day partitions
+    (2024/01/15/2024-01-15_abc123.jsonl), and with ``layout="date_agent"``
+    into a directory per agent below that (2024/01/15/my_agent/...), so
+    retention can drop a whole day with one directory removal.
+
+    In a process forked after the writer was created, events buffered by
+    the parent are dropped (the parent writes them), inherited descriptors
+    are closed. With ``per_process_files=True`` the child's files get its pid
+    in their name ({date}_{run_id}.{pid}.jsonl), so workers of a pre-fork
+    server sharing one run ID never interleave writes in one file.
+
     Events are buffered and written in batches for performance.
-    File locking ensures safe concurrent access.
+    File locking ensures safe concurrent access. With ``keep_open=True`` a
+    persistent O_APPEND descriptor is kept per file and each batch goes out
+    in a single write() call, relying on atomic append instead of locking
+    for batches up to ATOMIC_APPEND_LIMIT bytes. Events are routed to
+    their run's file by ``run_id``, so one writer can serve concurrent runs.
+
+    With ``compression`` set, each flushed batch is appended as one
+    independently decompressible frame (see watchtower.utils.compression),
+    so a crash loses at most the frame being written.
+
+    With ``index=True`` a sidecar ``.idx`` file records the offset, type,
+    timestamp and tool name of every event in each batch (see
+    watchtower.utils.trace_index), which lets TraceReader seek straight to
+    matching events.
+
+    With ``manifest=True`` (the default) created files and per-file size
+    and event count increments are recorded in the directory's manifest
+    (see watchtower.utils.manifest), so cleanup and stats can list the
+    directory without stat'ing every file. Increments are coalesced and
+    appended at most every MANIFEST_INTERVAL seconds and on flush().
+
+    With ``adaptive=True`` the flush threshold follows the load: the writer
+    keeps moving averages of the event rate and of flush latency, and
+    buffers about as many events as arrive in FLUSH_LATENCY_FACTOR flush
+    latencies, between ``buffer_size`` and ``max_buffer_size``. Bursts are
+    written in fewer, larger batches; quiet traffic in small ones. With
+    ``max_buffer_age_ms`` set (1000 ms by default when adaptive) a timer
+    thread flushes events that have waited that long, bounding what a crash
+    can lose when traffic is quiet.
     """
 
     # Maximum buffer size to prevent unbounded memory growth
     MAX_BUFFER_SIZE = 1000
 
+    # Maximum number of run_id -> trace file mappings remembered
+    MAX_TRACKED_RUNS = 256
+
+    # Maximum persistent descriptors kept open in keep_open mode
+    MAX_OPEN_FILES = 32
+
+    # Largest batch appended without flock (PIPE_BUF on Linux, one page)
+    ATOMIC_APPEND_LIMIT = 4096
+
+    # Seconds between manifest appends (increments are coalesced in between)
+    MANIFEST_INTERVAL = 1.0
+
+    # Default max_buffer_age_ms with adaptive buffering
+    DEFAULT_MAX_BUFFER_AGE_MS = 1000.0
+
+    # Minimum weight of the newest sample in the event rate and flush latency averages
+    EWMA_ALPHA = 0.2
+
+    # Seconds over which older event rate samples fade (after an idle
+    # period the average follows the new rate almost at once)
+    RATE_TIME_CONSTANT = 0.25
+
+    # Adaptive batches span this many flush latencies (flushing <= ~5% of the time)
+    FLUSH_LATENCY_FACTOR = 20
+
     def __init__(
         self,
         trace_dir: str = "~/.watchtower/traces",
         buffer_size: int = 10,
         max_buffer_size: int = MAX_BUFFER_SIZE,
+        keep_open: bool = False,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+        compression: Optional[str] = None,
+        index: bool = False,
+        manifest: bool = True,
+        layout: str = "flat",
+        adaptive: bool = False,
+        max_buffer_age_ms: Optional[float] = None,
+        per_process_files: bool = False,
     ):
         """Initialize file writer.
 
@@ -49,32 +155,145 @@ class FileWriter(TraceWriter):
             trace_dir: Directory to store trace files (will be expanded)
             buffer_size: Number of events to buffer before flushing
             max_buffer_size: Maximum buffer size to prevent memory exhaustion (default: 1000)
+            keep_open: Keep an O_APPEND descriptor open per trace file instead of
+                reopening the file on every flush. Call close() to release them.
+            overflow_policy: What to do when max_buffer_size is reached:
+                "drop_oldest" (default), "drop_newest", or "block" (flush inline
+                instead of dropping)
+            compression: None for plain JSONL, "gzip" for .jsonl.gz or "zstd" for
+                .jsonl.zst (falls back to gzip if zstandard is not installed)
+            index: Maintain a sidecar offset index ({trace file}.idx) per batch
+            manifest: Record created files, their sizes and event counts in the
+                trace directory's manifest
+            layout: "flat" (all files in trace_dir), "date" (YYYY/MM/DD/
+                partitions) or "date_agent" (YYYY/MM/DD/{agent_name}/)
+            adaptive: Grow the flush threshold from buffer_size up to
+                max_buffer_size with the recent event rate and flush latency
+            max_buffer_age_ms: Flush buffered events from a timer thread once
+                the oldest has waited this long (None disables it, unless
+                adaptive, which defaults to DEFAULT_MAX_BUFFER_AGE_MS)
+            per_process_files: In forked children, write to {date}_{run_id}.{pid}.jsonl
+                files (for workers that share a pinned run ID)
+
+        Raises:
+            ValueError: If the compression name or layout is unknown
         """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown trace layout {layout!r} (expected one of {LAYOUTS})")
         self.trace_dir = Path(trace_dir).expanduser()
         self.trace_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
         self._dead_letter_dir = self.trace_dir / "dead_letter"
         self._dead_letter_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
         self._current_file: Optional[Path] = None
-        self._buffer: List[Dict[str, Any]] = []
+        self._trace_files: "OrderedDict[str, Path]" = OrderedDict()
+        self._buffer: RingBuffer[_BufferedEvent] = RingBuffer(
+            max_buffer_size, policy=overflow_policy, name="FileWriter buffer"
+        )
         self._buffer_size = buffer_size
         self._max_buffer_size = max_buffer_size
         self._is_windows = platform.system() == "Windows"
         self._consecutive_lock_failures: int = 0
-
-    def _get_trace_file(self, run_id: str) -> Path:
-        """Get or create trace file path for this run.
+        self._keep_open = keep_open
+        self._fds: "OrderedDict[Path, int]" = OrderedDict()
+        self._codec = get_codec(compression)
+        self._index = index
+        self._layout = layout
+        self._manifest = TraceManifest(self.trace_dir) if manifest else None
+        # File name -> [created record or None, end offset, events, index end offset]
+        self._manifest_pending: Dict[str, List[Any]] = {}
+        self._manifest_due = 0.0
+        # Set in forked children when they write to per-process files
+        self._per_process_files = per_process_files
+        self._pid: Optional[int] = None
+        # Held while draining and writing, which the flush timer also does
+        self._flush_lock = threading.RLock()
+        self._adaptive = adaptive
+        self._batch_size = buffer_size
+        self._event_rate = 0.0
+        self._flush_latency = 0.0
+        self._last_flush = time.monotonic()
+        if max_buffer_age_ms is None and adaptive:
+            max_buffer_age_ms = self.DEFAULT_MAX_BUFFER_AGE_MS
+        self._max_age = max_buffer_age_ms / 1000 if max_buffer_age_ms else None
+        self._timer: Optional[FlushTimer] = None
+        if self._max_age is not None:
+            self._timer = FlushTimer(self.flush, name="watchtower-file-flush")
+        register_at_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        """Drop state inherited from the parent process (see class docstring)."""
+        self._buffer = RingBuffer(
+            self._buffer.capacity, policy=self._buffer.policy, name="FileWriter buffer"
+        )
+        for fd in self._fds.values():
+            self._close_quietly(fd)
+        self._fds.clear()
+        self._trace_files.clear()
+        self._current_file = None
+        self._manifest_pending = {}
+        self._manifest_due = 0.0
+        if self._per_process_files:
+            self._pid = os.getpid()
+        self._flush_lock = threading.RLock()
+        self._last_flush = time.monotonic()
+
+    def _get_trace_file(self, run_id: str, agent_name: Optional[str] = None) -> Path:
+        """Get or create trace file path for a run.
+
+        In the partitioned layouts the partition directories are created
+        here, the first time a run is seen.
 
         Args:
             run_id: Unique run identifier
+            agent_name: Agent the run belongs to ("date_agent" layout only)
 
         Returns:
             Path to trace file
         """
-        if self._current_file is None:
+        trace_file = self._trace_files.get(run_id)
+        if trace_file is None:
             date_str = datetime.now().strftime("%Y-%m-%d")
-            filename = f"{date_str}_{run_id}.jsonl"
-            self._current_file = self.trace_dir / filename
-        return self._current_file
+            if self._pid is None:
+                filename = f"{date_str}_{run_id}.jsonl"
+            else:
+                filename = f"{date_str}_{run_id}.{self._pid}.jsonl"
+            if self._codec is not None:
+                filename += self._codec.extension
+            trace_file = self._partition_dir(date_str, filename, agent_name) / filename
+            self._trace_files[run_id] = trace_file
+            if len(self._trace_files) > self.MAX_TRACKED_RUNS:
+                self._trace_files.popitem(last=False)
+        else:
+            self._trace_files.move_to_end(run_id)
+
+        self._current_file = trace_file
+        return trace_file
+
+    def _partition_dir(self, date_str: str, filename: str, agent_name: Optional[str]) -> Path:
+        """Directory a new trace file goes into, created if needed."""
+        if self._layout == "flat":
+            return self.trace_dir
+        directory = self.trace_dir / date_str.replace("-", "/")
+        if self._layout == "date_agent":
+            if agent_name is None:
+                # Run forgotten from the LRU and resumed without a run.start:
+                # keep appending to its existing file if there is one
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if entry.is_dir() and os.path.exists(
+                                os.path.join(entry.path, filename)
+                            ):
+                                return Path(entry.path)
+                except OSError:
+                    pass
+            directory = directory / agent_partition(agent_name)
+        try:
+            directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        except OSError as e:
+            # Surfaces again (and is dead-lettered) when the batch is written
+            logger.warning("Failed to create trace partition %s: %s", directory, e)
+        return directory
 
     def _write_to_dead_letter(self, events: List[Dict[str, Any]], error: Exception) -> None:
         """Write failed events to dead-letter file.
@@ -122,102 +341,128 @@ class FileWriter(TraceWriter):
         Args:
             event: Event dictionary to write
         """
-        # Prevent unbounded buffer growth - drop oldest events if at max
-        if len(self._buffer) >= self._max_buffer_size:
-            dropped_count = len(self._buffer) - self._max_buffer_size + 1
-            logger.warning(
-                "Buffer at max capacity (%d). Dropping %d oldest event(s) to prevent memory exhaustion.",
-                self._max_buffer_size,
-                dropped_count,
-            )
-            self._buffer = self._buffer[dropped_count:]
+        self.write_encoded(event, encode_event(event))
 
-        self._buffer.append(event)
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Buffer an already-serialized event and write when the buffer fills.
 
-        if len(self._buffer) >= self._buffer_size:
-            self._flush_buffer(event.get("run_id", "unknown"))
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event
+        """
+        # The ring buffer bounds memory; with the block policy we make room by
+        # flushing inline, since nothing else drains the buffer
+        if self._buffer.is_full and self._buffer.policy is OverflowPolicy.BLOCK:
+            self._flush_buffer()
+
+        self._buffer.append((event, data))
+
+        pending = len(self._buffer)
+        if pending >= self._batch_size:
+            self._flush_buffer()
+        elif pending == 1 and self._timer is not None:
+            self._timer.arm(self._max_age)  # type: ignore[arg-type]
+
+    def _flush_buffer(self) -> None:
+        """Write buffered events to their runs' trace files."""
+        with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            events = self._buffer.drain()
+            if not events:
+                return
+            started = time.perf_counter()
+            self._write_events(events)
+            if self._adaptive:
+                self._adapt(len(events), time.perf_counter() - started)
 
-    def _flush_buffer(self, run_id: str) -> None:
-        """Write buffered events to file with retry logic.
+    def _adapt(self, count: int, latency: float) -> None:
+        """Update the rate and latency averages and the flush threshold.
 
         Args:
-            run_id: Run identifier for file naming
+            count: Events written by the flush
+            latency: Seconds the flush took
         """
-        if not self._buffer:
-            return
+        now = time.monotonic()
+        elapsed = max(now - self._last_flush, 1e-6)
+        self._last_flush = now
+        alpha = max(self.EWMA_ALPHA, 1 - math.exp(-elapsed / self.RATE_TIME_CONSTANT))
+        self._event_rate += alpha * (count / elapsed - self._event_rate)
+        self._flush_latency += self.EWMA_ALPHA * (latency - self._flush_latency)
+        # Batches never span more than half the max age, so the timer keeps
+        # catching quiet periods rather than every batch
+        window = self._flush_latency * self.FLUSH_LATENCY_FACTOR
+        if self._max_age is not None:
+            window = min(window, self._max_age / 2)
+        target = int(self._event_rate * window)
+        self._batch_size = max(self._buffer_size, min(target, self._max_buffer_size))
+
+    def _write_events(self, events: List[_BufferedEvent]) -> None:
+        """Write drained events to their runs' trace files."""
+        # Group by run so each run's events land in its own file, in order
+        batches: Dict[str, List[_BufferedEvent]] = {}
+        for entry in events:
+            batches.setdefault(entry[0].get("run_id", "unknown"), []).append(entry)
+
+        for run_id, batch in batches.items():
+            agent_name = None
+            if self._layout == "date_agent":
+                agent_name = next(
+                    (e[0]["agent_name"] for e in batch if e[0].get("agent_name")), None
+                )
+            self._write_batch(self._get_trace_file(run_id, agent_name), batch)
+
+    def _write_batch(self, trace_file: Path, events_to_write: List[_BufferedEvent]) -> None:
+        """Append a batch of events to a trace file with retry logic.
+
+        Events that still cannot be written after all retries are moved to
+        the dead-letter directory.
 
-        trace_file = self._get_trace_file(run_id)
-        events_to_write = self._buffer.copy()
+        Args:
+            trace_file: File to append to
+            events_to_write: Buffered events to write, in order
+        """
         max_retries = 3
         retry_delays = [0.1, 0.5, 2.0]  # Exponential backoff: 100ms, 500ms, 2s
 
+        # Join the whole batch into a single buffer (one frame when compressed)
+        payload = b"\n".join(data for _, data in events_to_write) + b"\n"
+        if self._codec is not None:
+            payload = self._codec.compress(payload)
+
         for retry_attempt in range(max_retries):
             try:
-                with open(trace_file, "a", encoding="utf-8") as f:
-                    # File locking for concurrent access safety (Unix only)
-                    lock_acquired = False
-                    if HAS_FCNTL and not self._is_windows:
-                        backoff_delays = [0.05, 0.1, 0.2]  # 50ms, 100ms, 200ms
-
-                        for attempt, delay in enumerate(backoff_delays):
-                            try:
-                                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-                                lock_acquired = True
-                                break
-                            except (BlockingIOError, OSError) as e:
-                                if attempt < len(backoff_delays) - 1:
-                                    # Wait before retry
-                                    time.sleep(delay)
-                                else:
-                                    # All retries failed
-                                    self._consecutive_lock_failures += 1
-                                    logger.warning(
-                                        "Failed to acquire file lock after %d attempts for %s: %s",
-                                        len(backoff_delays),
-                                        trace_file,
-                                        e,
-                                    )
-
-                                    # Escalate if threshold exceeded
-                                    if self._consecutive_lock_failures >= 5:
-                                        logger.error(
-                                            "File lock acquisition has failed %d consecutive times for %s. "
-                                            "Buffer contains %d unwritten events.",
-                                            self._consecutive_lock_failures,
-                                            trace_file,
-                                            len(events_to_write),
-                                        )
-                                    raise
-
-                        if not lock_acquired:
-                            raise RuntimeError("Failed to acquire file lock")
-
-                    # Write all buffered events with lock release guarantee
-                    try:
-                        for event in events_to_write:
-                            line = json.dumps(
-                                event, separators=(",", ":"), cls=WatchtowerJSONEncoder
-                            )
-                            f.write(line + "\n")
-                    finally:
-                        # Always release lock if it was acquired (Unix only)
-                        if lock_acquired:
-                            try:
-                                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                            except OSError:
-                                pass
-
-                # Success: clear all events that were written
-                # Remove events from start of buffer (events_to_write is a snapshot of buffer at start)
-                if len(self._buffer) >= len(events_to_write):
-                    self._buffer = self._buffer[len(events_to_write) :]
+                if self._keep_open:
+                    end = self._append_to_fd(trace_file, payload, len(events_to_write))
                 else:
-                    # Buffer was modified during retry, clear it entirely
-                    self._buffer.clear()
+                    with open(trace_file, "ab") as f:
+                        # File locking for concurrent access safety (Unix only)
+                        lock_acquired = self._lock(f.fileno(), trace_file, len(events_to_write))
+
+                        # Write the batch with lock release guarantee
+                        try:
+                            f.write(payload)
+                            f.flush()
+                            end = f.tell()
+                        finally:
+                            if lock_acquired:
+                                self._unlock(f.fileno())
+
                 self._consecutive_lock_failures = 0
+                index_end = 0
+                if self._index:
+                    index_end = self._append_index(
+                        trace_file, end - len(payload), payload, events_to_write
+                    )
+                self._append_manifest(
+                    trace_file, end, len(payload), len(events_to_write), index_end
+                )
                 return
 
             except Exception as e:
+                # Reopen the file on the next attempt in case the handle went bad
+                self._close_fd(trace_file)
+
                 # Log exception details
                 logger.error(
                     "Failed to write trace events (attempt %d/%d) to %s: %s",
@@ -232,33 +477,268 @@ class FileWriter(TraceWriter):
                     traceback.format_exc(),
                 )
 
-                # If this was the last retry, move to dead-letter and clear attempted events
+                # If this was the last retry, move to dead-letter
                 if retry_attempt == max_retries - 1:
                     logger.critical(
                         "All retries exhausted. Moving %d events to dead-letter file.",
                         len(events_to_write),
                     )
-                    self._write_to_dead_letter(events_to_write, e)
-                    # Remove only the events that were attempted (from start of buffer)
-                    if len(self._buffer) >= len(events_to_write):
-                        self._buffer = self._buffer[len(events_to_write) :]
-                    else:
-                        # Buffer was modified during retry, clear it entirely
-                        self._buffer.clear()
+                    self._write_to_dead_letter([event for event, _ in events_to_write], e)
                     return
 
                 # Wait before retry with exponential backoff
                 if retry_attempt < len(retry_delays):
                     time.sleep(retry_delays[retry_attempt])
 
+    def _append_index(
+        self,
+        trace_file: Path,
+        offset: int,
+        payload: bytes,
+        events: List[_BufferedEvent],
+    ) -> int:
+        """Append the sidecar index record for a batch just written.
+
+        Failures are logged but never retried: readers rebuild whatever part
+        of the file the index does not cover.
+
+        Args:
+            trace_file: Trace file the batch was appended to
+            offset: File offset of the batch
+            payload: Bytes written (compressed frame or JSONL)
+            events: Events in the batch
+
+        Returns:
+            Sidecar size after the append (0 on failure)
+        """
+        record = encode_batch_record(offset, len(payload), events[0][0].get("run_id"), events)
+        try:
+            with open(index_path(trace_file), "ab") as f:
+                f.write(record)
+                return f.tell()
+        except OSError as e:
+            logger.warning("Failed to update trace index for %s: %s", trace_file, e)
+            return 0
+
+    def _append_manifest(
+        self, trace_file: Path, end: int, size: int, events: int, index_end: int
+    ) -> None:
+        """Account for a batch just written in the trace directory's manifest.
+
+        Sizes are recorded as end offsets rather than increments, so they
+        stay right when the directory is reconciled before they are flushed.
+
+        Args:
+            trace_file: Trace file the batch was appended to
+            end: File offset after the batch
+            size: Bytes written
+            events: Events in the batch
+            index_end: Sidecar index size after the batch (0 if none)
+        """
+        if self._manifest is None:
+            return
+        name = trace_file.relative_to(self.trace_dir).as_posix()
+        pending = self._manifest_pending.get(name)
+        if pending is None:
+            pending = self._manifest_pending[name] = [None, 0, 0, 0]
+        if end == size:
+            # The batch starts at offset 0, so this write created the file
+            date, _, rest = trace_file.name.partition("_")
+            pending[0] = TraceManifest.created(name, date, rest.split(".", 1)[0])
+        pending[1] = max(pending[1], end)
+        pending[2] += events
+        pending[3] = max(pending[3], index_end)
+
+        if time.monotonic() >= self._manifest_due:
+            self._flush_manifest()
+
+    def _flush_manifest(self) -> None:
+        """Append coalesced manifest records.
+
+        Failures are logged but never retried: the manifest is reconciled
+        with the directory when files appear that it does not know about.
+        """
+        self._manifest_due = time.monotonic() + self.MANIFEST_INTERVAL
+        if self._manifest is None or not self._manifest_pending:
+            return
+
+        pending, self._manifest_pending = self._manifest_pending, {}
+        records = []
+        for name, (created, end, events, index_end) in pending.items():
+            if created is not None:
+                records.append(created)
+            records.append(TraceManifest.written(name, end, events, index_end))
+        try:
+            self._manifest.append(records)
+        except OSError as e:
+            logger.warning("Failed to update trace manifest %s: %s", self._manifest.path, e)
+
+    def _append_to_fd(self, trace_file: Path, data: bytes, event_count: int) -> int:
+        """Append a serialized batch through the persistent O_APPEND descriptor.
+
+        Batches up to ATOMIC_APPEND_LIMIT bytes go out in a single write(),
+        which the kernel appends atomically, so no lock is taken. Larger
+        batches fall back to flock to keep them from interleaving.
+
+        Args:
+            trace_file: File to append to
+            data: Serialized batch (newline-terminated JSONL)
+            event_count: Number of events in the batch (for diagnostics)
+
+        Returns:
+            File offset just past the appended batch
+        """
+        fd = self._get_fd(trace_file)
+        lock_acquired = False
+        if len(data) > self.ATOMIC_APPEND_LIMIT:
+            lock_acquired = self._lock(fd, trace_file, event_count)
+
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            # With O_APPEND the descriptor's offset ends up right after our write
+            return os.lseek(fd, 0, os.SEEK_CUR)
+        finally:
+            if lock_acquired:
+                self._unlock(fd)
+
+    def _get_fd(self, trace_file: Path) -> int:
+        """Get the persistent append descriptor for a trace file, opening it if needed.
+
+        Args:
+            trace_file: Trace file path
+
+        Returns:
+            File descriptor opened with O_APPEND
+        """
+        fd = self._fds.get(trace_file)
+        if fd is not None:
+            self._fds.move_to_end(trace_file)
+            return fd
+
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        flags |= getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+        fd = os.open(trace_file, flags, 0o600)
+        self._fds[trace_file] = fd
+
+        while len(self._fds) > self.MAX_OPEN_FILES:
+            _, old_fd = self._fds.popitem(last=False)
+            self._close_quietly(old_fd)
+
+        return fd
+
+    def _close_fd(self, trace_file: Path) -> None:
+        """Close the persistent descriptor for a trace file, if one is open."""
+        fd = self._fds.pop(trace_file, None)
+        if fd is not None:
+            self._close_quietly(fd)
+
+    @staticmethod
+    def _close_quietly(fd: int) -> None:
+        """Close a descriptor, ignoring errors."""
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+    def _lock(self, fd: int, trace_file: Path, event_count: int) -> bool:
+        """Take an exclusive flock on a descriptor with a short backoff.
+
+        Args:
+            fd: File descriptor to lock
+            trace_file: Trace file path (for diagnostics)
+            event_count: Number of events waiting on the lock (for diagnostics)
+
+        Returns:
+            True if the lock was acquired, False if locking is unavailable
+
+        Raises:
+            OSError: If the lock could not be acquired after all attempts
+        """
+        if not HAS_FCNTL or self._is_windows:
+            return False
+
+        backoff_delays = [0.05, 0.1, 0.2]  # 50ms, 100ms, 200ms
+
+        for attempt, delay in enumerate(backoff_delays):
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except (BlockingIOError, OSError) as e:
+                if attempt < len(backoff_delays) - 1:
+                    # Wait before retry
+                    time.sleep(delay)
+                    continue
+
+                # All retries failed
+                self._consecutive_lock_failures += 1
+                logger.warning(
+                    "Failed to acquire file lock after %d attempts for %s: %s",
+                    len(backoff_delays),
+                    trace_file,
+                    e,
+                )
+
+                # Escalate if threshold exceeded
+                if self._consecutive_lock_failures >= 5:
+                    logger.error(
+                        "File lock acquisition has failed %d consecutive times for %s. "
+                        "Buffer contains %d unwritten events.",
+                        self._consecutive_lock_failures,
+                        trace_file,
+                        event_count,
+                    )
+                raise
+
+        return False
+
+    @staticmethod
+    def _unlock(fd: int) -> None:
+        """Release an flock taken by _lock."""
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        except OSError:
+            pass
+
     def flush(self) -> None:
         """Force flush any remaining buffered events."""
-        if self._buffer:
-            run_id = self._buffer[0].get("run_id", "unknown")
-            self._flush_buffer(run_id)
+        with self._flush_lock:
+            self._flush_buffer()
+            self._flush_manifest()
+
+    def close(self) -> None:
+        """Flush remaining events and close any persistent file handles."""
+        if self._timer is not None:
+            self._timer.stop()
+        with self._flush_lock:
+            self._flush_buffer()
+            self._flush_manifest()
+            for fd in self._fds.values():
+                self._close_quietly(fd)
+            self._fds.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get buffer counters.
+
+        Returns:
+            Dictionary with buffered_events, dropped_events and batch_size
+            (the current flush threshold), plus event_rate (events/s) and
+            flush_latency_us moving averages with adaptive buffering
+        """
+        stats = {
+            "buffered_events": len(self._buffer),
+            "dropped_events": self._buffer.dropped,
+            "batch_size": self._batch_size,
+        }
+        if self._adaptive:
+            stats["event_rate"] = int(self._event_rate)
+            stats["flush_latency_us"] = int(self._flush_latency * 1_000_000)
+        return stats
 
     def get_trace_path(self) -> Optional[Path]:
-        """Return the current trace file path.
+        """Return the most recently written trace file path.
 
         Returns:
             Path to current trace file, or None if not yet created
@@ -0,0 +1,463 @@
+"""Process-wide writer hub shared by many plugin instances."""
+
+import atexit
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+from watchtower.writers.base import TraceWriter
+from watchtower.writers.file_writer import FileWriter
+from watchtower.writers.sqlite_writer import SQLiteWriter
+from watchtower.writers.stdout_writer import StdoutWriter
+from watchtower.utils.fork import register_at_fork
+from watchtower.utils.ring_buffer import OverflowPolicy
+
+logger = logging.getLogger("watchtower")
+
+# Queue item kinds
+_EVENT = 0
+_FLUSH = 1
+_RELEASE = 2
+_STOP = 3
+
+_QueueItem = Tuple[int, Optional["HubWriter"], Any]
+
+
+@dataclass
+class _Sink:
+    """A shared writer and the number of HubWriters using it."""
+
+    key: Hashable
+    writer: TraceWriter
+    refs: int = 0
+    closed: bool = False
+
+
+class HubWriter(TraceWriter):
+    """One plugin's handle on a writer shared through a WriterHub.
+
+    Writes only enqueue on the hub's queue; the hub's thread performs them
+    on the shared writer. Use flush() to wait for this handle's events to
+    reach the shared writer's output, and close() to release the handle
+    (the shared writer is closed when its last handle is).
+    """
+
+    def __init__(self, hub: "WriterHub", sink: _Sink):
+        """Initialize handle (use the WriterHub factory methods instead).
+
+        Args:
+            hub: Hub that owns the shared writer
+            sink: Shared writer entry
+        """
+        self._hub = hub
+        self._sink = sink
+        self._closed = False
+        self._dropped_events = 0
+        self._written_events = 0
+
+    @property
+    def writer(self) -> TraceWriter:
+        """Shared writer that performs the I/O."""
+        return self._sink.writer
+
+    def write(self, event: Dict[str, Any]) -> None:
+        """Enqueue an event without blocking.
+
+        Args:
+            event: Event dictionary to write
+        """
+        self._enqueue(event, None)
+
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Enqueue an already-serialized event without blocking.
+
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event
+        """
+        self._enqueue(event, data)
+
+    def _enqueue(self, event: Dict[str, Any], data: Optional[bytes]) -> None:
+        if self._closed or self._sink.closed or not self._hub._put((_EVENT, self, (event, data))):
+            self._dropped_events += 1
+            if self._dropped_events == 1 or self._dropped_events % 1000 == 0:
+                logger.warning(
+                    "Writer hub queue full. %d event(s) dropped so far.", self._dropped_events
+                )
+
+    def flush(self) -> None:
+        """Block until all events enqueued so far have been flushed."""
+        self._hub._request(_FLUSH, self, wait=True)
+
+    def request_flush(self) -> None:
+        """Ask the hub thread to flush the shared writer without waiting."""
+        self._hub._request(_FLUSH, self, wait=False)
+
+    def close(self) -> None:
+        """Flush this handle's events and release the shared writer.
+
+        Safe to call multiple times.
+        """
+        with self._hub._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._hub._request(_RELEASE, self, wait=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters for this handle.
+
+        Returns:
+            Dictionary with queue_depth (hub-wide), written_events,
+            queue_dropped_events and dropped_events (both this handle's queue
+            drops), and shared_dropped_events (drops in the shared writer,
+            which cannot be attributed to one handle)
+        """
+        return {
+            "queue_depth": self._hub.queue_depth,
+            "written_events": self._written_events,
+            "queue_dropped_events": self._dropped_events,
+            "dropped_events": self._dropped_events,
+            "shared_dropped_events": self._sink.writer.get_stats().get("dropped_events", 0),
+        }
+
+    def get_trace_path(self) -> Optional[Path]:
+        """Return the shared writer's most recent trace file path, if any.
+
+        The shared writer serves every handle, so this is the file of the
+        last batch written by any of them.
+        """
+        get_trace_path = getattr(self._sink.writer, "get_trace_path", None)
+        return get_trace_path() if get_trace_path else None
+
+
+class WriterHub:
+    """Shares trace writers, and one writer thread, across plugin instances.
+
+    A service that builds a runner (and an AgentTracePlugin) per tenant
+    would otherwise have a buffer, file descriptors and a writer thread per
+    plugin, all contending for the same trace directory. Through the hub,
+    plugins with the same output settings get handles on one shared writer:
+    events from every instance are batched in a single buffer, written by
+    a single background thread, and routed to their run's file through the
+    file writer's LRU pool of open O_APPEND descriptors.
+
+    In a forked child process the inherited queue is discarded (the
+    parent's thread writes those events) and the hub thread is restarted;
+    the shared writers reset themselves the same way.
+
+    Example:
+        >>> hub = get_writer_hub()
+        >>> writer = hub.file_writer("~/.watchtower/traces")
+        >>> writer.write({"type": "run.start", "run_id": "abc123"})
+        >>> writer.close()  # Closes the shared FileWriter if this was the last handle
+    """
+
+    # Default number of events that may be pending before drops occur
+    DEFAULT_QUEUE_SIZE = 10000
+
+    # Events buffered by shared file writers (they serve many runs at once)
+    FILE_BUFFER_SIZE = 100
+
+    def __init__(self, max_queue_size: int = DEFAULT_QUEUE_SIZE, flush_timeout: float = 5.0):
+        """Initialize hub (the writer thread starts with the first handle).
+
+        Args:
+            max_queue_size: Maximum number of pending events across all handles
+            flush_timeout: Seconds to wait for flush/close handshakes
+        """
+        self._queue: "queue.Queue[_QueueItem]" = queue.Queue(maxsize=max_queue_size)
+        self._flush_timeout = flush_timeout
+        self._lock = threading.Lock()
+        self._sinks: Dict[Hashable, _Sink] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._write_errors = 0
+        register_at_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        """Discard the parent's pending events and restart the hub thread."""
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        if self._sinks:
+            self._start_thread()
+
+    def _start_thread(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="watchtower-hub-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of events and requests waiting for the hub thread."""
+        return self._queue.qsize()
+
+    # === Handles ===
+
+    def file_writer(
+        self,
+        trace_dir: str = "~/.watchtower/traces",
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+        compression: Optional[str] = None,
+        index: bool = False,
+        manifest: bool = True,
+        layout: str = "flat",
+        adaptive: bool = False,
+        max_buffer_age_ms: Optional[float] = None,
+        per_process_files: bool = False,
+    ) -> HubWriter:
+        """Get a handle on the shared FileWriter for these settings.
+
+        The shared writer keeps descriptors open (``keep_open=True``).
+
+        Args:
+            trace_dir: Directory to store trace files
+            overflow_policy: Buffer overflow policy of the shared writer
+            compression: None, "gzip" or "zstd"
+            index: Maintain sidecar offset indexes
+            manifest: Record files in the trace directory's manifest
+            layout: "flat", "date" or "date_agent"
+            adaptive: Adapt the flush threshold to the event rate
+            max_buffer_age_ms: Flush events that have waited this long
+            per_process_files: Name files of forked children {date}_{run_id}.{pid}.jsonl
+
+        Returns:
+            Handle to write through
+        """
+        policy = OverflowPolicy(overflow_policy)
+        key = (
+            "file",
+            str(Path(trace_dir).expanduser()),
+            policy,
+            compression,
+            index,
+            manifest,
+            layout,
+            adaptive,
+            max_buffer_age_ms,
+            per_process_files,
+        )
+        return self._acquire(
+            key,
+            lambda: FileWriter(
+                trace_dir,
+                buffer_size=self.FILE_BUFFER_SIZE,
+                keep_open=True,
+                overflow_policy=policy,
+                compression=compression,
+                index=index,
+                manifest=manifest,
+                layout=layout,
+                adaptive=adaptive,
+                max_buffer_age_ms=max_buffer_age_ms,
+                per_process_files=per_process_files,
+            ),
+        )
+
+    def sqlite_writer(
+        self,
+        db_path: str = "~/.watchtower/traces.db",
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+    ) -> HubWriter:
+        """Get a handle on the shared SQLiteWriter for a database.
+
+        Args:
+            db_path: Database file path
+            overflow_policy: Buffer overflow policy of the shared writer
+
+        Returns:
+            Handle to write through
+        """
+        policy = OverflowPolicy(overflow_policy)
+        key = ("sqlite", str(Path(db_path).expanduser()), policy)
+        return self._acquire(key, lambda: SQLiteWriter(db_path, overflow_policy=policy))
+
+    def stdout_writer(self, batch_size: int = 1, max_delay_ms: float = 50.0) -> HubWriter:
+        """Get a handle on the shared StdoutWriter.
+
+        Args:
+            batch_size: Number of events to coalesce per write
+            max_delay_ms: Maximum time a coalesced event may wait
+
+        Returns:
+            Handle to write through
+        """
+        key = ("stdout", batch_size, max_delay_ms)
+        return self._acquire(
+            key, lambda: StdoutWriter(batch_size=batch_size, max_delay_ms=max_delay_ms)
+        )
+
+    def _acquire(self, key: Hashable, factory: Callable[[], TraceWriter]) -> HubWriter:
+        """Get a handle on the shared writer for ``key``, creating it if needed.
+
+        Raises:
+            Whatever the writer's constructor raises (e.g. ValueError for an
+            unknown compression)
+        """
+        with self._lock:
+            sink = self._sinks.get(key)
+            if sink is None:
+                sink = self._sinks[key] = _Sink(key, factory())
+            sink.refs += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._start_thread()
+            return HubWriter(self, sink)
+
+    # === Queue ===
+
+    def _put(self, item: _QueueItem) -> bool:
+        """Enqueue without blocking; False if the queue is full."""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def _request(self, kind: int, handle: Optional[HubWriter], wait: bool) -> None:
+        """Send a flush/release/stop request to the hub thread.
+
+        Requests are handled in queue order, so waiting on one means every
+        event enqueued before it has been written.
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            self._handle(kind, handle)
+            return
+
+        done = threading.Event() if wait else None
+        if not wait:
+            self._put((kind, handle, done))
+            return
+        try:
+            self._queue.put((kind, handle, done), timeout=self._flush_timeout)
+        except queue.Full:
+            logger.warning("Writer hub queue full; request timed out")
+            return
+        if done is not None and not done.wait(self._flush_timeout):
+            logger.warning(
+                "Writer hub did not respond within %.1fs (%d items pending)",
+                self._flush_timeout,
+                self.queue_depth,
+            )
+
+    def _run(self) -> None:
+        """Hub thread main loop."""
+        while True:
+            kind, handle, payload = self._queue.get()
+
+            if kind == _EVENT and handle is not None:
+                event, data = payload
+                try:
+                    if data is None:
+                        handle._sink.writer.write(event)
+                    else:
+                        handle._sink.writer.write_encoded(event, data)
+                    handle._written_events += 1
+                except Exception as e:
+                    self._write_errors += 1
+                    logger.warning("Writer hub failed to write event: %s", e)
+                continue
+
+            try:
+                self._handle(kind, handle)
+            finally:
+                if payload is not None:
+                    payload.set()
+            if kind == _STOP:
+                return
+
+    def _handle(self, kind: int, handle: Optional[HubWriter]) -> None:
+        """Perform a flush, release or stop request."""
+        if kind == _STOP:
+            with self._lock:
+                sinks = list(self._sinks.values())
+                self._sinks.clear()
+            for sink in sinks:
+                self._close_sink(sink)
+            return
+        if handle is None:
+            return
+
+        sink = handle._sink
+        if kind == _FLUSH:
+            try:
+                sink.writer.flush()
+            except Exception as e:
+                self._write_errors += 1
+                logger.warning("Writer hub failed to flush: %s", e)
+            return
+
+        # _RELEASE: flush for this handle, close the writer with its last handle
+        with self._lock:
+            sink.refs -= 1
+            last = sink.refs <= 0 and self._sinks.get(sink.key) is sink
+            if last:
+                del self._sinks[sink.key]
+        if last:
+            self._close_sink(sink)
+        else:
+            try:
+                sink.writer.flush()
+            except Exception as e:
+                self._write_errors += 1
+                logger.warning("Writer hub failed to flush: %s", e)
+
+    def _close_sink(self, sink: _Sink) -> None:
+        sink.closed = True
+        try:
+            sink.writer.close()
+        except Exception as e:
+            self._write_errors += 1
+            logger.warning("Writer hub failed to close writer: %s", e)
+
+    # === Lifecycle ===
+
+    def close(self) -> None:
+        """Drain pending events and close every shared writer.
+
+        Handles still in use afterwards count their events as dropped; new
+        handles get new shared writers.
+        """
+        self._request(_STOP, None, wait=True)
+        thread = self._thread
+        if thread is not None:
+            thread.join(self._flush_timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hub counters.
+
+        Returns:
+            Dictionary with queue_depth, shared_writers, handles,
+            shared_dropped_events (drops in all shared writers) and write_errors
+        """
+        with self._lock:
+            sinks = list(self._sinks.values())
+        return {
+            "queue_depth": self.queue_depth,
+            "shared_writers": len(sinks),
+            "handles": sum(sink.refs for sink in sinks),
+            "shared_dropped_events": sum(
+                sink.writer.get_stats().get("dropped_events", 0) for sink in sinks
+            ),
+            "write_errors": self._write_errors,
+        }
+
+
+_hub: Optional[WriterHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_writer_hub() -> WriterHub:
+    """Get the process-wide writer hub, creating it on first use.
+
+    Returns:
+        The shared WriterHub (drained at interpreter exit)
+    """
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = WriterHub()
+            atexit.register(_hub.close)
+        return _hub
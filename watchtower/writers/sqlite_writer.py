@@ -0,0 +1,239 @@
+"""SQLite writer for ad-hoc SQL analysis of trace events."""
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from watchtower.writers.base import TraceWriter
+from watchtower.utils.fork import register_at_fork
+from watchtower.utils.ring_buffer import OverflowPolicy, RingBuffer
+from watchtower.utils.serialization import encode_event
+
+logger = logging.getLogger("watchtower")
+
+# Bumped (via PRAGMA user_version) whenever the table layout changes
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    run_id TEXT,
+    tool_name TEXT,
+    timestamp REAL,
+    duration_ms REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_type ON events(type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_run_id ON events(run_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_tool_name ON events(tool_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+"""
+
+_INSERT = (
+    "INSERT INTO events (type, run_id, tool_name, timestamp, duration_ms, payload) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+# A buffered event and its encoded JSON (without newline)
+_BufferedEvent = Tuple[Dict[str, Any], bytes]
+
+# Connections inherited from a parent process. SQLite connections must not
+# be used or closed across fork() (closing could release the parent's
+# locks or checkpoint its WAL), so they are kept alive and never touched.
+_inherited_connections: List[sqlite3.Connection] = []
+
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def _text(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+class SQLiteWriter(TraceWriter):
+    """Writes trace events to a SQLite database, one row per event.
+
+    The key fields (type, run_id, tool_name, timestamp, duration_ms) are
+    stored in indexed columns and the full event as JSON in ``payload``, so
+    queries across thousands of runs use the indexes and can still reach
+    any field with ``json_extract``. Events are buffered and each flush
+    inserts the batch with one ``executemany`` in a single transaction. The
+    database runs in WAL mode, so readers (the sqlite3 shell, notebooks)
+    never block the writer.
+
+    A forked child process drops the events buffered by its parent and
+    opens its own connection.
+
+    Example:
+        >>> writer = SQLiteWriter("~/.watchtower/traces.db")
+        >>> writer.write({"type": "tool.error", "run_id": "abc123", "tool_name": "search"})
+        >>> writer.close()
+
+        $ sqlite3 ~/.watchtower/traces.db \\
+            "SELECT tool_name, count(*) FROM events WHERE type = 'tool.error' GROUP BY 1"
+    """
+
+    # Maximum buffer size to prevent unbounded memory growth
+    MAX_BUFFER_SIZE = 10000
+
+    def __init__(
+        self,
+        db_path: str = "~/.watchtower/traces.db",
+        buffer_size: int = 100,
+        max_buffer_size: int = MAX_BUFFER_SIZE,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+        busy_timeout_ms: int = 5000,
+    ):
+        """Initialize SQLite writer, creating the database and schema if needed.
+
+        Args:
+            db_path: Database file path (will be expanded)
+            buffer_size: Number of events to buffer before inserting a batch
+            max_buffer_size: Maximum buffer size to prevent memory exhaustion
+            overflow_policy: What to do when max_buffer_size is reached:
+                "drop_oldest" (default), "drop_newest", or "block" (flush inline
+                instead of dropping)
+            busy_timeout_ms: How long a flush waits for another process's
+                write lock before giving up
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened or initialized
+        """
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if not self.db_path.exists():
+            # Create the file up front so it is private like trace files
+            os.close(os.open(self.db_path, os.O_CREAT | os.O_WRONLY, 0o600))
+
+        self._buffer: RingBuffer[_BufferedEvent] = RingBuffer(
+            max_buffer_size, policy=overflow_policy, name="SQLiteWriter buffer"
+        )
+        self._buffer_size = buffer_size
+        self._busy_timeout_ms = busy_timeout_ms
+        self._failed_events = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = self._connect()
+        register_at_fork(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection and create the schema if needed."""
+        # Autocommit mode: transactions are opened explicitly per batch.
+        # The lock serializes use across threads (e.g. under BackgroundWriter).
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        # In WAL mode NORMAL only risks the last transactions on power loss
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return conn
+
+    def _after_fork_in_child(self) -> None:
+        """Drop the parent's buffered events and open a connection of our own."""
+        self._buffer = RingBuffer(
+            self._buffer.capacity, policy=self._buffer.policy, name="SQLiteWriter buffer"
+        )
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            _inherited_connections.append(self._conn)
+            self._conn = self._connect()
+
+    def write(self, event: Dict[str, Any]) -> None:
+        """Buffer an event and insert when the buffer fills.
+
+        Args:
+            event: Event dictionary to write
+        """
+        self.write_encoded(event, encode_event(event))
+
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Buffer an already-serialized event and insert when the buffer fills.
+
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event
+        """
+        if self._buffer.is_full and self._buffer.policy is OverflowPolicy.BLOCK:
+            self._flush_buffer()
+
+        self._buffer.append((event, data))
+
+        if len(self._buffer) >= self._buffer_size:
+            self._flush_buffer()
+
+    def _flush_buffer(self) -> None:
+        """Insert all buffered events in one transaction.
+
+        The buffer is drained under the same lock as the insert, so batches
+        from concurrent flushes are committed in the order they were drained.
+        """
+        with self._lock:
+            events = self._buffer.drain()
+            if not events:
+                return
+
+            rows: List[Tuple[Any, ...]] = [
+                (
+                    str(event.get("type", "")),
+                    _text(event.get("run_id")),
+                    _text(event.get("tool_name")),
+                    _number(event.get("timestamp")),
+                    _number(event.get("duration_ms")),
+                    data.decode("utf-8"),
+                )
+                for event, data in events
+            ]
+
+            if self._conn is None:
+                self._failed_events += len(rows)
+                logger.warning("SQLiteWriter is closed; dropped %d events", len(rows))
+                return
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(_INSERT, rows)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    try:
+                        self._conn.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        pass
+                self._failed_events += len(rows)
+                logger.error("Failed to insert %d events into %s: %s", len(rows), self.db_path, e)
+
+    def flush(self) -> None:
+        """Force insert any remaining buffered events."""
+        self._flush_buffer()
+
+    def close(self) -> None:
+        """Insert remaining events and close the database connection."""
+        self._flush_buffer()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get buffer counters.
+
+        Returns:
+            Dictionary with buffered_events and dropped_events (buffer
+            overflows plus events in batches that failed to insert)
+        """
+        return {
+            "buffered_events": len(self._buffer),
+            "dropped_events": self._buffer.dropped + self._failed_events,
+        }
+
+    def get_db_path(self) -> Path:
+        """Return the database file path.
+
+        Returns:
+            Path to the SQLite database
+        """
+        return self.db_path
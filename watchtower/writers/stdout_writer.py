@@ -3,12 +3,28 @@
 import logging
 import sys
 import json
-from typing import TextIO, Dict, Any, Optional
+import threading
+from typing import TextIO, Dict, Any, List, Optional
+
+from watchtower.writers.base import TraceWriter
+from watchtower.utils.flush_timer import FlushTimer
+from watchtower.utils.fork import register_at_fork
+from watchtower.utils.serialization import WatchtowerJSONEncoder, encode_event
 
 logger = logging.getLogger("watchtower")
 
 
-class StdoutWriter:
+class _StdoutJSONEncoder(WatchtowerJSONEncoder):
+    """Renders objects without a JSON form as str(obj), as stdout always has."""
+
+    def default(self, obj: Any) -> Any:
+        value = super().default(obj)
+        if isinstance(value, dict) and "__type__" in value:
+            return str(obj)
+        return value
+
+
+class StdoutWriter(TraceWriter):
     """Emits events as NDJSON (newline-delimited JSON) to stdout.
 
     Used for live tailing when CLI spawns the Python process.
@@ -16,16 +32,45 @@ class StdoutWriter:
 
     Output format:
     {"jsonrpc":"2.0","method":"<event.type>","params":{...event}}
+
+    By default every event is written and flushed immediately. With
+    ``batch_size > 1`` events are coalesced and written with a single
+    write/flush once ``batch_size`` events accumulate or ``max_delay_ms``
+    passes after the first pending event, whichever comes first.
+
+    Values are encoded like in trace files (e.g. datetimes in ISO format),
+    except objects without a JSON form, which are written as ``str(obj)``
+    rather than as a ``{"__type__": ...}`` dict of their attributes.
     """
 
-    def __init__(self, stream: Optional[TextIO] = None):
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        batch_size: int = 1,
+        max_delay_ms: float = 50.0,
+    ):
         """Initialize stdout writer.
 
         Args:
             stream: Output stream (defaults to sys.stdout)
+            batch_size: Number of events to coalesce per write (1 disables coalescing)
+            max_delay_ms: Maximum time an event may wait before being written
         """
         self._stream = stream or sys.stdout
+        self._batch_size = max(1, batch_size)
+        self._max_delay = max_delay_ms / 1000
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[FlushTimer] = None
+        if self._batch_size > 1:
+            self._timer = FlushTimer(self.flush, name="watchtower-stdout-flush")
         self._ensure_unbuffered()
+        register_at_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        """Drop events coalesced by the parent process (it writes them)."""
+        self._pending = []
+        self._lock = threading.Lock()
 
     def _ensure_unbuffered(self) -> None:
         """Ensure stdout is unbuffered for real-time streaming."""
@@ -48,24 +93,68 @@ class StdoutWriter:
         {"jsonrpc":"2.0","method":"<event.type>","params":{...event}}
         """
         try:
-            message = {
-                "jsonrpc": "2.0",
-                "method": event.get("type", "unknown"),
-                "params": event,
-            }
+            self.write_encoded(event, encode_event(event))
+        except Exception as e:
+            # Don't crash on write errors - observability shouldn't break the agent
+            logger.warning("Failed to write event to stdout: %s", e)
+
+    def write_encoded(self, event: Dict[str, Any], data: bytes) -> None:
+        """Write an already-serialized event as a JSON-RPC 2.0 notification.
+
+        The encoded event is spliced into the envelope as ``params`` without
+        re-encoding it, unless it holds objects without a JSON form.
+
+        Args:
+            event: Event dictionary to write
+            data: Compact JSON encoding of the event
+        """
+        try:
+            method = json.dumps(str(event.get("type", "unknown")))
+            if b'"__type__"' in data:
+                params = json.dumps(event, cls=_StdoutJSONEncoder, separators=(",", ":"))
+            else:
+                params = data.decode("utf-8")
+            line = f'{{"jsonrpc":"2.0","method":{method},"params":{params}}}\n'
+
+            if self._timer is None:
+                self._stream.write(line)
+                self._stream.flush()
+                return
 
-            line = json.dumps(message, separators=(",", ":"), default=str)
-            self._stream.write(line + "\n")
-            self._stream.flush()
+            with self._lock:
+                self._pending.append(line)
+                if len(self._pending) >= self._batch_size:
+                    self._write_pending()
+                elif len(self._pending) == 1:
+                    self._timer.arm(self._max_delay)
 
         except Exception as e:
             # Don't crash on write errors - observability shouldn't break the agent
             logger.warning("Failed to write event to stdout: %s", e)
 
+    def _write_pending(self) -> None:
+        """Write all coalesced lines with one write and flush (lock must be held)."""
+        lines = self._pending
+        self._pending = []
+        if self._timer is not None:
+            self._timer.cancel()
+        self._stream.write("".join(lines))
+        self._stream.flush()
+
     def flush(self) -> None:
-        """Explicit flush (usually no-op due to line buffering)."""
+        """Write any coalesced events and flush the stream."""
         try:
-            self._stream.flush()
-        except OSError as e:
+            with self._lock:
+                if self._pending:
+                    self._write_pending()
+                else:
+                    self._stream.flush()
+        except (OSError, ValueError) as e:
             # Log flush failures (stream may be closed or broken pipe)
             logger.warning("Failed to flush stdout stream: %s", e)
+
+    def close(self) -> None:
+        """Write any coalesced events and stop the flush timer."""
+        self.flush()
+        if self._timer is not None:
+            self._timer.stop()